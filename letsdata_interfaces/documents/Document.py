@@ -1,10 +1,14 @@
-import json
 from letsdata_interfaces.documents.DocumentType import DocumentType
+from letsdata_utils.json_utils import toJsonString
 
 '''
  * The "DocumentInterface" is the base interface for any document that can be returned by the user handlers. All other document interfaces and documents either extend or implement this interface.
+ * The document classes define __slots__ (no per instance __dict__) to keep the documents compact when large numbers of them are held in memory. Subclasses that do not
+ * define __slots__ get a __dict__ for their additional attributes as usual and are serialized with both the slots and the __dict__ attributes.
  '''
 class Document: 
+    __slots__ = ("documentType", "documentId", "recordType", "partitionKey", "documentMetadata", "documentKeyValuesMap")
+
     def __init__(self, documentType: DocumentType, documentId : str, recordType : str, partitionKey : str, documentMetadata : dict , documentKeyValuesMap : dict):
         self.documentType = documentType
         self.documentId = documentId
@@ -42,7 +46,7 @@ class Document:
      * @return serialized document as string
     '''
     def serialize(self) -> str:
-        return json.dumps(self)
+        return toJsonString(self)
     
     '''
      * The partition key of the document - useful to determine the partition for the document that would be written to
@@ -0,0 +1,193 @@
+from letsdata_interfaces.documents.Document import Document
+from letsdata_interfaces.documents.DocumentType import DocumentType
+from letsdata_utils.json_utils import toJsonString
+
+'''
+ * The "DocumentBatch" is a columnar (struct of arrays) container for a batch of documents - the documentId, recordType, partitionKey, documentMetadata and documentKeyValuesMap
+ * of the documents are stored as a list per column instead of as a Document object per document. High volume handlers can append the document fields to the batch
+ * without creating the document objects, and the batch can be handed to columnar destinations as a whole (toArrowTable / toSparkDataFrame).
+ *
+ * The batch's rows are Document views (DocumentBatchRow) that read and write the batch's columns, so the code that works with Document objects works with the rows as is.
+ * For example:
+ *
+ *      batch = DocumentBatch()
+ *      for record in records:
+ *          batch.append(record.id, "WARC", record.url, None, {"text": record.text})
+ *      for document in batch:
+ *          print(document.getDocumentId())
+ *      table = batch.toArrowTable()
+ '''
+class DocumentBatch:
+    __slots__ = ("documentType", "documentIds", "recordTypes", "partitionKeys", "documentMetadatas", "documentKeyValuesMaps")
+
+    def __init__(self, documentIds : list = None, recordTypes : list = None, partitionKeys : list = None, documentMetadatas : list = None, documentKeyValuesMaps : list = None, documentType : DocumentType = DocumentType.Document) -> None:
+        self.documentType = documentType
+        self.documentIds = documentIds if documentIds is not None else []
+        documentCount = len(self.documentIds)
+        self.recordTypes = recordTypes if recordTypes is not None else [None] * documentCount
+        self.partitionKeys = partitionKeys if partitionKeys is not None else [None] * documentCount
+        self.documentMetadatas = documentMetadatas if documentMetadatas is not None else [None] * documentCount
+        self.documentKeyValuesMaps = documentKeyValuesMaps if documentKeyValuesMaps is not None else [None] * documentCount
+        if not (len(self.recordTypes) == len(self.partitionKeys) == len(self.documentMetadatas) == len(self.documentKeyValuesMaps) == documentCount):
+            raise(Exception("DocumentBatch - the columns should have the same length - documentIds: "+str(documentCount)+", recordTypes: "+str(len(self.recordTypes))+", partitionKeys: "+str(len(self.partitionKeys))+
+                            ", documentMetadatas: "+str(len(self.documentMetadatas))+", documentKeyValuesMaps: "+str(len(self.documentKeyValuesMaps))))
+
+    '''
+     * Creates the batch from the Document objects
+    '''
+    @classmethod
+    def fromDocuments(cls, documents : list, documentType : DocumentType = DocumentType.Document) -> 'DocumentBatch':
+        batch = cls(documentType=documentType)
+        for document in documents:
+            batch.append(document.getDocumentId(), document.getRecordType(), document.getPartitionKey(), document.getDocumentMetadata(), document.getDocumentKeyValuesMap())
+        return batch
+
+    '''
+     * Appends a document to the batch and returns its row index
+    '''
+    def append(self, documentId : str, recordType : str, partitionKey : str, documentMetadata : dict, documentKeyValuesMap : dict) -> int:
+        self.documentIds.append(documentId)
+        self.recordTypes.append(recordType)
+        self.partitionKeys.append(partitionKey)
+        self.documentMetadatas.append(documentMetadata)
+        self.documentKeyValuesMaps.append(documentKeyValuesMap)
+        return len(self.documentIds) - 1
+
+    def getDocumentCount(self) -> int:
+        return len(self.documentIds)
+
+    def __len__(self) -> int:
+        return len(self.documentIds)
+
+    '''
+     * Gets the Document view of the row at the index - the view reads and writes the batch's columns
+    '''
+    def getDocument(self, index : int) -> 'DocumentBatchRow':
+        if index < 0:
+            index += len(self.documentIds)
+        if index < 0 or index >= len(self.documentIds):
+            raise(IndexError("DocumentBatch index out of range - index: "+str(index)+", documentCount: "+str(len(self.documentIds))))
+        return DocumentBatchRow(self, index)
+
+    def __getitem__(self, index : int) -> 'DocumentBatchRow':
+        return self.getDocument(index)
+
+    def __iter__(self):
+        for index in range(0, len(self.documentIds)):
+            yield DocumentBatchRow(self, index)
+
+    '''
+     * Creates the Document objects for the batch's rows
+    '''
+    def toDocuments(self) -> list:
+        return [Document(self.documentType, documentId, recordType, partitionKey, documentMetadata, documentKeyValuesMap) for documentId, recordType, partitionKey, documentMetadata, documentKeyValuesMap
+                in zip(self.documentIds, self.recordTypes, self.partitionKeys, self.documentMetadatas, self.documentKeyValuesMaps)]
+
+    '''
+     * Converts the batch to a pyarrow Table - the arrow columns are built directly from the batch's column lists (no per document objects). The documentMetadata and
+     * documentKeyValuesMap columns are json strings since the maps are schemaless. Requires the pyarrow package.
+    '''
+    def toArrowTable(self):
+        import pyarrow
+        return pyarrow.table({
+            "documentId": pyarrow.array(self.documentIds, type=pyarrow.string()),
+            "recordType": pyarrow.array(self.recordTypes, type=pyarrow.string()),
+            "partitionKey": pyarrow.array(self.partitionKeys, type=pyarrow.string()),
+            "documentMetadata": pyarrow.array([None if documentMetadata is None else toJsonString(documentMetadata) for documentMetadata in self.documentMetadatas], type=pyarrow.string()),
+            "documentKeyValuesMap": pyarrow.array([None if documentKeyValuesMap is None else toJsonString(documentKeyValuesMap) for documentKeyValuesMap in self.documentKeyValuesMaps], type=pyarrow.string())
+        })
+
+    '''
+     * Converts the batch to a Spark DataFrame (with the toArrowTable columns) using the spark session. Spark 4 creates the dataframe from the arrow table directly.
+     * Earlier versions have no createDataFrame for arrow tables - the table is copied to a pandas dataframe, which spark.createDataFrame sends to the JVM as arrow
+     * record batches (spark.sql.execution.arrow.pyspark.enabled), so the conversion makes one pandas copy of the columns instead of a row object per document.
+    '''
+    def toSparkDataFrame(self, spark):
+        import pyspark
+        table = self.toArrowTable()
+        if int(pyspark.__version__.split(".")[0]) >= 4:
+            return spark.createDataFrame(table)
+        spark.conf.set("spark.sql.execution.arrow.pyspark.enabled", "true")
+        return spark.createDataFrame(table.to_pandas())
+
+    '''
+     * Serializes the batch to a json string - a json array of the documents
+    '''
+    def serialize(self) -> str:
+        return toJsonString(self)
+
+'''
+ * A Document view of a DocumentBatch row - the Document getters (and attributes) read and write the batch's columns at the row index. The row does not extend Document
+ * (it would carry the Document's six unused slots per row), it has the same getters and attributes and is serialized as a Document.
+'''
+class DocumentBatchRow:
+    __slots__ = ("batch", "index")
+
+    def __init__(self, batch : DocumentBatch, index : int) -> None:
+        self.batch = batch
+        self.index = index
+
+    @property
+    def documentType(self) -> DocumentType:
+        return self.batch.documentType
+
+    @property
+    def documentId(self) -> str:
+        return self.batch.documentIds[self.index]
+
+    @documentId.setter
+    def documentId(self, value : str) -> None:
+        self.batch.documentIds[self.index] = value
+
+    @property
+    def recordType(self) -> str:
+        return self.batch.recordTypes[self.index]
+
+    @recordType.setter
+    def recordType(self, value : str) -> None:
+        self.batch.recordTypes[self.index] = value
+
+    @property
+    def partitionKey(self) -> str:
+        return self.batch.partitionKeys[self.index]
+
+    @partitionKey.setter
+    def partitionKey(self, value : str) -> None:
+        self.batch.partitionKeys[self.index] = value
+
+    @property
+    def documentMetadata(self) -> dict:
+        return self.batch.documentMetadatas[self.index]
+
+    @documentMetadata.setter
+    def documentMetadata(self, value : dict) -> None:
+        self.batch.documentMetadatas[self.index] = value
+
+    @property
+    def documentKeyValuesMap(self) -> dict:
+        return self.batch.documentKeyValuesMaps[self.index]
+
+    @documentKeyValuesMap.setter
+    def documentKeyValuesMap(self, value : dict) -> None:
+        self.batch.documentKeyValuesMaps[self.index] = value
+
+    def getDocumentType(self) -> DocumentType:
+        return self.batch.documentType
+
+    def getDocumentId(self) -> str:
+        return self.batch.documentIds[self.index]
+
+    def getRecordType(self) -> str:
+        return self.batch.recordTypes[self.index]
+
+    def getDocumentMetadata(self) -> dict:
+        return self.batch.documentMetadatas[self.index]
+
+    def getPartitionKey(self) -> str:
+        return self.batch.partitionKeys[self.index]
+
+    def getDocumentKeyValuesMap(self) -> dict:
+        return self.batch.documentKeyValuesMaps[self.index]
+
+    def serialize(self) -> str:
+        return toJsonString(self)
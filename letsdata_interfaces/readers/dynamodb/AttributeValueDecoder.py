@@ -0,0 +1,106 @@
+import base64
+
+'''
+ * The "AttributeValueDecoder" converts the DynamoDB AttributeValue json (the keys, oldImage and newImage of a DynamoDB Streams record and the keys and item of a
+ * DynamoDB Table item) to the native python values:
+ *
+ *      {"S": "abc"}                    -> "abc"
+ *      {"N": "42"}, {"N": "4.2"}       -> 42 (int), 4.2 (float)
+ *      {"BOOL": true}, {"NULL": true}  -> True, None
+ *      {"B": "AQI="}                   -> b'\x01\x02' (base64 decoded bytes)
+ *      {"M": {...}}, {"L": [...]}      -> dict, list
+ *      {"SS": [...]}, {"NS": [...]}    -> set of str, set of int / float
+ *      {"BS": [...]}                   -> set of bytes
+ *
+ * The numbers are converted to int (integral numbers) or float instead of the boto3 TypeDeserializer's Decimal - this is much faster for wide items, but the
+ * non-integral numbers with more than 15 significant digits lose precision (use the raw "N" string for such attributes).
+ *
+ * The optional projection is a list of attribute paths (top level attribute names or dotted paths into the map attributes, for example ["id", "address.city"]) - only
+ * the projected attributes are decoded, the rest of the item is skipped. For example:
+ *
+ *      decoder = AttributeValueDecoder(["id", "address.city"])     # create once (for example, in the handler's initialize) and reuse
+ *      newImage = decoder.decodeItem(newImage)                       # {"id": 42, "address": {"city": "Seattle"}}
+'''
+class AttributeValueDecoder:
+    __slots__ = ("projection",)
+
+    def __init__(self, projection : list = None) -> None:
+        self.projection = None
+        if projection is not None:
+            self.projection = {}
+            for attributePath in projection:
+                node = self.projection
+                names = attributePath.split(".")
+                for name in names[:-1]:
+                    child = node.get(name, {})
+                    if child is None:
+                        break
+                    node[name] = child
+                    node = child
+                else:
+                    node[names[-1]] = None
+
+    '''
+     * Decodes the DynamoDB item (a dict of attribute name to AttributeValue) to a dict of attribute name to the native value - only the projected attributes if the
+     * decoder has a projection. Returns None for a None item (for example, the oldImage of an INSERT record).
+    '''
+    def decodeItem(self, item : dict) -> dict:
+        if item is None:
+            return None
+        if self.projection is None:
+            return {name: decodeAttributeValue(value) for name, value in item.items()}
+        return projectItem(item, self.projection)
+
+'''
+ * Decodes a single DynamoDB AttributeValue (a single key dict such as {"S": "abc"}) to the native value.
+'''
+def decodeAttributeValue(value : dict) -> object:
+    (typeName, typeValue), = value.items()
+    if typeName == "S":
+        return typeValue
+    if typeName == "N":
+        return decodeNumber(typeValue)
+    if typeName == "M":
+        return {name: decodeAttributeValue(mapValue) for name, mapValue in typeValue.items()}
+    if typeName == "L":
+        return [decodeAttributeValue(listValue) for listValue in typeValue]
+    if typeName == "BOOL":
+        return typeValue
+    if typeName == "NULL":
+        return None
+    if typeName == "SS":
+        return set(typeValue)
+    if typeName == "NS":
+        return {decodeNumber(number) for number in typeValue}
+    if typeName == "B":
+        return decodeBinary(typeValue)
+    if typeName == "BS":
+        return {decodeBinary(binary) for binary in typeValue}
+    raise(Exception("AttributeValueDecoder - unknown DynamoDB AttributeValue type "+str(typeName)))
+
+def decodeItem(item : dict) -> dict:
+    if item is None:
+        return None
+    return {name: decodeAttributeValue(value) for name, value in item.items()}
+
+def decodeNumber(number : str) -> object:
+    if "." in number or "e" in number or "E" in number:
+        return float(number)
+    return int(number)
+
+def decodeBinary(binary) -> bytes:
+    if isinstance(binary, (bytes, bytearray)):
+        return bytes(binary)
+    return base64.b64decode(binary)
+
+def projectItem(item : dict, projection : dict) -> dict:
+    result = {}
+    for name, childProjection in projection.items():
+        value = item.get(name)
+        if value is None:
+            continue
+        if childProjection is None:
+            result[name] = decodeAttributeValue(value)
+        elif "M" in value:
+            result[name] = projectItem(value["M"], childProjection)
+    return result
@@ -12,6 +12,18 @@ from letsdata_utils.logging_utils import logger
 class DynamoDBTableItemReader:
     def __init__(self) -> None:
         pass
+
+    '''
+     * Called once per container before the first item (see Handler Lifecycle in the README) - for example, create the AttributeValueDecoder with the item projection here.
+    '''
+    def initialize(self) -> None:
+        pass
+
+    '''
+     * Called once after initialize() - for example, decode a sample item so that the item to document mapping is ready.
+    '''
+    def warmup(self) -> None:
+        pass
         
     '''
     The #LetsData DynamoDB Table Item Reader uses this interface's implementation (also called as user data handlers) to transform the records from DynamoDB Item to a #LetsData document. At a high level, the overall #LetsData DynamoDB Table Item Reader design is as follows:
@@ -55,6 +67,9 @@ class DynamoDBTableItemReader:
                       The primary key attribute(s) for the scanned DynamoDB item 
      item : str
                       The scanned DynamoDB table item  
+                      
+                      The keys and item are in the DynamoDB AttributeValue json format ({"S": "abc"}, {"N": "42"} etc). Use the 
+                      letsdata_interfaces.readers.dynamodb.AttributeValueDecoder to convert them to the native python values.
      
      Returns
      -------
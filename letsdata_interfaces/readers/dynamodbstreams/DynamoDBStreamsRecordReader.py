@@ -7,11 +7,24 @@ from letsdata_interfaces.readers.model.ParseDocumentResult import ParseDocumentR
 from letsdata_interfaces.documents.Document import Document
 from letsdata_interfaces.documents.DocumentType import DocumentType
 from letsdata_interfaces.documents.ErrorDoc import ErrorDoc
+from letsdata_interfaces.readers.dynamodbstreams.ImageDiff import ImageDiff, computeImageDiff
 from letsdata_utils.logging_utils import logger
 
 class DynamoDBStreamsRecordReader:
     def __init__(self) -> None:
         pass
+
+    '''
+     * Called once per container before the first stream record (see Handler Lifecycle in the README) - for example, create the AttributeValueDecoder for the images.
+    '''
+    def initialize(self) -> None:
+        pass
+
+    '''
+     * Called once after initialize() - for example, decode a sample image so that the record to document mapping is ready.
+    '''
+    def warmup(self) -> None:
+        pass
         
     '''
      The #LetsData DynamoDB Streams Record Reader uses this interface's implementation (also called as user data handlers) to transform the records from DynamoDB stream to a #LetsData document. At a high level, the overall #LetsData DynamoDB Stream reader design is as follows:
@@ -79,6 +92,9 @@ class DynamoDBStreamsRecordReader:
                       The item in the DynamoDB table as it appeared before it was modified
      newImage : str
                       The item in the DynamoDB table as it appeared after it was modified
+                      
+                      The keys and images are in the DynamoDB AttributeValue json format ({"S": "abc"}, {"N": "42"} etc). Use the 
+                      letsdata_interfaces.readers.dynamodb.AttributeValueDecoder to convert them to the native python values.
      
      Returns
      -------
@@ -87,5 +103,104 @@ class DynamoDBStreamsRecordReader:
     '''
     def parseRecord(self, streamArn : str, shardId : str, eventId : str, eventName : str, identityPrincipalId : str, identityType : str, sequenceNumber : str, sizeBytes : int, streamViewType : str, approximateCreationDateTime : int, keys : {}, oldImage : {}, newImage : {}) -> ParseDocumentResult:
         raise(Exception("Not Yet Implemented"))
-    
 
+    '''
+     Helper that computes the attribute paths that differ between the record's oldImage and newImage (the added, removed and changed paths, including the nested map 
+     and list paths such as "address.city" and "tags[2]"). Handlers that only care about certain attribute changes can skip the unchanged records before building the 
+     document, for example:
+
+        def parseRecord(self, streamArn, shardId, eventId, eventName, ..., keys, oldImage, newImage):
+            diff = self.getImageDiff(oldImage, newImage, ["status", "address.city"])
+            if diff is None:
+                return ParseDocumentResult(None, SkipDoc(...), ParseDocumentResultStatus.SKIP)
+            ...
+
+     Parameters
+     ----------
+     oldImage : dict
+                The record's oldImage
+     newImage : dict
+                The record's newImage
+     watchedAttributes : list
+                The optional attribute names (or dotted map paths) to diff - the diff returns early (None) when the watched attributes are unchanged
+     
+     Returns
+     -------
+     ImageDiff 
+        The ImageDiff with the added, removed and changed attribute paths, None if there are no differences
+    '''
+    def getImageDiff(self, oldImage : {}, newImage : {}, watchedAttributes : list = None) -> ImageDiff:
+        return computeImageDiff(oldImage, newImage, watchedAttributes)
+
+    '''
+     Optional per key coalescing of the batched records - when enabled, #Lets Data collapses the batch's records for the same primary key (keys) into a single net change 
+     and calls parseRecord once per key instead of once per record. This is useful for tables with hot items where only the final state of the item matters downstream.
+     The records for a key are ordered by the sequenceNumber and the net change is:
+
+        * eventName: INSERT if the first record is an INSERT, REMOVE if the last record is a REMOVE, MODIFY otherwise. An INSERT followed (eventually) by a REMOVE 
+          has no net change and the key is dropped (parseRecord is not called).
+        * oldImage: the first record's oldImage (the item before the batch's changes)
+        * newImage: the last record's newImage (the item after the batch's changes)
+        * the remaining parameters (eventId, sequenceNumber, approximateCreationDateTime etc.): the last record's values
+
+     Returns
+     -------
+     bool 
+        True to coalesce the batched records by key, False (default) to call parseRecord for each record
+    '''
+    def isCoalescingEnabled(self) -> bool:
+        return False
+
+    '''
+     Optional windowed aggregation - instead of a document per record, the reader can accumulate per key state (counts, sums etc.) over tumbling windows of the
+     records' approximateCreationDateTime and emit the aggregate documents when a window closes. #Lets Data carries the open window's state across invocations.
+     To enable the aggregation, implement getAggregationWindowSeconds, aggregateRecord and emitAggregateDocuments. For example, a count per event name per minute:
+
+        def getAggregationWindowSeconds(self) -> int:
+            return 60
+
+        def aggregateRecord(self, windowState, streamArn, shardId, eventId, eventName, ...):
+            windowState[eventName] = windowState.get(eventName, 0) + 1
+
+        def emitAggregateDocuments(self, windowStartTimestamp, windowEndTimestamp, windowState):
+            return [Document(DocumentType.Document, key+"-"+str(windowStartTimestamp), "COUNT", key, None, {"count": count}) for key, count in windowState.items()]
+
+     Returns
+     -------
+     int 
+        The tumbling window size in seconds
+    '''
+    def getAggregationWindowSeconds(self) -> int:
+        raise(Exception("Not Yet Implemented"))
+
+    '''
+     Aggregates the record into the window state.
+
+     Parameters
+     ----------
+     windowState : dict
+                   The open window's per key state - update the state in place. The state should be json compatible (dict, list, str, int, float, bool, None) since it is serialized across invocations
+     (The remaining parameters are the same as parseRecord)
+    '''
+    def aggregateRecord(self, windowState : dict, streamArn : str, shardId : str, eventId : str, eventName : str, identityPrincipalId : str, identityType : str, sequenceNumber : str, sizeBytes : int, streamViewType : str, approximateCreationDateTime : int, keys : {}, oldImage : {}, newImage : {}) -> None:
+        raise(Exception("Not Yet Implemented"))
+
+    '''
+     Creates the aggregate documents for a closed window.
+
+     Parameters
+     ----------
+     windowStartTimestamp : int
+                            The window's start (inclusive) approximateCreationDateTime
+     windowEndTimestamp : int
+                          The window's end (exclusive) approximateCreationDateTime
+     windowState : dict
+                   The window's per key state
+     
+     Returns
+     -------
+     list 
+        The aggregate Document list for the window
+    '''
+    def emitAggregateDocuments(self, windowStartTimestamp : int, windowEndTimestamp : int, windowState : dict) -> list:
+        raise(Exception("Not Yet Implemented"))
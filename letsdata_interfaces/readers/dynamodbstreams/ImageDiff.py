@@ -0,0 +1,104 @@
+SET_TYPES = frozenset(["SS", "NS", "BS"])
+
+'''
+ * The "ImageDiff" has the attribute paths that differ between a DynamoDB Streams record's oldImage and newImage. The paths are the attribute names, with the nested
+ * map attributes as dotted paths and the list elements as indexes, for example "address.city" and "tags[2]":
+ *
+ *      added:   the paths that are in the newImage but not in the oldImage
+ *      removed: the paths that are in the oldImage but not in the newImage
+ *      changed: the paths that are in both images with different values (or different types)
+ *
+ * The images are compared in their DynamoDB AttributeValue json format (no decoding) and the sets (SS, NS, BS) are compared as unordered values.
+'''
+class ImageDiff:
+    __slots__ = ("added", "removed", "changed")
+
+    def __init__(self, added : list = None, removed : list = None, changed : list = None) -> None:
+        self.added = added if added is not None else []
+        self.removed = removed if removed is not None else []
+        self.changed = changed if changed is not None else []
+
+    def getAdded(self) -> list:
+        return self.added
+
+    def getRemoved(self) -> list:
+        return self.removed
+
+    def getChanged(self) -> list:
+        return self.changed
+
+    def hasChanges(self) -> bool:
+        return len(self.added) > 0 or len(self.removed) > 0 or len(self.changed) > 0
+
+    def __bool__(self) -> bool:
+        return self.hasChanges()
+
+    def __repr__(self) -> str:
+        return "ImageDiff(added="+str(self.added)+", removed="+str(self.removed)+", changed="+str(self.changed)+")"
+
+'''
+ * Computes the ImageDiff of the oldImage and the newImage (the images can be None or empty, for example, for INSERT and REMOVE records). Returns None if the images
+ * have no differences.
+ *
+ * The optional watchedAttributes (attribute names or dotted map paths) limits the diff to these attributes - if the watched attributes are equal in both images, the
+ * function returns None without diffing the rest of the images.
+'''
+def computeImageDiff(oldImage : dict, newImage : dict, watchedAttributes : list = None) -> ImageDiff:
+    oldImage = oldImage if oldImage is not None else {}
+    newImage = newImage if newImage is not None else {}
+    diff = ImageDiff()
+    if watchedAttributes is None:
+        if oldImage == newImage:
+            return None
+        diffMaps(oldImage, newImage, "", diff)
+    else:
+        for attributePath in watchedAttributes:
+            oldValue = getAttributeValue(oldImage, attributePath)
+            newValue = getAttributeValue(newImage, attributePath)
+            if oldValue != newValue:
+                diffValues(oldValue, newValue, attributePath, diff)
+    return diff if diff.hasChanges() else None
+
+'''
+ * Gets the AttributeValue at the dotted map path in the image - None if the path does not exist.
+'''
+def getAttributeValue(image : dict, attributePath : str) -> dict:
+    names = attributePath.split(".")
+    value = image.get(names[0])
+    for name in names[1:]:
+        if value is None or "M" not in value:
+            return None
+        value = value["M"].get(name)
+    return value
+
+def diffValues(oldValue : dict, newValue : dict, path : str, diff : ImageDiff) -> None:
+    if oldValue is None:
+        if newValue is not None:
+            diff.added.append(path)
+        return
+    if newValue is None:
+        diff.removed.append(path)
+        return
+    if oldValue == newValue:
+        return
+    (oldType, oldTypeValue), = oldValue.items()
+    (newType, newTypeValue), = newValue.items()
+    if oldType != newType:
+        diff.changed.append(path)
+    elif oldType == "M":
+        diffMaps(oldTypeValue, newTypeValue, path+".", diff)
+    elif oldType == "L":
+        for index in range(0, max(len(oldTypeValue), len(newTypeValue))):
+            diffValues(oldTypeValue[index] if index < len(oldTypeValue) else None, newTypeValue[index] if index < len(newTypeValue) else None, path+"["+str(index)+"]", diff)
+    elif oldType in SET_TYPES:
+        if set(oldTypeValue) != set(newTypeValue):
+            diff.changed.append(path)
+    else:
+        diff.changed.append(path)
+
+def diffMaps(oldMap : dict, newMap : dict, pathPrefix : str, diff : ImageDiff) -> None:
+    for name, oldValue in oldMap.items():
+        diffValues(oldValue, newMap.get(name), pathPrefix+name, diff)
+    for name, newValue in newMap.items():
+        if name not in oldMap:
+            diff.added.append(pathPrefix+name)
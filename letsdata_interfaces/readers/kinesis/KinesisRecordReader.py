@@ -8,10 +8,23 @@ from letsdata_interfaces.documents.Document import Document
 from letsdata_interfaces.documents.DocumentType import DocumentType
 from letsdata_interfaces.documents.ErrorDoc import ErrorDoc
 from letsdata_utils.logging_utils import logger
+from letsdata_utils.dedup_cache import DedupCache
 
 class KinesisRecordReader:
     def __init__(self) -> None:
         pass
+
+    '''
+     * Called once per container before the first stream record (see Handler Lifecycle in the README) - for example, compile the record payload schema or create the DedupCache.
+    '''
+    def initialize(self) -> None:
+        pass
+
+    '''
+     * Called once after initialize() - for example, parse a sample record payload.
+    '''
+    def warmup(self) -> None:
+        pass
         
     '''
      The #Lets Data Kinesis Stream Reader uses this interface's implementation (also called as user data handlers) to transform the messages from Kinesis Stream record to a #Lets Data document. At a high level, the overall # Lets Data Kinesis reader design is as follows:
@@ -70,3 +83,106 @@ class KinesisRecordReader:
     def parseMessage(self, streamArn : str, shardId : str, partitionKey : str, sequenceNumber : str, approximateArrivalTimestamp : int, data : bytearray) -> ParseDocumentResult:
         raise(Exception("Not Yet Implemented"))
     
+
+
+    '''
+     The KPL aggregated record handler - #Lets Data de-aggregates a Kinesis record that was aggregated by the Kinesis Producer Library (the md5 is verified) and calls this function
+     with the record's user records. The default implementation calls parseMessage for each user record (with the user record's partition key and data), implementations can override
+     this to process the user records as a batch.
+
+     Parameters
+     ----------
+     streamArn : str
+                 The Kinesis streamArn
+     shardId   : str
+                 The stream record's shardId
+     sequenceNumber : str
+                      The stream record's sequenceNumber - the user records are numbered by their subSequenceNumber within the sequenceNumber
+     approximateArrivalTimestamp : int 
+                                   The stream record's approximateArrivalTimestamp
+     userRecords : list
+                   The KinesisUserRecord list (subSequenceNumber, partitionKey, explicitHashKey, data) in the aggregated record's order
+     
+     Returns
+     -------
+     list 
+        The ParseDocumentResult for each user record in the userRecords order
+    '''
+    def parseAggregatedMessage(self, streamArn : str, shardId : str, sequenceNumber : str, approximateArrivalTimestamp : int, userRecords : list) -> list:
+        results = []
+        for userRecord in userRecords:
+            results.append(self.parseMessage(streamArn, shardId, userRecord.getPartitionKey(), sequenceNumber, approximateArrivalTimestamp, userRecord.getData()))
+        return results
+
+    '''
+     Optional per container deduplication of the redelivered records - return a letsdata_utils.dedup_cache.DedupCache (created once, for example in __init__ or initialize) 
+     and #Lets Data returns a SkipDoc for the records that the container has already processed instead of calling parseMessage again. The cache is keyed on the record's sequenceNumber (checked before the parse) or the parsed document's documentId
+     (keyType), has a bounded size (least recently used eviction) and a ttl, and counts the hits and misses (getStats). For example:
+
+        def initialize(self) -> None:
+            self.dedupCache = DedupCache(DEDUP_KEY_SEQUENCE_NUMBER, maxEntries=100000, ttlSeconds=900)
+
+        def getDeduplicationCache(self) -> DedupCache:
+            return self.dedupCache
+
+     Returns
+     -------
+     DedupCache 
+        The deduplication cache, None (default) to disable the deduplication
+    '''
+    def getDeduplicationCache(self) -> DedupCache:
+        return None
+
+    '''
+     Optional windowed aggregation - instead of a document per record, the reader can accumulate per key state (counts, sums etc.) over tumbling windows of the
+     records' approximateArrivalTimestamp and emit the aggregate documents when a window closes. #Lets Data carries the open window's state across invocations.
+     To enable the aggregation, implement getAggregationWindowSeconds, aggregateMessage and emitAggregateDocuments. For example, a count per partition key per minute:
+
+        def getAggregationWindowSeconds(self) -> int:
+            return 60
+
+        def aggregateMessage(self, windowState, streamArn, shardId, partitionKey, sequenceNumber, approximateArrivalTimestamp, data):
+            windowState[partitionKey] = windowState.get(partitionKey, 0) + 1
+
+        def emitAggregateDocuments(self, windowStartTimestamp, windowEndTimestamp, windowState):
+            return [Document(DocumentType.Document, key+"-"+str(windowStartTimestamp), "COUNT", key, None, {"count": count}) for key, count in windowState.items()]
+
+     Returns
+     -------
+     int 
+        The tumbling window size in seconds
+    '''
+    def getAggregationWindowSeconds(self) -> int:
+        raise(Exception("Not Yet Implemented"))
+
+    '''
+     Aggregates the record (a user record for the KPL aggregated records) into the window state.
+
+     Parameters
+     ----------
+     windowState : dict
+                   The open window's per key state - update the state in place. The state should be json compatible (dict, list, str, int, float, bool, None) since it is serialized across invocations
+     (The remaining parameters are the same as parseMessage)
+    '''
+    def aggregateMessage(self, windowState : dict, streamArn : str, shardId : str, partitionKey : str, sequenceNumber : str, approximateArrivalTimestamp : int, data : bytearray) -> None:
+        raise(Exception("Not Yet Implemented"))
+
+    '''
+     Creates the aggregate documents for a closed window.
+
+     Parameters
+     ----------
+     windowStartTimestamp : int
+                            The window's start (inclusive) approximateArrivalTimestamp
+     windowEndTimestamp : int
+                          The window's end (exclusive) approximateArrivalTimestamp
+     windowState : dict
+                   The window's per key state
+     
+     Returns
+     -------
+     list 
+        The aggregate Document list for the window
+    '''
+    def emitAggregateDocuments(self, windowStartTimestamp : int, windowEndTimestamp : int, windowState : dict) -> list:
+        raise(Exception("Not Yet Implemented"))
@@ -0,0 +1,25 @@
+'''
+    A user record in a Kinesis record. When the producer uses the KPL aggregation, a Kinesis record has many user records, each with its own partition key, 
+    optional explicit hash key and data. The user records of an aggregated record are numbered by their subSequenceNumber (0, 1, 2 ...) within the Kinesis record's sequenceNumber.
+    A Kinesis record that is not aggregated is a single user record with the subSequenceNumber None.
+'''
+class KinesisUserRecord:
+    __slots__ = ("subSequenceNumber", "partitionKey", "explicitHashKey", "data")
+
+    def __init__(self, subSequenceNumber : int, partitionKey : str, explicitHashKey : str, data : bytearray) -> None:
+        self.subSequenceNumber = subSequenceNumber
+        self.partitionKey = partitionKey
+        self.explicitHashKey = explicitHashKey
+        self.data = data
+
+    def getSubSequenceNumber(self) -> int:
+        return self.subSequenceNumber
+
+    def getPartitionKey(self) -> str:
+        return self.partitionKey
+
+    def getExplicitHashKey(self) -> str:
+        return self.explicitHashKey
+
+    def getData(self) -> bytearray:
+        return self.data
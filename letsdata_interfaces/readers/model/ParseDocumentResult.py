@@ -1,6 +1,7 @@
 from letsdata_interfaces.readers.model import ParseDocumentResultStatus
 from letsdata_interfaces.documents import Document
 class ParseDocumentResult:
+    __slots__ = ("nextRecordType", "document", "status")
 
     def __init__(self, nextRecordType : str, document : Document, status : ParseDocumentResultStatus):
         self.nextRecordType = nextRecordType
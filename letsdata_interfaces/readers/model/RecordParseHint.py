@@ -1,7 +1,8 @@
-from letsdata_interfaces.readers.model import RecordHintType 
+from letsdata_interfaces.readers.model.RecordHintType import RecordHintType
 from letsdata_utils.validations import letsdata_assert
 
 class RecordParseHint:
+    __slots__ = ("recordHintType", "pattern", "offset")
 
     def __init__(self, recordHintType : RecordHintType, pattern : str, offset : int) -> None:
         self.recordHintType = recordHintType
@@ -26,6 +26,18 @@ class SingleFileParser:
     def __init__(self) -> None:
         pass 
 
+    '''
+     * Called once per container before the first record (see Handler Lifecycle in the README) - for example, compile the record's regexes or header lookup tables.
+    '''
+    def initialize(self) -> None:
+        pass
+
+    '''
+     * Called once after initialize() - for example, parse a sample record so that the lazily compiled patterns are ready.
+    '''
+    def warmup(self) -> None:
+        pass
+
     '''
      * The filetype of the file - for the example we've used, we define the filetype (logical name) as "LOGFILE"
      * Here is an example implementation:
@@ -164,11 +176,44 @@ class SingleFileParser:
      * @param s3FileType - the filetype
      * @param s3Filename - the filename
      * @param offsetBytes - the offset bytes into the file
-     * @param byteArr - the byteArr that has the contents of the record
+     * @param byteArr - the byteArr that has the contents of the record - a read only bytes-like object (bytes / bytearray / memoryview) that is passed without copying, use the startIndex and endIndex to read the record
      * @param startIndex - the start index of the record in the byteArr
      * @param endIndex - the end index of the record in the byteArr
      * @return - ParseDocumentResult which has the extracted record and the status (error, success or skip)
      '''
     def parseDocument(self, s3FileType : str, s3Filename : str, offsetBytes : int , byteArr : bytearray, startIndex : int, endIndex : int) -> ParseDocumentResult:
         raise(Exception("Not Yet Implemented"))
-        
\ No newline at end of file
+        
+    '''
+     *  Whether the fixed width records should be parsed in batches with parseDocuments - return True after implementing parseDocuments.
+     *
+     * @return - True to call parseDocuments for the fixed width records, False (default) to call parseDocument for each record
+    '''
+    def isParseDocumentsEnabled(self) -> bool:
+        return False
+
+    '''
+     *  The batch variant of parseDocument for fixed width records (OFFSET record start and end hints) - the local file reader calls this (instead of parseDocument for each record)
+     *  when isParseDocumentsEnabled returns True. The records are passed as a 2-D numpy uint8 array (number of records x record length) which is a read only strided view over the file's
+     *  memory mapped bytes (no copy), so the implementer can vectorize the parsing across the records. For example, decoding a fixed width numeric column for the batch:
+     *
+     *      def parseDocuments(self, s3FileType, s3Filename, offsetBytes, stride, records):
+     *          amounts = (records[:, 10:18] - ord('0')).astype(numpy.int64) @ (10 ** numpy.arange(7, -1, -1))
+     *          ...
+     *
+     *  The records array (and any views of it) should not be kept after the function returns since the file is unmapped after the read.
+     *  The default implementation calls parseDocument for each record with the record's bytes as a memoryview.
+     *
+     * @param s3FileType - the filetype
+     * @param s3Filename - the filename
+     * @param offsetBytes - the offset bytes into the file of the batch's first record
+     * @param stride - the bytes between the starts of consecutive records in the file - the record i is at offsetBytes + i * stride
+     * @param records - the 2-D numpy uint8 array of the batch's records - each row is a record
+     * @return - the list of ParseDocumentResult for the records in the batch, in the record order
+    '''
+    def parseDocuments(self, s3FileType : str, s3Filename : str, offsetBytes : int, stride : int, records) -> list:
+        results = []
+        recordLength = records.shape[1]
+        for index in range(0, records.shape[0]):
+            results.append(self.parseDocument(s3FileType, s3Filename, offsetBytes + index * stride, memoryview(records[index]), 0, recordLength))
+        return results
@@ -11,6 +11,18 @@ from letsdata_utils.logging_utils import logger
 class SagemakerVectorsInterface:
    def __init__(self) -> None:
          pass
+
+   '''
+    * Called once per container before the first document (see Handler Lifecycle in the README) - for example, load the text normalizer / tokenizer that prepares the contents for vectorization.
+   '''
+   def initialize(self) -> None:
+         pass
+
+   '''
+    * Called once after initialize() - for example, run a sample document through extractDocumentElementsForVectorization.
+   '''
+   def warmup(self) -> None:
+         pass
         
    '''
    /**
@@ -97,9 +109,58 @@ class SagemakerVectorsInterface:
      *      }
      *
      * @param documentInterface - the feature doc as letsdata_interfaces.documents.Document
-     * @param vectorsMap - the vectors map as a map of <friendlyName string, Double[]>
+     * The vectors can also be sent as packed binary vectors ({"encoding": "float32" | "float16" | "int8", "data": <base64>, "scale": ...}, see letsdata_utils.vector_utils),
+     * which are ~4-8x smaller than the json lists - the packed vectors are passed to this function as numpy float32 arrays.
+     *
+     * @param vectorsMap - the vectors map as a map of <friendlyName string, Double[]> (or numpy float32 arrays for the packed vectors)
      * @return documentInterface - the vector doc as the letsdata_interfaces.documents.Document  
      */
    '''
    def constructVectorDoc(self, documentInterface, vectorsMap) -> Document:
-      raise(Exception("Not Yet Implemented"))
\ No newline at end of file
+      raise(Exception("Not Yet Implemented"))
+
+   '''
+    * The batch variant of extractDocumentElementsForVectorization - #Lets Data calls this for the extractDocumentElementsForVectorizationBatch requests (N documents per invocation),
+    * so that the per invocation overhead is amortized and the batch can be prepared for the (batched) Sagemaker endpoint calls in one pass. A document's failure is reported by
+    * returning the document's Exception in its place in the result list. The default implementation calls extractDocumentElementsForVectorization for each document and returns
+    * the per document exceptions. If the batch call throws, the documents are retried one at a time with extractDocumentElementsForVectorization.
+    *
+    * @param documents - the list of documents
+    * @return - the list of Map<String, String> (friendlyName to contents) or the Exception for each document, in the documents order
+   '''
+   def extractDocumentElementsForVectorizationBatch(self, documents : list) -> list:
+      results = []
+      for document in documents:
+         try:
+            results.append(self.extractDocumentElementsForVectorization(document))
+         except Exception as err:
+            results.append(err)
+      return results
+
+   '''
+    * The batch variant of constructVectorDoc - #Lets Data calls this for the constructVectorDocBatch requests (N document, vectorsMap pairs per invocation). A pair's failure is
+    * reported by returning the pair's Exception in its place in the result list. The default implementation calls constructVectorDoc for each pair and returns the per pair
+    * exceptions. If the batch call throws, the pairs are retried one at a time with constructVectorDoc.
+    *
+    * @param documentInterfaces - the list of feature docs
+    * @param vectorsMaps - the list of vectors maps, in the documentInterfaces order
+    * @return - the list of vector docs or the Exception for each pair, in the documentInterfaces order
+   '''
+   def constructVectorDocBatch(self, documentInterfaces : list, vectorsMaps : list) -> list:
+      results = []
+      for documentInterface, vectorsMap in zip(documentInterfaces, vectorsMaps):
+         try:
+            results.append(self.constructVectorDoc(documentInterface, vectorsMap))
+         except Exception as err:
+            results.append(err)
+      return results
+
+   '''
+    * The optional compact encoding for the vectors in the constructed vector doc - when an encoding is returned, the numpy vectors (1 dimensional numpy arrays) in the
+    * document's documentKeyValuesMap (including the nested maps such as the FEATURE doc's "vectors") are written as packed vectors
+    * ({"encoding": ..., "data": <base64 little endian values>, "scale": ...}) instead of json lists. The int8 encoding quantizes the values (lossy).
+    *
+    * @return - the encoding (letsdata_utils.vector_utils VECTOR_ENCODING_FLOAT32, VECTOR_ENCODING_FLOAT16 or VECTOR_ENCODING_INT8), None (default) for the json lists
+   '''
+   def getVectorOutputEncoding(self) -> str:
+      return None
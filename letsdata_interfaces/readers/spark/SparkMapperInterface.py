@@ -84,6 +84,18 @@ class SparkMapperInterface:
    def __init__(self) -> None:
          pass
 
+   '''
+    * Called once per container before the first map task (see Handler Lifecycle in the README) - for example, build the mapper's static lookup tables.
+   '''
+   def initialize(self) -> None:
+         pass
+
+   '''
+    * Called once after initialize() - for example, create the spark session so that the first task does not pay the session startup.
+   '''
+   def warmup(self) -> None:
+         pass
+
    '''
    This is the mapper interface. LetsData calls this interface with the read destination uri (s3 file link) for the tasks manifest file. User's spark transformation code is run and an output dataframe is created. 
    
@@ -82,6 +82,18 @@ class SparkReducerInterface:
    
    def __init__(self) -> None:
          pass
+
+   '''
+    * Called once per container before the first reduce task (see Handler Lifecycle in the README) - for example, build the reducer's static lookup tables.
+   '''
+   def initialize(self) -> None:
+         pass
+
+   '''
+    * Called once after initialize() - for example, create the spark session so that the first task does not pay the session startup.
+   '''
+   def warmup(self) -> None:
+         pass
    
    '''
    This is the reducer interface. LetsData calls this interface with a list of read destination uris (s3 file links) for the files that'd be the inputs of the reducer task. User's spark transformation code is run and an output dataframe is created. 
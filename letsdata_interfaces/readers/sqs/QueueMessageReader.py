@@ -8,10 +8,23 @@ from letsdata_interfaces.documents.Document import Document
 from letsdata_interfaces.documents.DocumentType import DocumentType
 from letsdata_interfaces.documents.ErrorDoc import ErrorDoc
 from letsdata_utils.logging_utils import logger
+from letsdata_utils.dedup_cache import DedupCache
 
 class QueueMessageReader:
     def __init__(self) -> None:
         pass
+
+    '''
+     * Called once per container before the first message (see Handler Lifecycle in the README) - for example, compile the message body schema or create the DedupCache.
+    '''
+    def initialize(self) -> None:
+        pass
+
+    '''
+     * Called once after initialize() - for example, parse a sample message body.
+    '''
+    def warmup(self) -> None:
+        pass
         
     '''
     /**
@@ -58,3 +71,37 @@ class QueueMessageReader:
     def parseMessage(self, messageId : str, messageGroupId : str, messageDeduplicationId : str, messageAttributes : {}, messageBody : str) -> ParseDocumentResult:
         raise(Exception("Not Yet Implemented"))
     
+
+    '''
+     The number of message groups that are processed concurrently for the batched messages (the parseMessages function). The messages of a messageGroupId are always
+     processed in order (FIFO), and the different message groups (and the messages without a messageGroupId) are processed in parallel on a thread pool. This helps the
+     handlers that make I/O calls (http, database etc.) per message - with a concurrency greater than 1, parseMessage is called from multiple threads, so the handler
+     should be thread safe.
+
+     Returns
+     -------
+     int 
+        The message group concurrency - 1 (default) processes the messages sequentially
+    '''
+    def getMessageGroupConcurrency(self) -> int:
+        return 1
+
+    '''
+     Optional per container deduplication of the redelivered messages - return a letsdata_utils.dedup_cache.DedupCache (created once, for example in __init__ or initialize) 
+     and #Lets Data returns a SkipDoc for the messages that the container has already processed instead of calling parseMessage again. The cache is keyed on the message's messageDeduplicationId (checked before the parse, the messageId for the messages without a
+     messageDeduplicationId) or the parsed document's documentId
+     (keyType), has a bounded size (least recently used eviction) and a ttl, and counts the hits and misses (getStats). For example:
+
+        def initialize(self) -> None:
+            self.dedupCache = DedupCache(DEDUP_KEY_MESSAGE_DEDUPLICATION_ID, maxEntries=100000, ttlSeconds=900)
+
+        def getDeduplicationCache(self) -> DedupCache:
+            return self.dedupCache
+
+     Returns
+     -------
+     DedupCache 
+        The deduplication cache, None (default) to disable the deduplication
+    '''
+    def getDeduplicationCache(self) -> DedupCache:
+        return None
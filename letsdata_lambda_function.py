@@ -1,7 +1,8 @@
-import gzip, base64, json, os
 from letsdata_utils.logging_utils import logger
 from letsdata_utils.stage import Stage
-from letsdata_utils.request_utils import return500ResponseFromException, getLambdaStageFromEnvironment, getJsonObject
+from letsdata_utils.request_utils import return500ResponseFromException, getLambdaStageFromEnvironment
+from letsdata_utils.json_utils import getJsonObject
+from letsdata_utils.envelope_utils import decodeRequestEnvelope, encodeResponseData
 from letsdata_service.RequestParser import getServiceRequest
 from letsdata_service.Service import ServiceRequest
 
@@ -10,7 +11,7 @@ from letsdata_service.Service import ServiceRequest
     {
         "requestId": "requestId",
         "interface": "SingleFileParser",
-        "function": "getS3FileType|getResolvedS3FileName|getRecordStartPattern|getRecordEndPattern|parseDocument",
+        "function": "getS3FileType|getResolvedS3FileName|getRecordStartPattern|getRecordEndPattern|getRecordParseHints|parseDocument",
         "letsdataAuth": {
             "tenantId": "tenant_id",
             "userId": "user_id",
@@ -30,6 +31,12 @@ from letsdata_service.Service import ServiceRequest
         ]
     }
 
+    The batchedData is supported for the record functions (parseDocument, parseMessage, parseRecord, parseDynamoDBItem, extractDocumentElementsForVectorization and constructVectorDoc).
+    When batchedData is specified, data should be empty and each batchedData item has the same keys as the function's data.
+    The response data is then a list of per record results (see letsdata_service.Service.BatchedServiceRequest).
+
+    The data / batchedData can optionally be sent compressed and the response data can be returned compressed (see letsdata_utils.envelope_utils).
+
 '''
 def lambda_handler(event, context):
     logger.debug("letsdata_lambda_function start - event: "+str(event))
@@ -40,19 +47,23 @@ def lambda_handler(event, context):
         if event is None:
             raise(Exception("lambda event is null"))
         
-        request : ServiceRequest = getServiceRequest(event)
+        request : ServiceRequest = getServiceRequest(decodeRequestEnvelope(event))
         responseObj = request.execute()
         print("letsdata_lambda_function end - requestId: "+requestId+", response: "+str(responseObj))
         logger.debug("letsdata_lambda_function end - requestId: "+requestId+", response: "+str(responseObj))
+        responseData, contentEncoding = encodeResponseData(getJsonObject(responseObj), event)
+        body = {
+            "statusCode": "SUCCESS",
+            "data": responseData
+        }
+        if contentEncoding is not None:
+            body["contentEncoding"] = contentEncoding
         return {
             "StatusCode": 200,
             "headers": {
                 "Content-Type": "application/json"
             },
-            "body": {
-                "statusCode": "SUCCESS",
-                "data": getJsonObject(responseObj)
-            }
+            "body": body
         }
         
     except Exception as err:
@@ -1,7 +1,9 @@
 
 from letsdata_utils.logging_utils import logger
-from letsdata_service.Service import ServiceRequest, LetsDataAuthParams, InterfaceNames
-from letsdata_utils.validations import letsdata_assert
+from letsdata_service.Service import ServiceRequest, BatchedServiceRequest, LetsDataAuthParams, InterfaceNames, getCachedHandler
+from letsdata_utils.request_utils import getExceptionObject
+from letsdata_service.TumblingWindow import TumblingWindow
+from letsdata_utils.validations import letsdata_assert, compileRequestSchema, SchemaField
 from letsdata_interfaces.readers.dynamodbstreams.DynamoDBStreamsRecordReader import DynamoDBStreamsRecordReader
     
 class DynamoDBRecordReaderService_ParseRecord(ServiceRequest):
@@ -22,66 +24,199 @@ class DynamoDBRecordReaderService_ParseRecord(ServiceRequest):
         self.newImage = newImage
         
     def execute(self): 
-        parser = DynamoDBStreamsRecordReader()
+        parser = self.getHandler(DynamoDBStreamsRecordReader)
         return  parser.parseRecord(self.streamArn, self.shardId, self.eventId, self.eventName, self.identityPrincipalId, self.identityType, self.sequenceNumber, self.sizeBytes, self.streamViewType, self.approximateCreationDateTime, self.keys, self.oldImage, self.newImage)
 
-def getDynamoDBRecordReaderServiceRequest(requestId : str, letsDataAuth: LetsDataAuthParams, interfaceName : InterfaceNames, functionName : str, data : {}, batchedData : []):
-    letsdata_assert(interfaceName == InterfaceNames.DynamoDBStreamsRecordReader, "invalid interfaceName - expected DynamoDBStreamsRecordReader, got "+str(interfaceName))
-    letsdata_assert(letsDataAuth is not None, "invalid letsDataAuth - None")
-    
-    DynamoDBStreamsRecordReaderInterfaceNames = set(["parseRecord"])    
+'''
+    Coalesces the batched records per primary key (DynamoDBStreamsRecordReader.isCoalescingEnabled) and calls parseRecord once per key with the key's net change.
+    The response has a result per batchedData record in the batchedData order (similar to the BatchedServiceRequest) - the parseRecord result is returned at the index 
+    of the key's last record (with the coalesced record indexes) and the key's other records are returned as COALESCED:
 
-    if functionName not in DynamoDBStreamsRecordReaderInterfaceNames:
-            raise(Exception("lambda event - invalid functionName "+functionName+" for interface DynamoDBStreamsRecordReader"))
-    
-    if functionName == "parseRecord":
-        letsdata_assert(batchedData is None or len(batchedData) == 0, "invalid data - DynamoDBStreamsRecordReader.parseRecord requires empty batchedData dictionary")
-        letsdata_assert(isinstance(data, dict) and len(data) == 11, "invalid data - DynamoDBStreamsRecordReader.parseRecord requires data keys [streamArn,shardId,eventId,eventName,identityPrincipalId,identityType,sequenceNumber,sizeBytes,streamViewType,approximateCreationDateTime,data]")
-        
-        letsdata_assert(not data['streamArn'] is None, "invalid streamArn - None - DynamoDBStreamsRecordReader.parseRecord requires data keys [streamArn,shardId,eventId,eventName,identityPrincipalId,identityType,sequenceNumber,sizeBytes,streamViewType,approximateCreationDateTime,data]")
-        letsdata_assert(isinstance(data['streamArn'], str), "invalid streamArn - DynamoDBStreamsRecordReader.parseRecord requires streamArn value to be string")
+    [
+        {
+            "index": 0,
+            "statusCode": "COALESCED",
+            "coalescedIntoIndex": 2
+        },
+        {
+            "index": 1,
+            "statusCode": "COALESCED",
+            "coalescedIntoIndex": null         # INSERT followed by REMOVE - no net change for the key
+        },
+        {
+            "index": 2,
+            "statusCode": "SUCCESS",           # or EXCEPTION (with the errorMessage and exception)
+            "data": <parseRecord response>,
+            "coalescedIndexes": [0, 2]
+        },
+        ...
+    ]
+'''
+class DynamoDBRecordReaderService_CoalescedParseRecord(ServiceRequest):
+    def __init__(self, requestId: str, letsDataAuth: LetsDataAuthParams, interfaceName : InterfaceNames, functionName : str, batchedData : list) -> None: 
+        super().__init__(requestId, letsDataAuth, interfaceName, functionName)
+        self.batchedData = batchedData
+
+    def execute(self): 
+        parser = self.getHandler(DynamoDBStreamsRecordReader)
+        results = [None] * len(self.batchedData)
+        keyIndexes = {}
+        for index in range(0, len(self.batchedData)):
+            record = self.batchedData[index]
+            try:
+                validateParseRecordData(record)
+                letsdata_assert(record['sequenceNumber'].isdigit(), "invalid sequenceNumber - DynamoDBStreamsRecordReader coalescing requires a numeric sequenceNumber, got %s", record['sequenceNumber'])
+                keyIndexes.setdefault(getCoalescingKey(record), []).append(index)
+            except Exception as err:
+                logger.error("coalesced request item failed - requestId: "+str(self.requestId)+", functionName: "+str(self.functionName)+", index: "+str(index)+", err: "+str(err))
+                results[index] = {"index": index, "statusCode": "EXCEPTION", "errorMessage": str(err), "exception": getExceptionObject(err)}
 
-        letsdata_assert(not data['shardId'] is None, "invalid shardId - None - DynamoDBStreamsRecordReader.parseRecord requires data keys [streamArn,shardId,eventId,eventName,identityPrincipalId,identityType,sequenceNumber,sizeBytes,streamViewType,approximateCreationDateTime,data]")
-        letsdata_assert(isinstance(data['shardId'], str), "invalid shardId - DynamoDBStreamsRecordReader.parseRecord requires shardId value to be string")
+        coalescedRecords = []
+        for indexes in keyIndexes.values():
+            indexes.sort(key=lambda index: int(self.batchedData[index]['sequenceNumber']))
+            firstRecord = self.batchedData[indexes[0]]
+            lastRecord = self.batchedData[indexes[-1]]
+            if firstRecord['eventName'] == "INSERT" and lastRecord['eventName'] == "REMOVE":
+                for index in indexes:
+                    results[index] = {"index": index, "statusCode": "COALESCED", "coalescedIntoIndex": None}
+                continue
+            for index in indexes[:-1]:
+                results[index] = {"index": index, "statusCode": "COALESCED", "coalescedIntoIndex": indexes[-1]}
+            coalescedRecords.append((indexes, firstRecord, lastRecord))
 
-        letsdata_assert(not data['eventId'] is None, "invalid eventId - None - DynamoDBStreamsRecordReader.parseRecord requires data keys [streamArn,shardId,eventId,eventName,identityPrincipalId,identityType,sequenceNumber,sizeBytes,streamViewType,approximateCreationDateTime,data]")
-        letsdata_assert(isinstance(data['eventId'], str), "invalid eventId - DynamoDBStreamsRecordReader.parseRecord requires eventId value to be string")
+        coalescedRecords.sort(key=lambda coalescedRecord: int(coalescedRecord[2]['sequenceNumber']))
+        for indexes, firstRecord, lastRecord in coalescedRecords:
+            index = indexes[-1]
+            if firstRecord['eventName'] == "INSERT":
+                eventName = "INSERT"
+            elif lastRecord['eventName'] == "REMOVE":
+                eventName = "REMOVE"
+            else:
+                eventName = "MODIFY"
+            try:
+                results[index] = {
+                    "index": index,
+                    "statusCode": "SUCCESS",
+                    "data": parser.parseRecord(lastRecord['streamArn'], lastRecord['shardId'], lastRecord['eventId'], eventName, lastRecord['identityPrincipalId'], lastRecord['identityType'], lastRecord['sequenceNumber'], lastRecord['sizeBytes'], lastRecord['streamViewType'], lastRecord['approximateCreationDateTime'], lastRecord['data']['keys'], firstRecord['data']['oldImage'], lastRecord['data']['newImage']),
+                    "coalescedIndexes": indexes
+                }
+            except Exception as err:
+                logger.error("coalesced request item failed - requestId: "+str(self.requestId)+", functionName: "+str(self.functionName)+", index: "+str(index)+", err: "+str(err))
+                results[index] = {"index": index, "statusCode": "EXCEPTION", "errorMessage": str(err), "exception": getExceptionObject(err), "coalescedIndexes": indexes}
+        return results
 
-        letsdata_assert(not data['eventName'] is None, "invalid eventName - None - DynamoDBStreamsRecordReader.parseRecord requires data keys [streamArn,shardId,eventId,eventName,identityPrincipalId,identityType,sequenceNumber,sizeBytes,streamViewType,approximateCreationDateTime,data]")
-        letsdata_assert(isinstance(data['eventName'], str), "invalid eventName - DynamoDBStreamsRecordReader.parseRecord requires eventName value to be string")
+'''
+    The coalescing key for a record - the stream and the record's primary key attribute values.
+'''
+def getCoalescingKey(record : dict) -> tuple:
+    keys = record['data']['keys']
+    return (record['streamArn'], tuple(sorted((name, typeName, str(typeValue)) for name, value in keys.items() for typeName, typeValue in value.items())))
 
-        if not data['identityPrincipalId'] is None:
-            letsdata_assert(isinstance(data['identityPrincipalId'], str), "invalid identityPrincipalId - DynamoDBStreamsRecordReader.parseRecord requires identityPrincipalId value to be string")
+'''
+    Aggregates a batch of stream records from a shard (in the sequence number order) into the reader's tumbling windows (see DynamoDBStreamsRecordReader.getAggregationWindowSeconds).
+    The records are the parseRecord data dictionaries (without the streamArn / shardId). The windowState is the open window's serialized state from the previous invocation's 
+    response (null for the first invocation) and the optional currentTimestamp (approximateCreationDateTime units) closes the open window if it has expired. The windows that 
+    close are emitted as aggregate documents:
+    {
+        "documents": [<aggregate Document>, ...],
+        "closedWindows": [{"windowStartTimestamp": ..., "windowEndTimestamp": ..., "keyCount": ...}, ...],
+        "windowState": "the open window's serialized state - send with the next invocation",
+        "checkpointSequenceNumber": "the last aggregated sequenceNumber"
+    }
+    The invocation fails as a whole on an exception - the batch is then retried with the previous windowState.
+'''
+class DynamoDBRecordReaderService_AggregateRecords(ServiceRequest):
+    def __init__(self, requestId: str, letsDataAuth: LetsDataAuthParams, interfaceName : InterfaceNames, functionName : str, streamArn : str, shardId : str, records : list, windowState : str, currentTimestamp : int) -> None: 
+        super().__init__(requestId, letsDataAuth, interfaceName, functionName)
+        self.streamArn = streamArn
+        self.shardId = shardId
+        self.records = sorted(records, key=lambda record: int(record['sequenceNumber']))
+        self.windowState = windowState
+        self.currentTimestamp = currentTimestamp
 
-        if not data['identityType'] is None:
-            letsdata_assert(isinstance(data['identityType'], str), "invalid identityType - DynamoDBStreamsRecordReader.parseRecord requires identityType value to be string")
+    def execute(self): 
+        parser = self.getHandler(DynamoDBStreamsRecordReader)
+        window = TumblingWindow(parser.getAggregationWindowSeconds(), 1, self.windowState)
+        checkpointSequenceNumber = None
+        for record in self.records:
+            windowState = window.getWindowState(record['approximateCreationDateTime'])
+            parser.aggregateRecord(windowState, self.streamArn, self.shardId, record['eventId'], record['eventName'], record['identityPrincipalId'], record['identityType'], record['sequenceNumber'], record['sizeBytes'], record['streamViewType'], record['approximateCreationDateTime'], record['data']['keys'], record['data']['oldImage'], record['data']['newImage'])
+            checkpointSequenceNumber = record['sequenceNumber']
+        if self.currentTimestamp is not None:
+            window.closeIfExpired(self.currentTimestamp)
+        return window.getResponse(parser.emitAggregateDocuments, checkpointSequenceNumber)
 
-        letsdata_assert(not data['sequenceNumber'] is None, "invalid sequenceNumber - None - DynamoDBStreamsRecordReader.parseRecord requires data keys [streamArn,shardId,eventId,eventName,identityPrincipalId,identityType,sequenceNumber,sizeBytes,streamViewType,approximateCreationDateTime,data]")
-        letsdata_assert(isinstance(data['sequenceNumber'], str), "invalid sequenceNumber - DynamoDBStreamsRecordReader.parseRecord requires sequenceNumber value to be string")
+DynamoDBStreamsRecordReaderInterfaceNames = frozenset(["parseRecord", "aggregateRecords"])
 
-        letsdata_assert(not data['sizeBytes'] is None, "invalid sizeBytes - None - DynamoDBStreamsRecordReader.parseRecord requires data keys [streamArn,shardId,eventId,eventName,identityPrincipalId,identityType,sequenceNumber,sizeBytes,streamViewType,approximateCreationDateTime,data]")
-        letsdata_assert(isinstance(data['sizeBytes'], int), "invalid sizeBytes - DynamoDBStreamsRecordReader.parseRecord requires sizeBytes value to be int")
+validateStreamRecordData = compileRequestSchema("DynamoDBStreamsRecordReader.parseRecord data", [
+    SchemaField("keys", dict),
+    SchemaField("oldImage", dict),
+    SchemaField("newImage", dict)
+])
 
-        letsdata_assert(not data['approximateCreationDateTime'] is None, "invalid approximateCreationDateTime - None - DynamoDBStreamsRecordReader.parseRecord requires data keys [streamArn,shardId,eventId,eventName,identityPrincipalId,identityType,sequenceNumber,sizeBytes,streamViewType,approximateCreationDateTime,data]")
-        letsdata_assert(isinstance(data['approximateCreationDateTime'], int), "invalid approximateCreationDateTime - DynamoDBStreamsRecordReader.parseRecord requires approximateCreationDateTime value to be int")
-        
-        letsdata_assert(not data['streamViewType'] is None, "invalid streamViewType - None - DynamoDBStreamsRecordReader.parseRecord requires data keys [streamArn,shardId,eventId,eventName,identityPrincipalId,identityType,sequenceNumber,sizeBytes,streamViewType,approximateCreationDateTime,data]")
-        letsdata_assert(isinstance(data['streamViewType'], str), "invalid streamViewType - DynamoDBStreamsRecordReader.parseRecord requires streamViewType value to be string")
+validateParseRecordData = compileRequestSchema("DynamoDBStreamsRecordReader.parseRecord", [
+    SchemaField("streamArn", str),
+    SchemaField("shardId", str),
+    SchemaField("eventId", str),
+    SchemaField("eventName", str),
+    SchemaField("identityPrincipalId", str, nullable=True),
+    SchemaField("identityType", str, nullable=True),
+    SchemaField("sequenceNumber", str),
+    SchemaField("sizeBytes", int),
+    SchemaField("streamViewType", str),
+    SchemaField("approximateCreationDateTime", int),
+    SchemaField("data", dict, schema=validateStreamRecordData)
+])
 
-        letsdata_assert(not data['data'] is None, "invalid data['data'] - None - DynamoDBStreamsRecordReader.parseRecord requires data keys [streamArn,shardId,eventId,eventName,identityPrincipalId,identityType,sequenceNumber,sizeBytes,streamViewType,approximateCreationDateTime,data]")
-        letsdata_assert(isinstance(data['data'], dict) and len(data['data']) == 3, "invalid data['data'] - DynamoDBStreamsRecordReader.parseRecord requires data['data'] keys [keys, oldImage, newImage]")
+validateAggregateRecordsData = compileRequestSchema("DynamoDBStreamsRecordReader.aggregateRecords", [
+    SchemaField("streamArn", str),
+    SchemaField("shardId", str),
+    SchemaField("records", list),
+    SchemaField("windowState", str, required=False, nullable=True),
+    SchemaField("currentTimestamp", int, required=False, nullable=True)
+])
 
-        letsdata_assert(not data['data']['keys'] is None, "invalid data['data']['keys'] - None - DynamoDBStreamsRecordReader.parseRecord requires data keys [streamArn,shardId,eventId,eventName,identityPrincipalId,identityType,sequenceNumber,sizeBytes,streamViewType,approximateCreationDateTime,data]")
-        letsdata_assert(isinstance(data['data']['keys'], dict) and len(data['data']) > 0, "invalid data['data']['keys'] - DynamoDBStreamsRecordReader.parseRecord requires data['data'] keys [keys, oldImage, newImage]")
+validateAggregateRecordsRecord = compileRequestSchema("DynamoDBStreamsRecordReader.aggregateRecords", [
+    SchemaField("eventId", str),
+    SchemaField("eventName", str),
+    SchemaField("identityPrincipalId", str, nullable=True),
+    SchemaField("identityType", str, nullable=True),
+    SchemaField("sequenceNumber", str),
+    SchemaField("sizeBytes", int),
+    SchemaField("streamViewType", str),
+    SchemaField("approximateCreationDateTime", int),
+    SchemaField("data", dict, schema=validateStreamRecordData)
+])
 
-        letsdata_assert(not data['data']['oldImage'] is None, "invalid data['data']['oldImage'] - None - DynamoDBStreamsRecordReader.parseRecord requires data keys [streamArn,shardId,eventId,eventName,identityPrincipalId,identityType,sequenceNumber,sizeBytes,streamViewType,approximateCreationDateTime,data]")
-        letsdata_assert(isinstance(data['data']['oldImage'], dict), "invalid data['data']['oldImage'] - DynamoDBStreamsRecordReader.parseRecord requires data['data'] keys [keys, oldImage, newImage]")
+def getDynamoDBRecordReaderServiceRequest(requestId : str, letsDataAuth: LetsDataAuthParams, interfaceName : InterfaceNames, functionName : str, data : {}, batchedData : []):
+    letsdata_assert(interfaceName == InterfaceNames.DynamoDBStreamsRecordReader, "invalid interfaceName - expected DynamoDBStreamsRecordReader, got %s", interfaceName)
+    letsdata_assert(letsDataAuth is not None, "invalid letsDataAuth - None")
 
-        letsdata_assert(not data['data']['newImage'] is None, "invalid data['data']['newImage'] - None - DynamoDBStreamsRecordReader.parseRecord requires data keys [streamArn,shardId,eventId,eventName,identityPrincipalId,identityType,sequenceNumber,sizeBytes,streamViewType,approximateCreationDateTime,data]")
-        letsdata_assert(isinstance(data['data']['newImage'], dict), "invalid data['data']['newImage'] - DynamoDBStreamsRecordReader.parseRecord requires data['data'] keys [keys, oldImage, newImage]")
+    if functionName not in DynamoDBStreamsRecordReaderInterfaceNames:
+            raise(Exception("lambda event - invalid functionName "+str(functionName)+" for interface DynamoDBStreamsRecordReader"))
+    
+    if functionName == "parseRecord":
+        if batchedData is not None and len(batchedData) > 0:
+            letsdata_assert(isinstance(batchedData, list), "invalid batchedData - DynamoDBStreamsRecordReader.parseRecord requires batchedData to be a list")
+            letsdata_assert(data is None or len(data) == 0, "invalid data - DynamoDBStreamsRecordReader.parseRecord requires empty data dictionary when batchedData is specified")
+            if getCachedHandler(interfaceName, letsDataAuth, DynamoDBStreamsRecordReader).isCoalescingEnabled():
+                return DynamoDBRecordReaderService_CoalescedParseRecord(requestId, letsDataAuth, interfaceName, functionName, batchedData)
+            return BatchedServiceRequest(requestId, letsDataAuth, interfaceName, functionName, batchedData, lambda batchItem: getDynamoDBRecordReaderServiceRequest(requestId, letsDataAuth, interfaceName, functionName, batchItem, None))
         
+        validateParseRecordData(data)
         return DynamoDBRecordReaderService_ParseRecord(requestId, letsDataAuth, interfaceName, functionName, data['streamArn'], data['shardId'],  data['eventId'], data['eventName'], data['identityPrincipalId'], data['identityType'], data['sequenceNumber'],data['sizeBytes'],data['streamViewType'],data['approximateCreationDateTime'],data['data']['keys'],data['data']['oldImage'],data['data']['newImage'])
+    elif functionName == "aggregateRecords":
+        letsdata_assert(batchedData is None or len(batchedData) == 0, "invalid data - DynamoDBStreamsRecordReader.aggregateRecords requires empty batchedData dictionary")
+        validateAggregateRecordsData(data)
+        violations = []
+        for index in range(0, len(data['records'])):
+            recordViolations = validateAggregateRecordsRecord.getViolations(data['records'][index], "records["+str(index)+"].")
+            if recordViolations is None and not data['records'][index]['sequenceNumber'].isdigit():
+                recordViolations = ["invalid records["+str(index)+"].sequenceNumber - DynamoDBStreamsRecordReader.aggregateRecords requires a numeric sequenceNumber, got "+data['records'][index]['sequenceNumber']]
+            if recordViolations is not None:
+                violations += recordViolations
+        letsdata_assert(len(violations) == 0, "%s", "; ".join(violations))
+        return DynamoDBRecordReaderService_AggregateRecords(requestId, letsDataAuth, interfaceName, functionName, data['streamArn'], data['shardId'], data['records'], data.get('windowState'), data.get('currentTimestamp'))
     else:
         raise(Exception("Unknown functionName"))
     
-    
\ No newline at end of file
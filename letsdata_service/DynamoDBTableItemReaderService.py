@@ -1,7 +1,7 @@
 
 from letsdata_utils.logging_utils import logger
-from letsdata_service.Service import ServiceRequest, LetsDataAuthParams, InterfaceNames
-from letsdata_utils.validations import letsdata_assert
+from letsdata_service.Service import ServiceRequest, BatchedServiceRequest, LetsDataAuthParams, InterfaceNames
+from letsdata_utils.validations import letsdata_assert, compileRequestSchema, SchemaField
 from letsdata_interfaces.readers.dynamodb.DynamoDBTableItemReader import DynamoDBTableItemReader
     
 class DynamoDBTableItemReaderService_ParseDynamoDBItem(ServiceRequest):
@@ -13,39 +13,35 @@ class DynamoDBTableItemReaderService_ParseDynamoDBItem(ServiceRequest):
         self.item = item
         
     def execute(self): 
-        parser = DynamoDBTableItemReader()
+        parser = self.getHandler(DynamoDBTableItemReader)
         return  parser.parseDynamoDBItem(self.tableName, self.segmentNumber, self.keys, self.item)
 
+DynamoDBTableItemReaderInterfaceNames = frozenset(["parseDynamoDBItem"])
+
+validateParseDynamoDBItemData = compileRequestSchema("DynamoDBTableItemReader.parseDynamoDBItem", [
+    SchemaField("tableName", str),
+    SchemaField("segmentNumber", int),
+    SchemaField("data", dict, schema=compileRequestSchema("DynamoDBTableItemReader.parseDynamoDBItem data", [
+        SchemaField("keys", dict),
+        SchemaField("item", dict)
+    ]))
+])
+
 def getDynamoDBTableItemReaderServiceRequest(requestId : str, letsDataAuth: LetsDataAuthParams, interfaceName : InterfaceNames, functionName : str, data : {}, batchedData : []):
-    letsdata_assert(interfaceName == InterfaceNames.DynamoDBTableItemReader, "invalid interfaceName - expected DynamoDBTableItemReader, got "+str(interfaceName))
+    letsdata_assert(interfaceName == InterfaceNames.DynamoDBTableItemReader, "invalid interfaceName - expected DynamoDBTableItemReader, got %s", interfaceName)
     letsdata_assert(letsDataAuth is not None, "invalid letsDataAuth - None")
-    
-    DynamoDBTableItemReaderInterfaceNames = set(["parseDynamoDBItem"])    
 
     if functionName not in DynamoDBTableItemReaderInterfaceNames:
-            raise(Exception("lambda event - invalid functionName "+functionName+" for interface DynamoDBTableItemReader"))
+            raise(Exception("lambda event - invalid functionName "+str(functionName)+" for interface DynamoDBTableItemReader"))
     
     if functionName == "parseDynamoDBItem":
-        letsdata_assert(batchedData is None or len(batchedData) == 0, "invalid data - DynamoDBTableItemReader.parseDynamoDBItem requires empty batchedData dictionary")
-        letsdata_assert(isinstance(data, dict) and len(data) == 3, "invalid data - DynamoDBTableItemReader.parseDynamoDBItem requires data keys [tableName,segmentNumber,data]")
-        
-        letsdata_assert(not data['tableName'] is None, "invalid tableName - None - DynamoDBTableItemReader.parseDynamoDBItem requires data keys [tableName,segmentNumber,data]")
-        letsdata_assert(isinstance(data['tableName'], str), "invalid tableName - DynamoDBTableItemReader.parseDynamoDBItem requires tableName value to be string")
-
-        letsdata_assert(not data['segmentNumber'] is None, "invalid segmentNumber - None - DynamoDBTableItemReader.parseDynamoDBItem requires data keys [tableName,segmentNumber,data]")
-        letsdata_assert(isinstance(data['segmentNumber'], int), "invalid segmentNumber - DynamoDBTableItemReader.parseDynamoDBItem requires segmentNumber value to be int")
+        if batchedData is not None and len(batchedData) > 0:
+            letsdata_assert(isinstance(batchedData, list), "invalid batchedData - DynamoDBTableItemReader.parseDynamoDBItem requires batchedData to be a list")
+            letsdata_assert(data is None or len(data) == 0, "invalid data - DynamoDBTableItemReader.parseDynamoDBItem requires empty data dictionary when batchedData is specified")
+            return BatchedServiceRequest(requestId, letsDataAuth, interfaceName, functionName, batchedData, lambda batchItem: getDynamoDBTableItemReaderServiceRequest(requestId, letsDataAuth, interfaceName, functionName, batchItem, None))
         
-        letsdata_assert(not data['data'] is None, "invalid data['data'] - None - DynamoDBTableItemReader.parseDynamoDBItem requires data keys [tableName,segmentNumber,data]")
-        letsdata_assert(isinstance(data['data'], dict) and len(data['data']) == 2, "invalid data['data'] - DynamoDBTableItemReader.parseDynamoDBItem requires data['data'] keys [keys, item]")
-
-        letsdata_assert(not data['data']['keys'] is None, "invalid data['data']['keys'] - None - DynamoDBTableItemReader.parseDynamoDBItem requires data keys [tableName,segmentNumber,data]")
-        letsdata_assert(isinstance(data['data']['keys'], dict) and len(data['data']) > 0, "invalid data['data']['keys'] - DynamoDBTableItemReader.parseDynamoDBItem requires data['data'] keys [keys, item]")
-
-        letsdata_assert(not data['data']['item'] is None, "invalid data['data']['item'] - None - DynamoDBTableItemReader.parseDynamoDBItem requires data keys [tableName,segmentNumber,data]")
-        letsdata_assert(isinstance(data['data']['item'], dict), "invalid data['data']['item'] - DynamoDBTableItemReader.parseDynamoDBItem requires data['data'] keys [keys, item]")
-
+        validateParseDynamoDBItemData(data)
         return DynamoDBTableItemReaderService_ParseDynamoDBItem(requestId, letsDataAuth, interfaceName, functionName, data['tableName'], data['segmentNumber'], data['data']['keys'],data['data']['item'])
     else:
         raise(Exception("Unknown functionName"))
     
-    
\ No newline at end of file
@@ -1,57 +1,260 @@
-
+import base64
 from letsdata_utils.logging_utils import logger
-from letsdata_service.Service import ServiceRequest, LetsDataAuthParams, InterfaceNames
-from letsdata_utils.validations import letsdata_assert
+from letsdata_utils.kinesis_utils import deaggregateRecord
+from letsdata_utils.request_utils import getExceptionObject
+from letsdata_utils.dedup_cache import DedupCache, DEDUP_KEY_SEQUENCE_NUMBER, DEDUP_KEY_DOCUMENT_ID
+from letsdata_service.Service import ServiceRequest, BatchedServiceRequest, LetsDataAuthParams, InterfaceNames
+from letsdata_service.TumblingWindow import TumblingWindow
+from letsdata_utils.validations import letsdata_assert, compileRequestSchema, SchemaField
 from letsdata_interfaces.readers.kinesis.KinesisRecordReader import KinesisRecordReader
-    
+
+DATA_ENCODING_UTF8 = "utf-8"
+DATA_ENCODING_BASE64 = "base64"
+
+def getDataBytes(data : str, dataEncoding : str) -> bytearray:
+    if dataEncoding is None or dataEncoding == DATA_ENCODING_UTF8:
+        return bytearray(data, encoding="utf-8")
+    elif dataEncoding == DATA_ENCODING_BASE64:
+        return bytearray(base64.b64decode(data))
+    else:
+        raise(Exception("KinesisRecordReader - invalid dataEncoding - expected: "+DATA_ENCODING_UTF8+"|"+DATA_ENCODING_BASE64+", actual: "+str(dataEncoding)))
+
+'''
+    The record data can be sent as utf-8 text (default) or as base64 (dataEncoding: base64) for binary records such as the KPL aggregated records.
+
+    A KPL aggregated record is de-aggregated and the user records are passed to the reader's parseAggregatedMessage. The response for an aggregated record is:
+    {
+        "sequenceNumber": "sequenceNumber",
+        "aggregated": true,
+        "records": [
+            {
+                "subSequenceNumber": 0,
+                "partitionKey": "partitionKey",
+                "explicitHashKey": "explicitHashKey",
+                "result": <ParseDocumentResult>
+            },
+            ...
+        ]
+    }
+    The response for a record that is not aggregated is the parseMessage ParseDocumentResult.
+
+    With the reader's deduplication cache (getDeduplicationCache), a record whose sequenceNumber has already been processed by the container is returned as a 
+    SkipDoc ParseDocumentResult (for the aggregated records as well) and a duplicate documentId's result is replaced with a SkipDoc ParseDocumentResult.
+'''
 class KinesisRecordReader_ParseMessage(ServiceRequest):
-    def __init__(self, requestId: str, letsDataAuth: LetsDataAuthParams, interfaceName : InterfaceNames, functionName : str, streamArn : str, shardId : str, partitionKey : str, sequenceNumber : str, approximateArrivalTimestamp : int, data : str) -> None: 
+    def __init__(self, requestId: str, letsDataAuth: LetsDataAuthParams, interfaceName : InterfaceNames, functionName : str, streamArn : str, shardId : str, partitionKey : str, sequenceNumber : str, approximateArrivalTimestamp : int, data : str, dataEncoding : str = None) -> None: 
         super().__init__(requestId, letsDataAuth, interfaceName, functionName)
         self.streamArn = streamArn
         self.shardId = shardId
         self.partitionKey = partitionKey
         self.sequenceNumber = sequenceNumber
         self.approximateArrivalTimestamp = approximateArrivalTimestamp
-        dataBytes = bytearray(data, encoding="utf-8")
-        self.byteArr = dataBytes
+        self.byteArr = getDataBytes(data, dataEncoding)
     
     def execute(self): 
-        parser = KinesisRecordReader()
-        return  parser.parseMessage(self.streamArn, self.shardId, self.partitionKey, self.sequenceNumber, self.approximateArrivalTimestamp, self.byteArr)
+        parser = self.getHandler(KinesisRecordReader)
+        dedupCache = parser.getDeduplicationCache()
+        dedupKey = None
+        if dedupCache is not None:
+            letsdata_assert(dedupCache.getKeyType() in (DEDUP_KEY_SEQUENCE_NUMBER, DEDUP_KEY_DOCUMENT_ID), "invalid KinesisRecordReader DedupCache keyType - expected %s or %s, got %s", DEDUP_KEY_SEQUENCE_NUMBER, DEDUP_KEY_DOCUMENT_ID, dedupCache.getKeyType())
+            if dedupCache.getKeyType() == DEDUP_KEY_SEQUENCE_NUMBER:
+                # the sequence numbers are unique within a shard and the shard ids are reused across streams - the key is scoped to the stream and the shard
+                dedupKey = self.streamArn+":"+self.shardId+":"+self.sequenceNumber
+                if dedupCache.containsOrAdd(dedupKey):
+                    return dedupCache.getDuplicateResult(dedupKey, self.partitionKey)
+
+        try:
+            return self.parseRecord(parser, dedupCache)
+        except Exception:
+            if dedupKey is not None:
+                dedupCache.remove(dedupKey)
+            raise
+
+    def parseRecord(self, parser : KinesisRecordReader, dedupCache : DedupCache):
+        userRecords = deaggregateRecord(self.byteArr, self.partitionKey)
+        if userRecords is None:
+            result = parser.parseMessage(self.streamArn, self.shardId, self.partitionKey, self.sequenceNumber, self.approximateArrivalTimestamp, self.byteArr)
+            return result if dedupCache is None else dedupCache.deduplicateResult(result)
+
+        results = parser.parseAggregatedMessage(self.streamArn, self.shardId, self.sequenceNumber, self.approximateArrivalTimestamp, userRecords)
+        letsdata_assert(results is not None and len(results) == len(userRecords), "parseAggregatedMessage should return a result for each user record - expected: %s, actual: %s", len(userRecords), None if results is None else len(results))
+        if dedupCache is not None:
+            results = [dedupCache.deduplicateResult(result) for result in results]
+        return {
+            "sequenceNumber": self.sequenceNumber,
+            "aggregated": True,
+            "records": [{
+                "subSequenceNumber": userRecord.getSubSequenceNumber(),
+                "partitionKey": userRecord.getPartitionKey(),
+                "explicitHashKey": userRecord.getExplicitHashKey(),
+                "result": result
+            } for userRecord, result in zip(userRecords, results)]
+        }
+
+'''
+    Processes a batch of records from a shard in the sequence number order and stops at the first record that fails (throws an exception) so that the platform can checkpoint 
+    the processed records and retry only the unprocessed tail. The records' results (ParseDocumentResult, including error docs) are returned with the checkpoint:
+    {
+        "shardId": "shardId",
+        "results": [
+            {
+                "sequenceNumber": "sequenceNumber",
+                "result": <parseMessage response>
+            },
+            ...
+        ],
+        "checkpointSequenceNumber": "the highest fully processed sequenceNumber (null if no record was processed)",
+        "failedSequenceNumber": "the failed record's sequenceNumber (null if all the records were processed)",
+        "errorMessage": "error message",
+        "exception": { "errorMessage": "...", "errorType": "...", "stackTrace": "..." },
+        "unprocessedSequenceNumbers": ["the failed record and the records after it, in the sequence number order"]
+    }
+'''
+class KinesisRecordReader_ParseMessages(ServiceRequest):
+    def __init__(self, requestId: str, letsDataAuth: LetsDataAuthParams, interfaceName : InterfaceNames, functionName : str, streamArn : str, shardId : str, records : list) -> None: 
+        super().__init__(requestId, letsDataAuth, interfaceName, functionName)
+        self.streamArn = streamArn
+        self.shardId = shardId
+        # the kinesis sequence numbers are decimal strings that increase within a shard
+        self.records = sorted(records, key=lambda record: int(record['sequenceNumber']))
+
+    def execute(self): 
+        results = []
+        response = {
+            "shardId": self.shardId,
+            "results": results,
+            "checkpointSequenceNumber": None,
+            "failedSequenceNumber": None,
+            "errorMessage": None,
+            "exception": None,
+            "unprocessedSequenceNumbers": []
+        }
+        for index in range(0, len(self.records)):
+            record = self.records[index]
+            try:
+                recordRequest = KinesisRecordReader_ParseMessage(self.requestId, self.letsDataAuth, self.interfaceName, "parseMessage", self.streamArn, self.shardId, record['partitionKey'], record['sequenceNumber'], record['approximateArrivalTimestamp'], record['data'], record.get('dataEncoding'))
+                results.append({"sequenceNumber": record['sequenceNumber'], "result": recordRequest.execute()})
+                response["checkpointSequenceNumber"] = record['sequenceNumber']
+            except Exception as err:
+                logger.error("parseMessages stopped at the failed record - requestId: "+str(self.requestId)+", shardId: "+str(self.shardId)+", sequenceNumber: "+str(record['sequenceNumber'])+", err: "+str(err))
+                response["failedSequenceNumber"] = record['sequenceNumber']
+                response["errorMessage"] = str(err)
+                response["exception"] = getExceptionObject(err)
+                response["unprocessedSequenceNumbers"] = [unprocessedRecord['sequenceNumber'] for unprocessedRecord in self.records[index:]]
+                break
+        return response
+
+'''
+    Aggregates a batch of records from a shard (in the sequence number order) into the reader's tumbling windows (see KinesisRecordReader.getAggregationWindowSeconds).
+    The windowState is the open window's serialized state from the previous invocation's response (null for the first invocation) and the optional currentTimestamp
+    (approximateArrivalTimestamp units) closes the open window if it has expired. The windows that close are emitted as aggregate documents:
+    {
+        "documents": [<aggregate Document>, ...],
+        "closedWindows": [{"windowStartTimestamp": ..., "windowEndTimestamp": ..., "keyCount": ...}, ...],
+        "windowState": "the open window's serialized state - send with the next invocation",
+        "checkpointSequenceNumber": "the last aggregated sequenceNumber"
+    }
+    The invocation fails as a whole on an exception - the batch is then retried with the previous windowState.
+'''
+class KinesisRecordReader_AggregateMessages(ServiceRequest):
+    def __init__(self, requestId: str, letsDataAuth: LetsDataAuthParams, interfaceName : InterfaceNames, functionName : str, streamArn : str, shardId : str, records : list, windowState : str, currentTimestamp : int) -> None: 
+        super().__init__(requestId, letsDataAuth, interfaceName, functionName)
+        self.streamArn = streamArn
+        self.shardId = shardId
+        self.records = sorted(records, key=lambda record: int(record['sequenceNumber']))
+        self.windowState = windowState
+        self.currentTimestamp = currentTimestamp
+
+    def execute(self): 
+        parser = self.getHandler(KinesisRecordReader)
+        window = TumblingWindow(parser.getAggregationWindowSeconds(), 1000, self.windowState)
+        checkpointSequenceNumber = None
+        for record in self.records:
+            windowState = window.getWindowState(record['approximateArrivalTimestamp'])
+            data = getDataBytes(record['data'], record.get('dataEncoding'))
+            userRecords = deaggregateRecord(data, record['partitionKey'])
+            if userRecords is None:
+                parser.aggregateMessage(windowState, self.streamArn, self.shardId, record['partitionKey'], record['sequenceNumber'], record['approximateArrivalTimestamp'], data)
+            else:
+                for userRecord in userRecords:
+                    parser.aggregateMessage(windowState, self.streamArn, self.shardId, userRecord.getPartitionKey(), record['sequenceNumber'], record['approximateArrivalTimestamp'], userRecord.getData())
+            checkpointSequenceNumber = record['sequenceNumber']
+        if self.currentTimestamp is not None:
+            window.closeIfExpired(self.currentTimestamp)
+        return window.getResponse(parser.emitAggregateDocuments, checkpointSequenceNumber)
+
+KinesisRecordReaderInterfaceNames = frozenset(["parseMessage", "parseMessages", "aggregateMessages"])
+
+validateParseMessageData = compileRequestSchema("KinesisRecordReader.parseMessage", [
+    SchemaField("streamArn", str),
+    SchemaField("shardId", str),
+    SchemaField("partitionKey", str),
+    SchemaField("sequenceNumber", str),
+    SchemaField("approximateArrivalTimestamp", int),
+    SchemaField("data", str),
+    SchemaField("dataEncoding", str, required=False)
+])
+
+validateParseMessagesData = compileRequestSchema("KinesisRecordReader.parseMessages", [
+    SchemaField("streamArn", str),
+    SchemaField("shardId", str),
+    SchemaField("records", list)
+])
+
+validateParseMessagesRecord = compileRequestSchema("KinesisRecordReader.parseMessages", [
+    SchemaField("partitionKey", str),
+    SchemaField("sequenceNumber", str),
+    SchemaField("approximateArrivalTimestamp", int),
+    SchemaField("data", str),
+    SchemaField("dataEncoding", str, required=False)
+])
+
+validateAggregateMessagesData = compileRequestSchema("KinesisRecordReader.aggregateMessages", [
+    SchemaField("streamArn", str),
+    SchemaField("shardId", str),
+    SchemaField("records", list),
+    SchemaField("windowState", str, required=False, nullable=True),
+    SchemaField("currentTimestamp", int, required=False, nullable=True)
+])
+
+'''
+    Validates the parseMessages / aggregateMessages records - reports the violations of all the records.
+'''
+def validateRecords(records : list) -> None:
+    violations = []
+    for index in range(0, len(records)):
+        recordViolations = validateParseMessagesRecord.getViolations(records[index], "records["+str(index)+"].")
+        if recordViolations is None and not records[index]['sequenceNumber'].isdigit():
+            recordViolations = ["invalid records["+str(index)+"].sequenceNumber - KinesisRecordReader requires a numeric sequenceNumber, got "+records[index]['sequenceNumber']]
+        if recordViolations is not None:
+            violations += recordViolations
+    letsdata_assert(len(violations) == 0, "%s", "; ".join(violations))
 
 def getKinesisRecordReaderServiceRequest(requestId : str, letsDataAuth: LetsDataAuthParams, interfaceName : InterfaceNames, functionName : str, data : {}, batchedData : []):
-    letsdata_assert(interfaceName == InterfaceNames.KinesisRecordReader, "invalid interfaceName - expected KinesisRecordReader, got "+str(interfaceName))
+    letsdata_assert(interfaceName == InterfaceNames.KinesisRecordReader, "invalid interfaceName - expected KinesisRecordReader, got %s", interfaceName)
     letsdata_assert(letsDataAuth is not None, "invalid letsDataAuth - None")
-    
-    KinesisRecordReaderInterfaceNames = set(["parseMessage"])    
 
     if functionName not in KinesisRecordReaderInterfaceNames:
-            raise(Exception("lambda event - invalid functionName "+functionName+" for interface KinesisRecordReader"))
+            raise(Exception("lambda event - invalid functionName "+str(functionName)+" for interface KinesisRecordReader"))
     
     if functionName == "parseMessage":
-        letsdata_assert(batchedData is None or len(batchedData) == 0, "invalid data - KinesisRecordReader.parseMessage requires empty batchedData dictionary")
-        letsdata_assert(isinstance(data, dict) and len(data) == 6, "invalid data - KinesisRecordReader.parseMessage requires data keys [streamArn, shardId, partitionKey, sequenceNumber, approximateArrivalTimestamp, data]")
+        if batchedData is not None and len(batchedData) > 0:
+            letsdata_assert(isinstance(batchedData, list), "invalid batchedData - KinesisRecordReader.parseMessage requires batchedData to be a list")
+            letsdata_assert(data is None or len(data) == 0, "invalid data - KinesisRecordReader.parseMessage requires empty data dictionary when batchedData is specified")
+            return BatchedServiceRequest(requestId, letsDataAuth, interfaceName, functionName, batchedData, lambda batchItem: getKinesisRecordReaderServiceRequest(requestId, letsDataAuth, interfaceName, functionName, batchItem, None))
         
-        letsdata_assert(not data['streamArn'] is None, "invalid streamArn - None - KinesisRecordReader.parseMessage requires data keys [streamArn, shardId, partitionKey, sequenceNumber, approximateArrivalTimestamp, data]")
-        letsdata_assert(isinstance(data['streamArn'], str), "invalid streamArn - KinesisRecordReader.parseMessage requires streamArn value to be string")
-
-        letsdata_assert(not data['shardId'] is None, "invalid shardId - None - KinesisRecordReader.parseMessage requires data keys [streamArn, shardId, partitionKey, sequenceNumber, approximateArrivalTimestamp, data]")
-        letsdata_assert(isinstance(data['shardId'], str), "invalid shardId - KinesisRecordReader.parseMessage requires shardId value to be string")
-
-        letsdata_assert(not data['partitionKey'] is None, "invalid partitionKey - None - KinesisRecordReader.parseMessage requires data keys [streamArn, shardId, partitionKey, sequenceNumber, approximateArrivalTimestamp, data]")
-        letsdata_assert(isinstance(data['partitionKey'], str), "invalid partitionKey - KinesisRecordReader.parseMessage requires partitionKey value to be string")
-
-        letsdata_assert(not data['sequenceNumber'] is None, "invalid sequenceNumber - None - KinesisRecordReader.parseMessage requires data keys [streamArn, shardId, partitionKey, sequenceNumber, approximateArrivalTimestamp, data]")
-        letsdata_assert(isinstance(data['sequenceNumber'], str), "invalid sequenceNumber - KinesisRecordReader.parseMessage requires sequenceNumber value to be string")
-
-        letsdata_assert(not data['approximateArrivalTimestamp'] is None, "invalid offsetBytes - None - SingleFileParser.parseMessage requires data keys [streamArn, shardId, partitionKey, sequenceNumber, approximateArrivalTimestamp, data]")
-        letsdata_assert(isinstance(data['approximateArrivalTimestamp'], int), "invalid approximateArrivalTimestamp - SingleFileParser.parseMessage requires approximateArrivalTimestamp value to be int")
-        
-        letsdata_assert(not data['data'] is None, "invalid data - None - KinesisRecordReader.parseMessage requires data keys [streamArn, shardId, partitionKey, sequenceNumber, approximateArrivalTimestamp, data]")
-        letsdata_assert(isinstance(data['data'], str), "invalid data - KinesisRecordReader.parseMessage requires data value to be str")
-
-        return KinesisRecordReader_ParseMessage(requestId, letsDataAuth, interfaceName, functionName, data['streamArn'], data['shardId'], data['partitionKey'], data['sequenceNumber'], data['approximateArrivalTimestamp'], data['data'])
+        validateParseMessageData(data)
+        return KinesisRecordReader_ParseMessage(requestId, letsDataAuth, interfaceName, functionName, data['streamArn'], data['shardId'], data['partitionKey'], data['sequenceNumber'], data['approximateArrivalTimestamp'], data['data'], data.get('dataEncoding'))
+    elif functionName == "parseMessages":
+        letsdata_assert(batchedData is None or len(batchedData) == 0, "invalid data - KinesisRecordReader.parseMessages requires empty batchedData dictionary")
+        validateParseMessagesData(data)
+        validateRecords(data['records'])
+        return KinesisRecordReader_ParseMessages(requestId, letsDataAuth, interfaceName, functionName, data['streamArn'], data['shardId'], data['records'])
+    elif functionName == "aggregateMessages":
+        letsdata_assert(batchedData is None or len(batchedData) == 0, "invalid data - KinesisRecordReader.aggregateMessages requires empty batchedData dictionary")
+        validateAggregateMessagesData(data)
+        validateRecords(data['records'])
+        return KinesisRecordReader_AggregateMessages(requestId, letsDataAuth, interfaceName, functionName, data['streamArn'], data['shardId'], data['records'], data.get('windowState'), data.get('currentTimestamp'))
     else:
         raise(Exception("Unknown functionName"))
     
-    
\ No newline at end of file
@@ -0,0 +1,405 @@
+import os, mmap, gzip, time, traceback, multiprocessing
+from multiprocessing.connection import wait
+from letsdata_utils.logging_utils import logger
+from letsdata_utils.validations import letsdata_assert
+from letsdata_utils.request_utils import getExceptionObject
+from letsdata_utils.gzip_index import getGzipIndex, openGzipAt
+from letsdata_service.RecordSplitter import RecordSplitter, RecordParseHints, NEED_MORE_DATA, NO_MORE_RECORDS
+from letsdata_interfaces.readers.parsers.SingleFileParser import SingleFileParser
+
+'''
+    The local file reader drives a SingleFileParser implementation end to end on local files - the same way #LetsData reads the S3 files remotely.
+    This is useful to measure and tune the parser's throughput against real files before deploying. For example:
+
+        reader = LocalSingleFileReader(MyParser(), rootDirectory="/data/commoncrawl")
+        stats = reader.run("crawl-data/CC-MAIN-2023-50/segments/1700679099281.67/wet/CC-MAIN-20231128083443-20231128113443-00000.warc.wet.gz\n...")
+        print(stats.getRecordsPerSecond(), stats.getBytesPerSecond())
+
+    For each file in the manifest, the reader:
+        * resolves the file name using the parser's getResolvedS3FileName and reads the file from the root directory
+        * splits the file into records using the parser's getRecordStartPattern / getRecordEndPattern hints
+        * calls parseDocument for each record with the record's offsetBytes (the uncompressed offset of the record in the file)
+
+    The record hints are interpreted as follows:
+        * PATTERN start hint - the record starts at the next occurrence of the pattern
+        * PATTERN end hint - the record ends after the next occurrence of the pattern (or at the end of the file for the last record)
+        * OFFSET start hint - the record starts offset bytes after the previous record's end (the first record starts offset bytes into the file)
+        * OFFSET end hint - the record is offset bytes long
+
+    Uncompressed files are memory mapped and each record is passed to parseDocument as a range in the mapped file (no copy). Gzip files (.gz) are
+    decompressed as a stream into a buffer that is reused - parseDocument should not keep a reference to the byteArr after it returns.
+
+    runParallel runs the files across a pool of worker processes (one per available core by default) - each worker creates its own parser instance.
+    Files are split into byte ranges when the record boundaries can be found from any offset (a PATTERN start hint, or OFFSET start and end hints),
+    a range reads the records that start in the range. The results are merged in the manifest / file offset order.
+
+    Gzip files are read by byte range (uncompressed offsets) using the gzip member index (see letsdata_utils.gzip_index) - multi member files (such as the CommonCrawl
+    .warc.gz files) are split at the member boundaries and reparseRecords can re-read only the failed records (the ErrorDoc's errorStartoffsetMap offsets).
+    The index is built on first use and saved next to the file.
+
+    Fixed width records (OFFSET start and end hints) in uncompressed files are cut into batches of records using numpy strided views over the mapped file and
+    passed to the parser's parseDocuments batch function when the parser opts in (see SingleFileParser.isParseDocumentsEnabled).
+'''
+
+class LocalSingleFileReaderStats:
+    def __init__(self) -> None:
+        self.files = 0
+        self.records = 0
+        self.bytes = 0
+        self.statusCounts = {}
+        self.parseSeconds = 0.0
+        self.elapsedSeconds = 0.0
+
+    def add(self, other : 'LocalSingleFileReaderStats') -> None:
+        self.files += other.files
+        self.records += other.records
+        self.bytes += other.bytes
+        self.parseSeconds += other.parseSeconds
+        for status, count in other.statusCounts.items():
+            self.statusCounts[status] = self.statusCounts.get(status, 0) + count
+
+    def getRecordsPerSecond(self) -> float:
+        return self.records / self.elapsedSeconds if self.elapsedSeconds > 0 else 0.0
+
+    def getBytesPerSecond(self) -> float:
+        return self.bytes / self.elapsedSeconds if self.elapsedSeconds > 0 else 0.0
+
+    def __str__(self) -> str:
+        return "files: "+str(self.files)+", records: "+str(self.records)+", bytes: "+str(self.bytes)+", statusCounts: "+str(self.statusCounts)+ \
+            ", elapsedSeconds: "+str(round(self.elapsedSeconds, 3))+", parseSeconds: "+str(round(self.parseSeconds, 3))+ \
+            ", recordsPerSecond: "+str(round(self.getRecordsPerSecond(), 1))+", bytesPerSecond: "+str(round(self.getBytesPerSecond(), 1))
+
+class LocalSingleFileReader:
+    def __init__(self, parser : SingleFileParser = None, rootDirectory : str = "", readChunkBytes : int = 4 * 1024 * 1024, fixedWidthBatchRecords : int = 4096) -> None:
+        if parser is None:
+            parser = SingleFileParser()
+            parser.initialize()
+            parser.warmup()
+        self.parser = parser
+        self.rootDirectory = rootDirectory
+        self.readChunkBytes = readChunkBytes
+        self.fixedWidthBatchRecords = fixedWidthBatchRecords
+        self.gzipIndexes = {}
+        self.recordParseHints = {}
+
+    '''
+        The manifest is either the manifest file contents (file names separated by new lines) or a list of file names.
+    '''
+    @staticmethod
+    def getManifestFileNames(manifest) -> list:
+        if isinstance(manifest, str):
+            manifest = manifest.split("\n")
+        return [fileName.strip() for fileName in manifest if fileName is not None and len(fileName.strip()) > 0]
+
+    '''
+        The parser's compiled record hints are cached per s3FileType for the reader's runs.
+    '''
+    def getRecordSplitter(self, s3FileType : str) -> RecordSplitter:
+        hints = self.recordParseHints.get(s3FileType)
+        if hints is None:
+            hints = RecordParseHints(s3FileType, self.parser.getRecordStartPattern(s3FileType), self.parser.getRecordEndPattern(s3FileType))
+            self.recordParseHints[s3FileType] = hints
+        return hints.getSplitter()
+
+    def getLocalPath(self, resolvedFileName : str) -> str:
+        return os.path.join(self.rootDirectory, resolvedFileName) if self.rootDirectory else resolvedFileName
+
+    def getGzipIndex(self, localPath : str) -> dict:
+        index = self.gzipIndexes.get(localPath)
+        if index is None:
+            index = getGzipIndex(localPath)
+            self.gzipIndexes[localPath] = index
+        return index
+
+    '''
+        Reads all the files in the manifest. onResult(fileName, offsetBytes, parseDocumentResult) is called for each record if specified. Returns the stats for the run.
+    '''
+    def run(self, manifest, onResult = None) -> LocalSingleFileReaderStats:
+        stats = LocalSingleFileReaderStats()
+        startTime = time.perf_counter()
+        s3FileType = self.parser.getS3FileType()
+        splitter = self.getRecordSplitter(s3FileType)
+        for fileName in self.getManifestFileNames(manifest):
+            resolvedFileName = self.parser.getResolvedS3FileName(s3FileType, fileName)
+            self.readFile(s3FileType, resolvedFileName, splitter, stats, onResult)
+        stats.elapsedSeconds = time.perf_counter() - startTime
+        logger.debug("LocalSingleFileReader run complete - "+str(stats))
+        return stats
+
+    '''
+        Reads the records that start in the file's [rangeStart, rangeEnd) byte range (the complete file by default).
+    '''
+    def readFile(self, s3FileType : str, resolvedFileName : str, splitter : RecordSplitter, stats : LocalSingleFileReaderStats, onResult = None, rangeStart : int = 0, rangeEnd : int = None) -> None:
+        localPath = self.getLocalPath(resolvedFileName)
+        if rangeStart == 0:
+            stats.files += 1
+        if localPath.endswith(".gz"):
+            if rangeStart == 0 and rangeEnd is None:
+                self.readStream(s3FileType, resolvedFileName, gzip.open(localPath, "rb"), splitter, stats, onResult)
+                return
+            index = self.getGzipIndex(localPath)
+            rangeStart = splitter.getRangeStartPosition(rangeStart)
+            if rangeStart < index["uncompressedSize"]:
+                self.readStream(s3FileType, resolvedFileName, openGzipAt(localPath, index, rangeStart), splitter, stats, onResult, rangeStart, rangeEnd)
+        elif os.path.getsize(localPath) > 0:
+            with open(localPath, "rb") as file:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mappedFile:
+                    position = splitter.getRangeStartPosition(rangeStart)
+                    if splitter.stride is not None and self.isBatchParser():
+                        position = self.parseFixedWidthRecords(s3FileType, resolvedFileName, mappedFile, position, splitter, stats, onResult, rangeEnd)
+                    self.parseRecords(s3FileType, resolvedFileName, mappedFile, position, len(mappedFile), 0, True, splitter, stats, onResult, rangeEnd)
+
+    '''
+        Whether the parser opts in to the parseDocuments batch function (SingleFileParser.isParseDocumentsEnabled).
+    '''
+    def isBatchParser(self) -> bool:
+        isParseDocumentsEnabled = getattr(self.parser, "isParseDocumentsEnabled", None)
+        return isParseDocumentsEnabled is not None and isParseDocumentsEnabled()
+
+    '''
+        Parses the complete fixed width records whose slots start in the [position, rangeEnd) range in batches using the parser's parseDocuments. The batch's records are a
+        (records x record length) numpy strided view over the mapped file. Returns the position after the last parsed record - a trailing partial record is parsed by parseRecords.
+    '''
+    def parseFixedWidthRecords(self, s3FileType : str, resolvedFileName : str, mappedFile, position : int, splitter : RecordSplitter, stats : LocalSingleFileReaderStats, onResult = None, rangeEnd : int = None) -> int:
+        import numpy
+        from numpy.lib.stride_tricks import as_strided
+
+        fileSize = len(mappedFile)
+        limit = fileSize if rangeEnd is None else min(rangeEnd, fileSize)
+        stride = splitter.stride
+        recordLength = splitter.endOffset
+        if position >= limit:
+            return position
+        recordCount = min((limit - position + stride - 1) // stride, (fileSize - position) // stride)
+
+        fileArray = numpy.frombuffer(mappedFile, dtype=numpy.uint8)
+        try:
+            for batchStart in range(0, recordCount, self.fixedWidthBatchRecords):
+                batchCount = min(self.fixedWidthBatchRecords, recordCount - batchStart)
+                batchOffset = position + batchStart * stride + splitter.startOffset
+                records = as_strided(fileArray[batchOffset:], shape=(batchCount, recordLength), strides=(stride, 1), writeable=False)
+                parseStartTime = time.perf_counter()
+                try:
+                    results = self.parser.parseDocuments(s3FileType, resolvedFileName, batchOffset, stride, records)
+                except Exception as err:
+                    # the traceback's parser frames hold views of the records - clear them so that the file can be unmapped and the parser's exception is not masked by a BufferError
+                    traceback.clear_frames(err.__traceback__)
+                    raise
+                finally:
+                    del records
+                stats.parseSeconds += time.perf_counter() - parseStartTime
+                letsdata_assert(results is not None and len(results) == batchCount, "parseDocuments should return a result for each record - expected: %s, actual: %s", batchCount, None if results is None else len(results))
+                for index in range(0, batchCount):
+                    self.addResult(stats, resolvedFileName, batchOffset + index * stride, recordLength, results[index], onResult)
+        finally:
+            # the numpy views should be released before the file is unmapped
+            del fileArray
+        return position + recordCount * stride
+
+    '''
+        Reads the records from the decompressed stream. The stream starts at the streamFileOffset (uncompressed) file offset.
+    '''
+    def readStream(self, s3FileType : str, resolvedFileName : str, stream, splitter : RecordSplitter, stats : LocalSingleFileReaderStats, onResult = None, streamFileOffset : int = 0, rangeEnd : int = None) -> None:
+        buffer = bytearray()
+        bufferFileOffset = streamFileOffset
+        eof = False
+        with stream:
+            while not eof:
+                chunk = stream.read(self.readChunkBytes)
+                eof = len(chunk) == 0
+                buffer += chunk
+                position, isComplete = self.parseRecords(s3FileType, resolvedFileName, buffer, 0, len(buffer), bufferFileOffset, eof, splitter, stats, onResult, rangeEnd)
+                if isComplete:
+                    break
+                # drop the parsed records from the buffer
+                del buffer[:position]
+                bufferFileOffset += position
+
+    '''
+        Parses the records in buffer[position:end] and returns the (position, isComplete) tuple - the position after the last parsed record, and whether there are no
+        more records to read (end of file or end of range). bufferFileOffset is the file offset of buffer[0].
+        When rangeEnd is specified, the records that are assigned to offsets >= rangeEnd are not parsed (they are read by the next byte range).
+    '''
+    def parseRecords(self, s3FileType : str, resolvedFileName : str, buffer, position : int, end : int, bufferFileOffset : int, eof : bool, splitter : RecordSplitter, stats : LocalSingleFileReaderStats, onResult = None, rangeEnd : int = None) -> tuple:
+        parser = self.parser
+        while True:
+            record = splitter.findRecord(buffer, position, end, eof)
+            if record == NEED_MORE_DATA:
+                return (position, False)
+            if record == NO_MORE_RECORDS:
+                return (end, True)
+            recordStart, recordEnd = record
+            if rangeEnd is not None and bufferFileOffset + splitter.getRecordSlotStart(position, recordStart) >= rangeEnd:
+                return (position, True)
+            parseStartTime = time.perf_counter()
+            result = parser.parseDocument(s3FileType, resolvedFileName, bufferFileOffset + recordStart, buffer, recordStart, recordEnd)
+            stats.parseSeconds += time.perf_counter() - parseStartTime
+            self.addResult(stats, resolvedFileName, bufferFileOffset + recordStart, recordEnd - recordStart, result, onResult)
+            position = recordEnd
+
+    def addResult(self, stats : LocalSingleFileReaderStats, resolvedFileName : str, offsetBytes : int, recordBytes : int, result, onResult = None) -> None:
+        stats.records += 1
+        stats.bytes += recordBytes
+        status = result.getStatus() if result is not None else None
+        status = status.value if hasattr(status, "value") else str(status)
+        stats.statusCounts[status] = stats.statusCounts.get(status, 0) + 1
+        if onResult is not None:
+            onResult(resolvedFileName, offsetBytes, result)
+
+    '''
+        Re-reads only the records at the offsetBytes in the file - for example, the failed records' offsets from the ErrorDoc's errorStartoffsetMap. Gzip files are read
+        from the member that contains each offset (see letsdata_utils.gzip_index). onResult(fileName, offsetBytes, parseDocumentResult) is called for each record if specified.
+    '''
+    def reparseRecords(self, fileName : str, offsetBytesList : list, onResult = None) -> LocalSingleFileReaderStats:
+        stats = LocalSingleFileReaderStats()
+        startTime = time.perf_counter()
+        s3FileType = self.parser.getS3FileType()
+        splitter = self.getRecordSplitter(s3FileType)
+        resolvedFileName = self.parser.getResolvedS3FileName(s3FileType, fileName)
+        for offsetBytes in sorted(set(int(offsetBytes) for offsetBytes in offsetBytesList)):
+            # a single record range - the records are assigned to the range by their slot start
+            slotStart = splitter.getRecordSlotStart(offsetBytes - (splitter.startOffset or 0), offsetBytes)
+            self.readFile(s3FileType, resolvedFileName, splitter, stats, onResult, slotStart, slotStart + 1)
+        stats.elapsedSeconds = time.perf_counter() - startTime
+        return stats
+
+    '''
+        Splits the manifest files into work items (itemIndex, resolvedFileName, rangeStart, rangeEnd) in the manifest / file offset order. The file ranges are
+        rangeBytes long (uncompressed) - gzip files are split at the gzip member boundaries. rangeBytes defaults to splitting the total bytes into 4 ranges per worker (min 1 MB).
+    '''
+    def getWorkItems(self, manifest, splitter : RecordSplitter, rangeBytes : int = None, processes : int = 1, splitGzipFiles : bool = True) -> list:
+        s3FileType = self.parser.getS3FileType()
+        files = []
+        for fileName in self.getManifestFileNames(manifest):
+            resolvedFileName = self.parser.getResolvedS3FileName(s3FileType, fileName)
+            localPath = self.getLocalPath(resolvedFileName)
+            if not splitter.isSplittable() or (localPath.endswith(".gz") and not splitGzipFiles):
+                files.append((resolvedFileName, None, os.path.getsize(localPath)))
+            elif localPath.endswith(".gz"):
+                index = self.getGzipIndex(localPath)
+                files.append((resolvedFileName, [member[0] for member in index["members"]], index["uncompressedSize"]))
+            else:
+                files.append((resolvedFileName, None, os.path.getsize(localPath)))
+        if rangeBytes is None:
+            rangeBytes = max(1024 * 1024, sum(fileSize for resolvedFileName, splitOffsets, fileSize in files) // (processes * 4) + 1)
+
+        workItems = []
+        for resolvedFileName, splitOffsets, fileSize in files:
+            localPath = self.getLocalPath(resolvedFileName)
+            if splitOffsets is None:
+                splitOffsets = range(0, fileSize, rangeBytes) if splitter.isSplittable() and not localPath.endswith(".gz") else [0]
+            rangeStart = 0
+            for splitOffset in splitOffsets:
+                if splitOffset - rangeStart >= rangeBytes:
+                    workItems.append((len(workItems), resolvedFileName, rangeStart, splitOffset))
+                    rangeStart = splitOffset
+            workItems.append((len(workItems), resolvedFileName, rangeStart, None))
+        return workItems
+
+    '''
+        Reads all the files in the manifest across worker processes and returns the merged stats for the run. onResult(fileName, offsetBytes, parseDocumentResult) is
+        called (in the parent process, in the manifest / file offset order) for each record if specified - the results are sent from the workers so they should be picklable.
+
+        processes : the number of worker processes, defaults to the number of available cores
+        parserFactory : creates the worker's parser instance, defaults to the parser's class. The parser's initialize() and warmup() hooks are called in the worker.
+        rangeBytes : the (uncompressed) byte range size that the files are split into, defaults to splitting the total bytes into 4 ranges per worker (min 1 MB)
+        splitGzipFiles : whether the multi member gzip files are split into ranges - the gzip member index is built (and saved) for the files that do not have an index
+
+        The workers are processes connected by pipes (multiprocessing.Pool / Queue need /dev/shm semaphores which are not available on lambda).
+    '''
+    def runParallel(self, manifest, onResult = None, processes : int = None, parserFactory = None, rangeBytes : int = None, splitGzipFiles : bool = True) -> LocalSingleFileReaderStats:
+        stats = LocalSingleFileReaderStats()
+        startTime = time.perf_counter()
+        if processes is None:
+            processes = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+        if parserFactory is None:
+            parserFactory = type(self.parser)
+        splitter = self.getRecordSplitter(self.parser.getS3FileType())
+        workItems = self.getWorkItems(manifest, splitter, rangeBytes, processes, splitGzipFiles)
+        processes = max(1, min(processes, len(workItems)))
+
+        context = multiprocessing.get_context("fork") if "fork" in multiprocessing.get_all_start_methods() else multiprocessing.get_context()
+        workers = {}
+        for index in range(processes):
+            parentConnection, workerConnection = context.Pipe()
+            worker = context.Process(target=runParallelWorker, args=(workerConnection, parserFactory, self.rootDirectory, self.readChunkBytes, onResult is not None, self.gzipIndexes), daemon=True)
+            worker.start()
+            workerConnection.close()
+            workers[parentConnection] = worker
+
+        # the completed items are buffered until all the preceding items complete so that onResult is called in order
+        completedItems = {}
+        nextItemIndex = 0
+        nextResultIndex = 0
+        try:
+            for connection in workers.keys():
+                if nextItemIndex < len(workItems):
+                    connection.send(workItems[nextItemIndex])
+                    nextItemIndex += 1
+            while nextResultIndex < len(workItems):
+                for connection in wait(list(workers.keys())):
+                    try:
+                        itemIndex, itemStats, itemResults, exceptionObject = connection.recv()
+                    except EOFError:
+                        raise(Exception("LocalSingleFileReader worker exited unexpectedly - exitcode: "+str(workers[connection].exitcode)))
+                    if exceptionObject is not None:
+                        logger.error("LocalSingleFileReader worker failed - workItem: "+str(workItems[itemIndex])+", exception: "+str(exceptionObject))
+                        raise(Exception("LocalSingleFileReader worker failed for file "+workItems[itemIndex][1]+" - "+exceptionObject["errorMessage"]))
+                    if nextItemIndex < len(workItems):
+                        connection.send(workItems[nextItemIndex])
+                        nextItemIndex += 1
+                    completedItems[itemIndex] = (itemStats, itemResults)
+                while nextResultIndex in completedItems:
+                    itemStats, itemResults = completedItems.pop(nextResultIndex)
+                    stats.add(itemStats)
+                    if onResult is not None:
+                        for resolvedFileName, offsetBytes, result in itemResults:
+                            onResult(resolvedFileName, offsetBytes, result)
+                    nextResultIndex += 1
+        finally:
+            # the workers are stopped after all the items complete, or terminated on failure
+            for connection, worker in workers.items():
+                if nextResultIndex >= len(workItems):
+                    connection.send(None)
+                    worker.join()
+                else:
+                    worker.terminate()
+                connection.close()
+
+        stats.elapsedSeconds = time.perf_counter() - startTime
+        logger.debug("LocalSingleFileReader parallel run complete - processes: "+str(processes)+", workItems: "+str(len(workItems))+", "+str(stats))
+        return stats
+
+'''
+    The worker process loop for runParallel - creates the worker's own parser and reads the work items sent by the parent until it receives None.
+'''
+def runParallelWorker(connection, parserFactory, rootDirectory : str, readChunkBytes : int, collectResults : bool, gzipIndexes : dict) -> None:
+    try:
+        parser = parserFactory()
+        if hasattr(parser, "initialize"):
+            parser.initialize()
+        if hasattr(parser, "warmup"):
+            parser.warmup()
+        reader = LocalSingleFileReader(parser, rootDirectory, readChunkBytes)
+        reader.gzipIndexes = dict(gzipIndexes)
+        s3FileType = parser.getS3FileType()
+        splitter = reader.getRecordSplitter(s3FileType)
+    except Exception as err:
+        connection.send((connection.recv()[0], None, None, getExceptionObject(err)))
+        connection.close()
+        return
+
+    while True:
+        workItem = connection.recv()
+        if workItem is None:
+            break
+        itemIndex, resolvedFileName, rangeStart, rangeEnd = workItem
+        try:
+            stats = LocalSingleFileReaderStats()
+            results = [] if collectResults else None
+            onResult = (lambda fileName, offsetBytes, result: results.append((fileName, offsetBytes, result))) if collectResults else None
+            reader.readFile(s3FileType, resolvedFileName, splitter, stats, onResult, rangeStart, rangeEnd)
+            connection.send((itemIndex, stats, results, None))
+        except Exception as err:
+            connection.send((itemIndex, None, None, getExceptionObject(err)))
+    connection.close()
@@ -1,7 +1,10 @@
 
+from concurrent.futures import ThreadPoolExecutor
 from letsdata_utils.logging_utils import logger
-from letsdata_service.Service import ServiceRequest, LetsDataAuthParams, InterfaceNames
-from letsdata_utils.validations import letsdata_assert
+from letsdata_service.Service import ServiceRequest, BatchedServiceRequest, LetsDataAuthParams, InterfaceNames
+from letsdata_utils.validations import letsdata_assert, compileRequestSchema, SchemaField
+from letsdata_utils.request_utils import getExceptionObject
+from letsdata_utils.dedup_cache import DEDUP_KEY_MESSAGE_DEDUPLICATION_ID, DEDUP_KEY_DOCUMENT_ID
 from letsdata_interfaces.readers.sqs.QueueMessageReader import QueueMessageReader
     
 class QueueMessageReader_ParseMessage(ServiceRequest):
@@ -14,42 +17,162 @@ class QueueMessageReader_ParseMessage(ServiceRequest):
         self.messageBody = messageBody
     
     def execute(self): 
-        parser = QueueMessageReader()
-        return  parser.parseMessage(self.messageId, self.messageGroupId, self.messageDeduplicationId, self.messageAttributes, self.messageBody)
+        parser = self.getHandler(QueueMessageReader)
+        dedupCache = parser.getDeduplicationCache()
+        if dedupCache is None:
+            return  parser.parseMessage(self.messageId, self.messageGroupId, self.messageDeduplicationId, self.messageAttributes, self.messageBody)
+
+        letsdata_assert(dedupCache.getKeyType() in (DEDUP_KEY_MESSAGE_DEDUPLICATION_ID, DEDUP_KEY_DOCUMENT_ID), "invalid QueueMessageReader DedupCache keyType - expected %s or %s, got %s", DEDUP_KEY_MESSAGE_DEDUPLICATION_ID, DEDUP_KEY_DOCUMENT_ID, dedupCache.getKeyType())
+        dedupKey = None
+        if dedupCache.getKeyType() == DEDUP_KEY_MESSAGE_DEDUPLICATION_ID:
+            dedupKey = self.messageDeduplicationId if self.messageDeduplicationId is not None else self.messageId
+            # the key is checked and reserved atomically - the message groups are processed concurrently
+            if dedupCache.containsOrAdd(dedupKey):
+                return dedupCache.getDuplicateResult(dedupKey)
+        try:
+            result = parser.parseMessage(self.messageId, self.messageGroupId, self.messageDeduplicationId, self.messageAttributes, self.messageBody)
+        except Exception:
+            if dedupKey is not None:
+                dedupCache.remove(dedupKey)
+            raise
+        return dedupCache.deduplicateResult(result)
+
+'''
+    Processes a batch of messages and reports the partial batch failures so that only the failed messages are redelivered - a message that fails
+    (throws an exception) does not fail the rest of the batch. For the FIFO queues, the messages after a failed message in the same messageGroupId are not processed and
+    are reported as failures as well so that the group's order is preserved on redelivery. The messages of a messageGroupId are processed in order, and the different message groups
+    (and the messages without a messageGroupId) are processed concurrently on a thread pool when the reader's getMessageGroupConcurrency is greater than 1. The messages' results (ParseDocumentResult, including error docs) are returned
+    with the failures in the SQS partial batch response format:
+    {
+        "results": [
+            {
+                "messageId": "messageId",
+                "statusCode": "SUCCESS",
+                "result": <parseMessage response>
+            },
+            {
+                "messageId": "messageId",
+                "statusCode": "EXCEPTION",
+                "errorMessage": "error message",
+                "exception": { "errorMessage": "...", "errorType": "...", "stackTrace": "..." }
+            },
+            {
+                "messageId": "messageId",
+                "statusCode": "NOT_PROCESSED",          # a message after a failed message in the same messageGroupId
+                "errorMessage": "error message"
+            },
+            ...
+        ],
+        "batchItemFailures": [
+            {
+                "itemIdentifier": "the failed (and not processed) messageIds"
+            },
+            ...
+        ]
+    }
+'''
+class QueueMessageReader_ParseMessages(ServiceRequest):
+    def __init__(self, requestId: str, letsDataAuth: LetsDataAuthParams, interfaceName : InterfaceNames, functionName : str, messages : list) -> None: 
+        super().__init__(requestId, letsDataAuth, interfaceName, functionName)
+        self.messages = messages
+
+    def execute(self): 
+        # the messages of a messageGroupId are processed in order, in a single task - the messages without a messageGroupId (standard queues) are independent tasks
+        messageGroups = []
+        messageGroupIndexes = {}
+        for index in range(0, len(self.messages)):
+            messageGroupId = self.messages[index].get('messageGroupId')
+            if messageGroupId is None:
+                messageGroups.append([index])
+            elif messageGroupId in messageGroupIndexes:
+                messageGroupIndexes[messageGroupId].append(index)
+            else:
+                messageGroupIndexes[messageGroupId] = [index]
+                messageGroups.append(messageGroupIndexes[messageGroupId])
+
+        results = [None] * len(self.messages)
+        concurrency = min(self.getHandler(QueueMessageReader).getMessageGroupConcurrency(), len(messageGroups))
+        if concurrency <= 1:
+            for messageIndexes in messageGroups:
+                self.processMessageGroup(messageIndexes, results)
+        else:
+            executor = getMessageGroupExecutor(concurrency)
+            for future in [executor.submit(self.processMessageGroup, messageIndexes, results) for messageIndexes in messageGroups]:
+                future.result()
+        batchItemFailures = [{"itemIdentifier": result['messageId']} for result in results if result['statusCode'] != "SUCCESS"]
+        return {"results": results, "batchItemFailures": batchItemFailures}
+
+    '''
+        Processes a message group's messages in order - the messages after a failed message are not processed. The results are set at the messages' batch indexes.
+    '''
+    def processMessageGroup(self, messageIndexes : list, results : list) -> None:
+        failedMessageId = None
+        for index in messageIndexes:
+            message = self.messages[index]
+            messageGroupId = message.get('messageGroupId')
+            if failedMessageId is not None:
+                results[index] = {"messageId": message['messageId'], "statusCode": "NOT_PROCESSED", "errorMessage": "message not processed - an earlier message in the messageGroupId "+messageGroupId+" failed, messageId: "+failedMessageId}
+                continue
+            try:
+                messageRequest = QueueMessageReader_ParseMessage(self.requestId, self.letsDataAuth, self.interfaceName, "parseMessage", message['messageId'], messageGroupId, message.get('messageDeduplicationId'), message['messageAttributes'], message['messageBody'])
+                results[index] = {"messageId": message['messageId'], "statusCode": "SUCCESS", "result": messageRequest.execute()}
+            except Exception as err:
+                logger.error("parseMessages message failed - requestId: "+str(self.requestId)+", messageId: "+str(message['messageId'])+", messageGroupId: "+str(messageGroupId)+", err: "+str(err))
+                results[index] = {"messageId": message['messageId'], "statusCode": "EXCEPTION", "errorMessage": str(err), "exception": getExceptionObject(err)}
+                failedMessageId = message['messageId']
+
+'''
+    The thread pools for the concurrent message group processing - created once per container (for each concurrency) and reused across the invocations.
+'''
+messageGroupExecutors = {}
+
+def getMessageGroupExecutor(concurrency : int) -> ThreadPoolExecutor:
+    executor = messageGroupExecutors.get(concurrency)
+    if executor is None:
+        executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="letsdata-message-group")
+        messageGroupExecutors[concurrency] = executor
+        logger.debug("message group executor initialized - concurrency: "+str(concurrency))
+    return executor
+
+QueueMessageReaderInterfaceNames = frozenset(["parseMessage", "parseMessages"])
+
+validateParseMessageData = compileRequestSchema("QueueMessageReader.parseMessage", [
+    SchemaField("messageId", str),
+    SchemaField("messageGroupId", str, required=False),
+    SchemaField("messageDeduplicationId", str, required=False),
+    SchemaField("messageAttributes", dict),
+    SchemaField("messageBody", str)
+])
+
+validateParseMessagesData = compileRequestSchema("QueueMessageReader.parseMessages", [
+    SchemaField("messages", list)
+])
 
 def getQueueMessageReaderServiceRequest(requestId : str, letsDataAuth: LetsDataAuthParams, interfaceName : InterfaceNames, functionName : str, data : {}, batchedData : []):
-    letsdata_assert(interfaceName == InterfaceNames.QueueMessageReader, "invalid interfaceName - expected QueueMessageReader, got "+str(interfaceName))
+    letsdata_assert(interfaceName == InterfaceNames.QueueMessageReader, "invalid interfaceName - expected QueueMessageReader, got %s", interfaceName)
     letsdata_assert(letsDataAuth is not None, "invalid letsDataAuth - None")
-    
-    QueueMessageReaderInterfaceNames = set(["parseMessage"])    
 
     if functionName not in QueueMessageReaderInterfaceNames:
-            raise(Exception("lambda event - invalid functionName "+functionName+" for interface QueueMessageReader"))
+            raise(Exception("lambda event - invalid functionName "+str(functionName)+" for interface QueueMessageReader"))
     
     if functionName == "parseMessage":
-        letsdata_assert(batchedData is None or len(batchedData) == 0, "invalid batchedData - QueueMessageReader.parseMessage requires empty batchedData dictionary")
-        letsdata_assert(isinstance(data, dict) and len(data) >= 3 and len(data) <= 5, "invalid data - QueueMessageReader.parseMessage requires data keys [messageId, messageGroupId, messageDeduplicationId, messageAttributes, messageBody]")
+        if batchedData is not None and len(batchedData) > 0:
+            letsdata_assert(isinstance(batchedData, list), "invalid batchedData - QueueMessageReader.parseMessage requires batchedData to be a list")
+            letsdata_assert(data is None or len(data) == 0, "invalid data - QueueMessageReader.parseMessage requires empty data dictionary when batchedData is specified")
+            return BatchedServiceRequest(requestId, letsDataAuth, interfaceName, functionName, batchedData, lambda batchItem: getQueueMessageReaderServiceRequest(requestId, letsDataAuth, interfaceName, functionName, batchItem, None))
         
-        letsdata_assert(not data['messageId'] is None, "invalid messageId - None - QueueMessageReader.parseMessage requires data keys [messageId, messageAttributes, messageBody] and optionally [messageGroupId, messageDeduplicationId]")
-        letsdata_assert(isinstance(data['messageId'], str), "invalid messageId - QueueMessageReader.parseMessage requires messageId value to be string")
-
-        messageGroupId = None
-        if 'messageGroupId' in data.keys():
-            letsdata_assert(isinstance(data['messageGroupId'], str), "invalid messageGroupId - QueueMessageReader.parseMessage requires messageGroupId value to be string")
-            messageGroupId = data['messageGroupId']
-
-        messageDeduplicationId = None
-        if 'messageDeduplicationId' in data.keys():
-            letsdata_assert(isinstance(data['messageDeduplicationId'], str), "invalid messageDeduplicationId - QueueMessageReader.parseMessage requires messageDeduplicationId value to be string")
-            messageDeduplicationId = data['messageDeduplicationId']
-        
-        letsdata_assert(not data['messageAttributes'] is None, "invalid messageAttributes - None - QueueMessageReader.parseMessage requires data keys [messageId, messageAttributes, messageBody] and optionally [messageGroupId, messageDeduplicationId]")
-        letsdata_assert(isinstance(data['messageAttributes'], dict), "invalid messageAttributes - QueueMessageReader.parseMessage requires messageAttributes value to be string")
-        
-        letsdata_assert(not data['messageBody'] is None, "invalid messageBody - None - QueueMessageReader.parseMessage requires data keys [messageId, messageAttributes, messageBody] and optionally [messageGroupId, messageDeduplicationId]")
-        letsdata_assert(isinstance(data['messageBody'], str), "invalid messageBody - QueueMessageReader.parseMessage requires messageBody value to be str")
-
-        return QueueMessageReader_ParseMessage(requestId, letsDataAuth, interfaceName, functionName, data['messageId'], messageGroupId, messageDeduplicationId, data['messageAttributes'], data['messageBody'])
+        validateParseMessageData(data)
+        return QueueMessageReader_ParseMessage(requestId, letsDataAuth, interfaceName, functionName, data['messageId'], data.get('messageGroupId'), data.get('messageDeduplicationId'), data['messageAttributes'], data['messageBody'])
+    elif functionName == "parseMessages":
+        letsdata_assert(batchedData is None or len(batchedData) == 0, "invalid data - QueueMessageReader.parseMessages requires empty batchedData dictionary")
+        validateParseMessagesData(data)
+        violations = []
+        for index in range(0, len(data['messages'])):
+            messageViolations = validateParseMessageData.getViolations(data['messages'][index], "messages["+str(index)+"].")
+            if messageViolations is not None:
+                violations += messageViolations
+        letsdata_assert(len(violations) == 0, "%s", "; ".join(violations))
+        return QueueMessageReader_ParseMessages(requestId, letsDataAuth, interfaceName, functionName, data['messages'])
     else:
         raise(Exception("Unknown functionName"))
-    
\ No newline at end of file
+    
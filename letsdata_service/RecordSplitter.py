@@ -0,0 +1,94 @@
+from letsdata_utils.validations import letsdata_assert
+from letsdata_interfaces.readers.model.RecordHintType import RecordHintType
+from letsdata_interfaces.readers.model.RecordParseHint import RecordParseHint
+
+# the record splitter return values when a record is not found in the buffer
+NEED_MORE_DATA = -1
+NO_MORE_RECORDS = -2
+
+class RecordSplitter:
+    def __init__(self, startHint : RecordParseHint, endHint : RecordParseHint) -> None:
+        letsdata_assert(startHint is not None and endHint is not None, "invalid record hints - record start and end hints are required")
+        self.startPattern = self.getPatternBytes(startHint)
+        self.startOffset = startHint.getOffset() if startHint.getRecordHintType() == RecordHintType.OFFSET else None
+        self.endPattern = self.getPatternBytes(endHint)
+        self.endOffset = endHint.getOffset() if endHint.getRecordHintType() == RecordHintType.OFFSET else None
+        letsdata_assert(self.startOffset is None or self.startOffset >= 0, "invalid record start hint - offset should be >= 0")
+        letsdata_assert(self.endOffset is None or self.endOffset > 0, "invalid record end hint - offset should be > 0")
+
+        # fixed size records (OFFSET start and end hints) - the record slots start at the multiples of the (gap + record length) stride
+        self.stride = self.startOffset + self.endOffset if self.startOffset is not None and self.endOffset is not None else None
+
+    @staticmethod
+    def getPatternBytes(hint : RecordParseHint) -> bytes:
+        if hint.getRecordHintType() != RecordHintType.PATTERN:
+            return None
+        pattern = hint.getPattern()
+        patternBytes = pattern.encode("utf-8") if isinstance(pattern, str) else bytes(pattern)
+        letsdata_assert(len(patternBytes) > 0, "invalid record hint - empty pattern")
+        return patternBytes
+
+    '''
+        Finds the next record in buffer[position:end]. Returns the (recordStart, recordEnd) tuple, or NEED_MORE_DATA when the buffer does not have a
+        complete record (and more data can be read), or NO_MORE_RECORDS when there are no more records in the file.
+    '''
+    def findRecord(self, buffer, position : int, end : int, eof : bool):
+        if self.startPattern is not None:
+            recordStart = buffer.find(self.startPattern, position, end)
+            if recordStart == -1:
+                return NO_MORE_RECORDS if eof else NEED_MORE_DATA
+            contentStart = recordStart + len(self.startPattern)
+        else:
+            recordStart = position + self.startOffset
+            if recordStart >= end:
+                return NO_MORE_RECORDS if eof else NEED_MORE_DATA
+            contentStart = recordStart
+
+        if self.endPattern is not None:
+            endPatternIndex = buffer.find(self.endPattern, contentStart, end)
+            if endPatternIndex == -1:
+                return (recordStart, end) if eof else NEED_MORE_DATA
+            return (recordStart, endPatternIndex + len(self.endPattern))
+        else:
+            recordEnd = recordStart + self.endOffset
+            if recordEnd > end:
+                return (recordStart, end) if eof else NEED_MORE_DATA
+            return (recordStart, recordEnd)
+
+    '''
+        Whether the record boundaries can be found from any offset in the file, i.e. whether the file can be split into byte ranges.
+        For PATTERN start hints, a range starts at the next start pattern occurrence - the start pattern should not occur inside the records.
+    '''
+    def isSplittable(self) -> bool:
+        return self.startPattern is not None or self.stride is not None
+
+    '''
+        Returns the position to start finding records from for a byte range that starts at rangeStart.
+    '''
+    def getRangeStartPosition(self, rangeStart : int) -> int:
+        if self.startPattern is not None or rangeStart == 0:
+            return rangeStart
+        return ((rangeStart + self.stride - 1) // self.stride) * self.stride
+
+    '''
+        Returns the offset the record is assigned to a byte range by - the record start for PATTERN start hints, the previous record's end (position) for OFFSET start hints.
+    '''
+    def getRecordSlotStart(self, position : int, recordStart : int) -> int:
+        return recordStart if self.startPattern is not None else position
+
+'''
+    The record parse hints for an s3FileType, compiled once for reuse - the start / end RecordParseHint objects as returned by the parser (getRecordStartPattern / getRecordEndPattern)
+    and the RecordSplitter that has the utf-8 encoded PATTERN hints and the precomputed stride for OFFSET hints.
+    The splitter searches the patterns with bytes.find which is faster than a regex for a literal pattern.
+'''
+class RecordParseHints:
+    def __init__(self, s3FileType : str, startHint : RecordParseHint, endHint : RecordParseHint) -> None:
+        self.s3FileType = s3FileType
+        self.startHint = startHint
+        self.endHint = endHint
+        self.splitter = None
+
+    def getSplitter(self) -> RecordSplitter:
+        if self.splitter is None:
+            self.splitter = RecordSplitter(self.startHint, self.endHint)
+        return self.splitter
@@ -1,14 +1,65 @@
+import importlib, time
 from letsdata_utils.logging_utils import logger
 from letsdata_utils.validations import letsdata_assert
 from letsdata_service.Service import ServiceRequest, LetsDataAuthParams, InterfaceNames
-from letsdata_service.SingleFileParserService import getSingleFileParserRequest
-from letsdata_service.QueueMessageReaderService import getQueueMessageReaderServiceRequest
-from letsdata_service.SagemakerVectorsInterfaceService import getSagemakerVectorsInterfaceServiceRequest
-from letsdata_service.KinesisRecordReaderService import getKinesisRecordReaderServiceRequest
-from letsdata_service.DynamoDBRecordReaderService import getDynamoDBRecordReaderServiceRequest
-from letsdata_service.DynamoDBTableItemReaderService import getDynamoDBTableItemReaderServiceRequest
-from letsdata_service.SparkMapperInterfaceService import getSparkMapperInterfaceServiceRequest
-from letsdata_service.SparkReducerInterfaceService import getSparkReducerInterfaceServiceRequest
+
+'''
+    The interface dispatch registry - maps each interface to its service module and request factory function. 
+    The service module (and the interface module it imports) is imported on first use only, so that a dataset's lambda loads only its own interface.
+    For example, the SingleFileParser / KinesisRecordReader datasets do not import the pyspark modules that the Spark interfaces need.
+'''
+InterfaceServiceRegistry = {
+    InterfaceNames.SingleFileParser: ("letsdata_service.SingleFileParserService", "getSingleFileParserRequest"),
+    InterfaceNames.QueueMessageReader: ("letsdata_service.QueueMessageReaderService", "getQueueMessageReaderServiceRequest"),
+    InterfaceNames.SagemakerVectorsInterface: ("letsdata_service.SagemakerVectorsInterfaceService", "getSagemakerVectorsInterfaceServiceRequest"),
+    InterfaceNames.KinesisRecordReader: ("letsdata_service.KinesisRecordReaderService", "getKinesisRecordReaderServiceRequest"),
+    InterfaceNames.DynamoDBStreamsRecordReader: ("letsdata_service.DynamoDBRecordReaderService", "getDynamoDBRecordReaderServiceRequest"),
+    InterfaceNames.DynamoDBTableItemReader: ("letsdata_service.DynamoDBTableItemReaderService", "getDynamoDBTableItemReaderServiceRequest"),
+    InterfaceNames.SparkMapperInterface: ("letsdata_service.SparkMapperInterfaceService", "getSparkMapperInterfaceServiceRequest"),
+    InterfaceNames.SparkReducerInterface: ("letsdata_service.SparkReducerInterfaceService", "getSparkReducerInterfaceServiceRequest"),
+}
+
+# the request factory functions that have been loaded in this container and the time (seconds) it took to import each of them
+loadedRequestFactories = {}
+interfaceImportTimes = {}
+
+def getRequestFactory(interfaceName : InterfaceNames):
+    requestFactory = loadedRequestFactories.get(interfaceName)
+    if requestFactory is not None:
+        return requestFactory
+    
+    if interfaceName not in InterfaceServiceRegistry:
+        raise(Exception("lambda event - interfaceName not yet supported "+str(interfaceName)))
+    
+    moduleName, factoryName = InterfaceServiceRegistry[interfaceName]
+    startTime = time.perf_counter()
+    module = importlib.import_module(moduleName)
+    interfaceImportTimes[interfaceName] = time.perf_counter() - startTime
+    requestFactory = getattr(module, factoryName)
+    loadedRequestFactories[interfaceName] = requestFactory
+    logger.debug("interface service loaded - interfaceName: "+str(interfaceName)+", module: "+moduleName+", importTimeSeconds: "+str(interfaceImportTimes[interfaceName]))
+    return requestFactory
+
+'''
+    Returns the import time report for the interfaces as a map of <interface name, import time in seconds>. 
+    By default, the report has the interfaces that have been loaded in this container. With loadAllInterfaces=True, all the registered interfaces are loaded
+    (an interface that fails to load, for example, because its dependencies are not installed, is reported with the error). 
+    
+    Since modules that are shared between interfaces are imported once, the first interface to load pays for the shared modules. 
+    Run the report in a fresh process to get the cold start cost for an interface.
+'''
+def getInterfaceImportTimeReport(loadAllInterfaces : bool = False) -> dict:
+    report = {}
+    if loadAllInterfaces:
+        for interfaceName in InterfaceServiceRegistry.keys():
+            try:
+                getRequestFactory(interfaceName)
+            except Exception as err:
+                report[interfaceName.name] = "import failed - "+str(err)
+    
+    for interfaceName in interfaceImportTimes.keys():
+        report[interfaceName.name] = interfaceImportTimes[interfaceName]
+    return report
 
 def getServiceRequest(event : dict) -> ServiceRequest:
     if event is None:
@@ -23,28 +74,10 @@ def getServiceRequest(event : dict) -> ServiceRequest:
     letsDataAuthParams = LetsDataAuthParams(event['letsdataAuth'])
     interfaceName = InterfaceNames.fromValue(event['interface'].lower())
     functionName = event['function']
-    serviceRequest : ServiceRequest = None
     data : dict = event['data'] if 'data' in event.keys() else None
     batchedData : [] = event['batchedData'] if 'batchedData' in event.keys() else None
-    if (interfaceName == InterfaceNames.SingleFileParser):
-        serviceRequest = getSingleFileParserRequest(requestId, letsDataAuthParams, interfaceName, functionName, data, batchedData)
-    elif (interfaceName == InterfaceNames.QueueMessageReader):
-        serviceRequest = getQueueMessageReaderServiceRequest(requestId, letsDataAuthParams, interfaceName, functionName, data, batchedData)
-    elif (interfaceName == InterfaceNames.SagemakerVectorsInterface):
-        serviceRequest = getSagemakerVectorsInterfaceServiceRequest(requestId, letsDataAuthParams, interfaceName, functionName, data, batchedData)
-    elif (interfaceName == InterfaceNames.KinesisRecordReader):
-        serviceRequest = getKinesisRecordReaderServiceRequest(requestId, letsDataAuthParams, interfaceName, functionName, data, batchedData)
-    elif (interfaceName == InterfaceNames.DynamoDBStreamsRecordReader):
-        serviceRequest = getDynamoDBRecordReaderServiceRequest(requestId, letsDataAuthParams, interfaceName, functionName, data, batchedData)
-    elif (interfaceName == InterfaceNames.DynamoDBTableItemReader):
-        serviceRequest = getDynamoDBTableItemReaderServiceRequest(requestId, letsDataAuthParams, interfaceName, functionName, data, batchedData)
-    elif (interfaceName == InterfaceNames.SparkMapperInterface):
-        serviceRequest = getSparkMapperInterfaceServiceRequest(requestId, letsDataAuthParams, interfaceName, functionName, data, batchedData)
-    elif (interfaceName == InterfaceNames.SparkReducerInterface):
-        serviceRequest = getSparkReducerInterfaceServiceRequest(requestId, letsDataAuthParams, interfaceName, functionName, data, batchedData)
-    else:
-        raise(Exception("lambda event - interfaceName not yet supported "+str(interfaceName)))
+    requestFactory = getRequestFactory(interfaceName)
+    serviceRequest : ServiceRequest = requestFactory(requestId, letsDataAuthParams, interfaceName, functionName, data, batchedData)
     
     logger.debug("serviceRequest initialized - interfaceName: "+str(interfaceName)+", functionName: "+str(functionName))
     return serviceRequest
-        
\ No newline at end of file
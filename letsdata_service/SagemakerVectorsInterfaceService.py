@@ -1,6 +1,8 @@
 from letsdata_utils.logging_utils import logger
-from letsdata_service.Service import ServiceRequest, LetsDataAuthParams, InterfaceNames
-from letsdata_utils.validations import letsdata_assert
+from letsdata_service.Service import ServiceRequest, BatchedServiceRequest, LetsDataAuthParams, InterfaceNames
+from letsdata_utils.validations import letsdata_assert, compileRequestSchema, SchemaField
+from letsdata_utils.vector_utils import isPackedVector, decodeVectorsMap, encodeVectors
+from letsdata_utils.request_utils import getExceptionObject
 from letsdata_interfaces.readers.sagemaker.SagemakerVectorsInterface import SagemakerVectorsInterface
 
 
@@ -10,9 +12,14 @@ class SagemakerVectorsInterfaceService_ExtractDocumentElementsForVectorization(S
         self.document = document
 
     def execute(self):
-        parser = SagemakerVectorsInterface()
+        parser = self.getHandler(SagemakerVectorsInterface)
         return  parser.extractDocumentElementsForVectorization(self.document)
 
+'''
+    The vectorsMap's vectors can be json lists of numbers or packed vectors ({"encoding": "float32" | "float16" | "int8", "data": <base64 little endian values>, "scale": ...}, 
+    see letsdata_utils.vector_utils) - the packed vectors are decoded to numpy float32 arrays before calling constructVectorDoc. If the reader's getVectorOutputEncoding
+    returns an encoding, the numpy vectors in the returned document's documentKeyValuesMap are packed with that encoding.
+'''
 class SagemakerVectorsInterfaceService_ConstructVectorDoc(ServiceRequest):
     def __init__(self, requestId : str, letsDataAuth: LetsDataAuthParams, interfaceName : InterfaceNames, functionName : str, documentInterface : dict, vectorsMap : dict):
         super().__init__(requestId, letsDataAuth, interfaceName, functionName)
@@ -20,33 +27,154 @@ class SagemakerVectorsInterfaceService_ConstructVectorDoc(ServiceRequest):
         self.vectorsMap = vectorsMap
     
     def execute(self):
-        parser = SagemakerVectorsInterface()
-        return  parser.constructVectorDoc(self.documentInterface, self.vectorsMap)
+        parser = self.getHandler(SagemakerVectorsInterface)
+        document = parser.constructVectorDoc(self.documentInterface, getVectorsMap(self.vectorsMap))
+        return encodeVectorDoc(document, parser.getVectorOutputEncoding())
+
+def getVectorsMap(vectorsMap : dict) -> dict:
+    if any(isPackedVector(vector) for vector in vectorsMap.values()):
+        return decodeVectorsMap(vectorsMap)
+    return vectorsMap
+
+def encodeVectorDoc(document, outputEncoding : str):
+    if outputEncoding is not None and document is not None and document.getDocumentKeyValuesMap() is not None:
+        document.documentKeyValuesMap = encodeVectors(document.getDocumentKeyValuesMap(), outputEncoding)
+    return document
+
+'''
+    The batch variants (extractDocumentElementsForVectorizationBatch, constructVectorDocBatch) process N items in a single invocation using the reader's batch function. 
+    The response has a result per item in the items order (similar to the BatchedServiceRequest), so that an erroneous item does not fail the remaining items:
+
+    [
+        {
+            "index": 0,
+            "statusCode": "SUCCESS",
+            "data": <the item's element map / vector doc>
+        },
+        {
+            "index": 1,
+            "statusCode": "EXCEPTION",
+            "errorMessage": "error message",
+            "exception": { "errorMessage": "...", "errorType": "...", "stackTrace": "..." }
+        },
+        ...
+    ]
+
+    The invalid items are reported as exceptions and are not passed to the reader. The valid items are passed to the reader's batch function, which reports an item's
+    failure by returning the item's Exception in its place - the default batch functions call the single item function for each item and return the exceptions, so each
+    item is processed once. If the batch call itself throws, the items are retried one at a time (with the single item function) to find the failing items.
+'''
+class SagemakerVectorsInterfaceService_BatchRequest(ServiceRequest):
+    def __init__(self, requestId : str, letsDataAuth: LetsDataAuthParams, interfaceName : InterfaceNames, functionName : str, items : list):
+        super().__init__(requestId, letsDataAuth, interfaceName, functionName)
+        self.items = items
+
+    def execute(self):
+        parser = self.getHandler(SagemakerVectorsInterface)
+        results = [None] * len(self.items)
+        validIndexes = []
+        for index in range(0, len(self.items)):
+            try:
+                self.validateItem(self.items[index])
+                validIndexes.append(index)
+            except Exception as err:
+                results[index] = self.getExceptionResult(index, err)
+
+        if len(validIndexes) > 0:
+            try:
+                batchResults = self.executeBatch(parser, [self.items[index] for index in validIndexes])
+                letsdata_assert(batchResults is not None and len(batchResults) == len(validIndexes), "%s should return a result for each item - expected: %s, actual: %s", self.functionName, len(validIndexes), None if batchResults is None else len(batchResults))
+                for index, batchResult in zip(validIndexes, batchResults):
+                    if isinstance(batchResult, Exception):
+                        results[index] = self.getExceptionResult(index, batchResult)
+                    else:
+                        results[index] = {"index": index, "statusCode": "SUCCESS", "data": batchResult}
+                return results
+            except Exception as err:
+                logger.error("batch call failed, retrying the items one at a time - requestId: "+str(self.requestId)+", functionName: "+str(self.functionName)+", items: "+str(len(validIndexes))+", err: "+str(err))
+
+        for index in validIndexes:
+            try:
+                results[index] = {"index": index, "statusCode": "SUCCESS", "data": self.executeItem(parser, self.items[index])}
+            except Exception as err:
+                results[index] = self.getExceptionResult(index, err)
+        return results
+
+    def getExceptionResult(self, index : int, err : Exception) -> dict:
+        logger.error("batch item failed - requestId: "+str(self.requestId)+", functionName: "+str(self.functionName)+", index: "+str(index)+", err: "+str(err))
+        return {"index": index, "statusCode": "EXCEPTION", "errorMessage": str(err), "exception": getExceptionObject(err)}
+
+class SagemakerVectorsInterfaceService_ExtractDocumentElementsForVectorizationBatch(SagemakerVectorsInterfaceService_BatchRequest):
+    def validateItem(self, document) -> None:
+        letsdata_assert(isinstance(document, dict), "invalid document - SagemakerVectorsInterfaceService.extractDocumentElementsForVectorizationBatch requires the documents to be dictionaries, got %s", type(document).__name__)
+
+    def executeBatch(self, parser : SagemakerVectorsInterface, documents : list) -> list:
+        return parser.extractDocumentElementsForVectorizationBatch(documents)
+
+    def executeItem(self, parser : SagemakerVectorsInterface, document : dict):
+        return parser.extractDocumentElementsForVectorization(document)
+
+class SagemakerVectorsInterfaceService_ConstructVectorDocBatch(SagemakerVectorsInterfaceService_BatchRequest):
+    def validateItem(self, item) -> None:
+        validateConstructVectorDocData(item)
+
+    def executeBatch(self, parser : SagemakerVectorsInterface, items : list) -> list:
+        documents = parser.constructVectorDocBatch([item['documentInterface'] for item in items], [getVectorsMap(item['vectorsMap']) for item in items])
+        outputEncoding = parser.getVectorOutputEncoding()
+        return None if documents is None else [document if isinstance(document, Exception) else encodeVectorDoc(document, outputEncoding) for document in documents]
+
+    def executeItem(self, parser : SagemakerVectorsInterface, item : dict):
+        return encodeVectorDoc(parser.constructVectorDoc(item['documentInterface'], getVectorsMap(item['vectorsMap'])), parser.getVectorOutputEncoding())
+
+SagemakerVectorsInterfaceServiceInterfaceNames = frozenset(["extractDocumentElementsForVectorization", "constructVectorDoc", "extractDocumentElementsForVectorizationBatch", "constructVectorDocBatch"])
+
+validateExtractDocumentElementsForVectorizationData = compileRequestSchema("SagemakerVectorsInterfaceService.extractDocumentElementsForVectorization", [
+    SchemaField("document", dict)
+])
+
+validateConstructVectorDocData = compileRequestSchema("SagemakerVectorsInterfaceService.constructVectorDoc", [
+    SchemaField("documentInterface", dict),
+    SchemaField("vectorsMap", dict)
+])
+
+validateExtractDocumentElementsForVectorizationBatchData = compileRequestSchema("SagemakerVectorsInterfaceService.extractDocumentElementsForVectorizationBatch", [
+    SchemaField("documents", list)
+])
+
+validateConstructVectorDocBatchData = compileRequestSchema("SagemakerVectorsInterfaceService.constructVectorDocBatch", [
+    SchemaField("items", list)
+])
 
 def getSagemakerVectorsInterfaceServiceRequest(requestId : str, letsDataAuth: LetsDataAuthParams, interfaceName : InterfaceNames, functionName : str, data : {}, batchedData : []):
-    letsdata_assert(interfaceName == InterfaceNames.SagemakerVectorsInterface, "invalid interfaceName - expected SagemakerVectorsInterface, got "+str(interfaceName))
+    letsdata_assert(interfaceName == InterfaceNames.SagemakerVectorsInterface, "invalid interfaceName - expected SagemakerVectorsInterface, got %s", interfaceName)
     letsdata_assert(letsDataAuth is not None, "invalid letsDataAuth - None")
 
-    SagemakerVectorsInterfaceServiceInterfaceNames = set(["extractDocumentElementsForVectorization", "constructVectorDoc"])    
-
     if functionName not in SagemakerVectorsInterfaceServiceInterfaceNames:
-            raise(Exception("lambda event - invalid functionName "+functionName+" for interface SagemakerVectorsInterfaceService"))
+            raise(Exception("lambda event - invalid functionName "+str(functionName)+" for interface SagemakerVectorsInterfaceService"))
     
     if functionName == "extractDocumentElementsForVectorization":
-        letsdata_assert(batchedData is None or len(batchedData) == 0, "invalid data - SagemakerVectorsInterfaceService.extractDocumentElementsForVectorization requires empty batchedData dictionary")
-        letsdata_assert(isinstance(data, dict) and len(data) == 1, "invalid data - SagemakerVectorsInterfaceService.extractDocumentElementsForVectorization requires data keys [document]")
+        if batchedData is not None and len(batchedData) > 0:
+            letsdata_assert(isinstance(batchedData, list), "invalid batchedData - SagemakerVectorsInterfaceService.extractDocumentElementsForVectorization requires batchedData to be a list")
+            letsdata_assert(data is None or len(data) == 0, "invalid data - SagemakerVectorsInterfaceService.extractDocumentElementsForVectorization requires empty data dictionary when batchedData is specified")
+            return BatchedServiceRequest(requestId, letsDataAuth, interfaceName, functionName, batchedData, lambda batchItem: getSagemakerVectorsInterfaceServiceRequest(requestId, letsDataAuth, interfaceName, functionName, batchItem, None))
         
-        letsdata_assert(not data['document'] is None, "invalid document - None - SagemakerVectorsInterfaceService.extractDocumentElementsForVectorization requires data keys [document]")
-        letsdata_assert(isinstance(data['document'], dict), "invalid document - SagemakerVectorsInterfaceService.extractDocumentElementsForVectorization requires document value to be dict")
-
+        validateExtractDocumentElementsForVectorizationData(data)
         return SagemakerVectorsInterfaceService_ExtractDocumentElementsForVectorization(requestId, letsDataAuth, interfaceName, functionName, data['document'])
     elif functionName == "constructVectorDoc":
-        letsdata_assert(batchedData is None or len(batchedData) == 0, "invalid data - SagemakerVectorsInterfaceService.extractDocumentElementsForVectorization requires empty batchedData dictionary")
-        letsdata_assert(isinstance(data, dict) and len(data) == 2, "invalid data - SagemakerVectorsInterfaceService.extractDocumentElementsForVectorization requires data keys [documentInterface, vectorsMap]")
+        if batchedData is not None and len(batchedData) > 0:
+            letsdata_assert(isinstance(batchedData, list), "invalid batchedData - SagemakerVectorsInterfaceService.constructVectorDoc requires batchedData to be a list")
+            letsdata_assert(data is None or len(data) == 0, "invalid data - SagemakerVectorsInterfaceService.constructVectorDoc requires empty data dictionary when batchedData is specified")
+            return BatchedServiceRequest(requestId, letsDataAuth, interfaceName, functionName, batchedData, lambda batchItem: getSagemakerVectorsInterfaceServiceRequest(requestId, letsDataAuth, interfaceName, functionName, batchItem, None))
         
-        letsdata_assert(not data['documentInterface'] is None, "invalid documentInterface - None - SagemakerVectorsInterfaceService.extractDocumentElementsForVectorization requires data keys [documentInterface, vectorsMap]")
-        letsdata_assert(isinstance(data['documentInterface'], dict), "invalid documentInterface - SagemakerVectorsInterfaceService.extractDocumentElementsForVectorization requires documentInterface value to be dict")
-
+        validateConstructVectorDocData(data)
         return SagemakerVectorsInterfaceService_ConstructVectorDoc(requestId, letsDataAuth, interfaceName, functionName, data['documentInterface'], data['vectorsMap'])
+    elif functionName == "extractDocumentElementsForVectorizationBatch":
+        letsdata_assert(batchedData is None or len(batchedData) == 0, "invalid data - SagemakerVectorsInterfaceService.extractDocumentElementsForVectorizationBatch requires empty batchedData dictionary")
+        validateExtractDocumentElementsForVectorizationBatchData(data)
+        return SagemakerVectorsInterfaceService_ExtractDocumentElementsForVectorizationBatch(requestId, letsDataAuth, interfaceName, functionName, data['documents'])
+    elif functionName == "constructVectorDocBatch":
+        letsdata_assert(batchedData is None or len(batchedData) == 0, "invalid data - SagemakerVectorsInterfaceService.constructVectorDocBatch requires empty batchedData dictionary")
+        validateConstructVectorDocBatchData(data)
+        return SagemakerVectorsInterfaceService_ConstructVectorDocBatch(requestId, letsDataAuth, interfaceName, functionName, data['items'])
     else:
         raise(Exception("Unknown functionName"))    
@@ -1,11 +1,13 @@
 from enum import Enum
 from letsdata_utils.logging_utils import logger
+from letsdata_utils.request_utils import getExceptionObject
+from letsdata_service.RecordSplitter import RecordParseHints
 '''
     event:
     {
         "requestId": "requestId",
         "interface": "SingleFileParser",
-        "function": "getS3FileType|getResolvedS3FileName|getRecordStartPattern|getRecordEndPattern|parseDocument",
+        "function": "getS3FileType|getResolvedS3FileName|getRecordStartPattern|getRecordEndPattern|getRecordParseHints|parseDocument",
         "letsdataAuth": {
             "tenantId": "tenant_id",
             "userId": "user_id",
@@ -54,6 +56,45 @@ class InterfaceNames(Enum):
     def fromValue(cls, enumValue):
         return cls(enumValue.lower())
 
+'''
+    The user handler instances cached in this (warm) lambda container - keyed by (interfaceName, datasetId). 
+    A handler is created, initialized and warmed up on its first request and reused for the container's subsequent requests.
+'''
+handlerCache = {}
+
+def getCachedHandler(interfaceName : InterfaceNames, letsDataAuth: LetsDataAuthParams, handlerClass : type) -> object:
+    handlerKey = (interfaceName, letsDataAuth.datasetId if letsDataAuth is not None else None)
+    handler = handlerCache.get(handlerKey)
+    if handler is None:
+        handler = handlerClass()
+        if hasattr(handler, "initialize"):
+            handler.initialize()
+        if hasattr(handler, "warmup"):
+            handler.warmup()
+        handlerCache[handlerKey] = handler
+        logger.debug("handler initialized - interfaceName: "+str(interfaceName)+", datasetId: "+str(handlerKey[1])+", handlerClass: "+handlerClass.__name__)
+    return handler
+
+'''
+    The SingleFileParser record parse hints cached in this (warm) lambda container - keyed by (datasetId, s3FileType).
+    The parser's getRecordStartPattern / getRecordEndPattern are called once and the compiled hints are reused for the container's subsequent requests.
+    The parseDocument requests carry records that have already been split, so they do not use the cache.
+'''
+recordParseHintCache = {}
+
+def getCachedRecordParseHints(letsDataAuth: LetsDataAuthParams, s3FileType : str, parser) -> RecordParseHints:
+    hintsKey = (letsDataAuth.datasetId if letsDataAuth is not None else None, s3FileType)
+    hints = recordParseHintCache.get(hintsKey)
+    if hints is None:
+        hints = RecordParseHints(s3FileType, parser.getRecordStartPattern(s3FileType), parser.getRecordEndPattern(s3FileType))
+        recordParseHintCache[hintsKey] = hints
+        logger.debug("record parse hints cached - datasetId: "+str(hintsKey[0])+", s3FileType: "+str(s3FileType))
+    return hints
+
+def clearHandlerCache() -> None:
+    handlerCache.clear()
+    recordParseHintCache.clear()
+
 class ServiceRequest:
     def __init__(self, requestId: str, letsDataAuth: LetsDataAuthParams, interfaceName : InterfaceNames, functionName : str) -> None:
         self.requestId = requestId
@@ -61,6 +102,57 @@ class ServiceRequest:
         self.interfaceName = interfaceName
         self.functionName = functionName
 
+    def getHandler(self, handlerClass : type) -> object:
+        return getCachedHandler(self.interfaceName, self.letsDataAuth, handlerClass)
+
     def execute(self) -> object:
         pass
 
+'''
+    A batched request executes the function for each record in the event's batchedData. Each record is validated and executed independently
+    so that an erroneous record does not fail the remaining records in the batch. The response is a list of per record results in the batchedData order:
+
+    [
+        {
+            "index": 0,
+            "statusCode": "SUCCESS",
+            "data": <function response>
+        },
+        {
+            "index": 1,
+            "statusCode": "EXCEPTION",
+            "errorMessage": "error message",
+            "exception": {
+                "errorMessage": "error message",
+                "errorType": "Exception",
+                "stackTrace": "..."
+            }
+        },
+        ...
+    ]
+'''
+class BatchedServiceRequest(ServiceRequest):
+    def __init__(self, requestId: str, letsDataAuth: LetsDataAuthParams, interfaceName : InterfaceNames, functionName : str, batchedData : list, getBatchItemServiceRequest) -> None:
+        super().__init__(requestId, letsDataAuth, interfaceName, functionName)
+        self.batchedData = batchedData
+        self.getBatchItemServiceRequest = getBatchItemServiceRequest
+
+    def execute(self) -> object:
+        results = []
+        for index in range(0, len(self.batchedData)):
+            try:
+                batchItemRequest : ServiceRequest = self.getBatchItemServiceRequest(self.batchedData[index])
+                results.append({
+                    "index": index,
+                    "statusCode": "SUCCESS",
+                    "data": batchItemRequest.execute()
+                })
+            except Exception as err:
+                logger.error("batched request item failed - requestId: "+str(self.requestId)+", functionName: "+str(self.functionName)+", index: "+str(index)+", err: "+str(err))
+                results.append({
+                    "index": index,
+                    "statusCode": "EXCEPTION",
+                    "errorMessage": str(err),
+                    "exception": getExceptionObject(err)
+                })
+        return results
@@ -1,15 +1,19 @@
+import base64
 from letsdata_utils.logging_utils import logger
-from letsdata_service.Service import ServiceRequest, LetsDataAuthParams, InterfaceNames
-from letsdata_utils.validations import letsdata_assert
+from letsdata_service.Service import ServiceRequest, BatchedServiceRequest, LetsDataAuthParams, InterfaceNames, getCachedRecordParseHints
+from letsdata_utils.validations import letsdata_assert, compileRequestSchema, SchemaField
 from letsdata_interfaces.readers.parsers.SingleFileParser import SingleFileParser
 
+CONTENT_ENCODING_UTF8 = "utf-8"
+CONTENT_ENCODING_BASE64 = "base64"
+
 
 class SingleFileParser_GetS3FileType(ServiceRequest):
     def __init__(self, requestId: str, letsDataAuth: LetsDataAuthParams, interfaceName : InterfaceNames, functionName : str) -> None:
         super().__init__(requestId, letsDataAuth, interfaceName, functionName)
 
     def execute(self) -> object:
-        parser = SingleFileParser()
+        parser = self.getHandler(SingleFileParser)
         return  parser.getS3FileType()
 
 class SingleFileParser_GetResolvedS3FileName(ServiceRequest):
@@ -19,7 +23,7 @@ class SingleFileParser_GetResolvedS3FileName(ServiceRequest):
         self.fileName = fileName
     
     def execute(self) -> object:
-        parser = SingleFileParser()
+        parser = self.getHandler(SingleFileParser)
         return  parser.getResolvedS3FileName(self.s3FileType, self.fileName)
     
 class SingleFileParser_GetRecordStartPattern(ServiceRequest):
@@ -28,8 +32,8 @@ class SingleFileParser_GetRecordStartPattern(ServiceRequest):
         self.s3FileType = s3FileType
 
     def execute(self) -> object:
-        parser = SingleFileParser()
-        return  parser.getRecordStartPattern(self.s3FileType)
+        parser = self.getHandler(SingleFileParser)
+        return  getCachedRecordParseHints(self.letsDataAuth, self.s3FileType, parser).startHint
 
 class SingleFileParser_GetRecordEndPattern(ServiceRequest):
     def __init__(self, requestId: str, letsDataAuth: LetsDataAuthParams, interfaceName : InterfaceNames, functionName : str, s3FileType : str) -> None:
@@ -37,36 +41,108 @@ class SingleFileParser_GetRecordEndPattern(ServiceRequest):
         self.s3FileType = s3FileType
 
     def execute(self) -> object:
-        parser = SingleFileParser()
-        return  parser.getRecordEndPattern(self.s3FileType)
+        parser = self.getHandler(SingleFileParser)
+        return  getCachedRecordParseHints(self.letsDataAuth, self.s3FileType, parser).endHint
+
+'''
+    Returns the record start and end patterns for the s3FileTypes (defaults to all the parser's file types) in a single request:
+    {
+        "LOGFILE": {
+            "recordStartPattern": <RecordParseHint>,
+            "recordEndPattern": <RecordParseHint>
+        }
+    }
+'''
+class SingleFileParser_GetRecordParseHints(ServiceRequest):
+    def __init__(self, requestId: str, letsDataAuth: LetsDataAuthParams, interfaceName : InterfaceNames, functionName : str, s3FileTypes : list) -> None:
+        super().__init__(requestId, letsDataAuth, interfaceName, functionName)
+        self.s3FileTypes = s3FileTypes
+
+    def execute(self) -> object:
+        parser = self.getHandler(SingleFileParser)
+        s3FileTypes = self.s3FileTypes if self.s3FileTypes is not None else [parser.getS3FileType()]
+        result = {}
+        for s3FileType in s3FileTypes:
+            hints = getCachedRecordParseHints(self.letsDataAuth, s3FileType, parser)
+            result[s3FileType] = {"recordStartPattern": hints.startHint, "recordEndPattern": hints.endHint}
+        return result
     
+'''
+    The record content can be sent as:
+        * utf-8 text (default) - the content str is encoded to bytes, and startIndex / endIndex should be the start (0) and end (length) of the encoded bytes
+        * base64 (contentEncoding: base64) - for binary records, the content is decoded to bytes and startIndex / endIndex can be any range in the decoded bytes
+        * bytes / bytearray / memoryview - for in-process callers (for example, the local file reader), startIndex / endIndex can be any range in the buffer
+    The bytes are passed to parseDocument as is (no copy) with the startIndex / endIndex of the record in the bytes.
+
+    The record boundaries are found by #Lets Data before the request is sent, so this path does not search the record parse hints - the compiled hints
+    (getCachedRecordParseHints) are used by the hint requests above and by the LocalSingleFileReader, which splits the files itself.
+'''
 class SingleFileParser_ParseDocument(ServiceRequest):
-    def __init__(self, requestId: str, letsDataAuth: LetsDataAuthParams, interfaceName : InterfaceNames, functionName : str, s3FileType : str, s3Filename : str, offsetBytes : int , content : str, startIndex : int, endIndex : int) -> None:
+    def __init__(self, requestId: str, letsDataAuth: LetsDataAuthParams, interfaceName : InterfaceNames, functionName : str, s3FileType : str, s3Filename : str, offsetBytes : int , content, startIndex : int, endIndex : int, contentEncoding : str = None) -> None:
         super().__init__(requestId, letsDataAuth, interfaceName, functionName)
         self.s3FileType = s3FileType
         self.s3FileName = s3Filename
         self.offsetBytes = offsetBytes
-        contentBytes = bytearray(content, encoding="utf-8")
+        if isinstance(content, str):
+            if contentEncoding is None or contentEncoding == CONTENT_ENCODING_UTF8:
+                contentBytes = content.encode("utf-8")
+                if startIndex != 0:
+                    raise(Exception("SingleFileParser_ParseDocument - invalid startIndex for byteArray - expected: 0, actual: "+str(startIndex)))
+                if endIndex != len(contentBytes):
+                    raise(Exception("SingleFileParser_ParseDocument - invalid endIndex for byteArray - expected: "+str(len(contentBytes))+", actual: "+str(endIndex)))
+            elif contentEncoding == CONTENT_ENCODING_BASE64:
+                contentBytes = base64.b64decode(content)
+            else:
+                raise(Exception("SingleFileParser_ParseDocument - invalid contentEncoding - expected: "+CONTENT_ENCODING_UTF8+"|"+CONTENT_ENCODING_BASE64+", actual: "+str(contentEncoding)))
+        else:
+            contentBytes = content
+        
+        if startIndex < 0 or endIndex < startIndex or endIndex > len(contentBytes):
+            raise(Exception("SingleFileParser_ParseDocument - invalid startIndex / endIndex for byteArray - length: "+str(len(contentBytes))+", startIndex: "+str(startIndex)+", endIndex: "+str(endIndex)))
         self.byteArr = contentBytes
-        self.startIndex = 0
-        if startIndex != self.startIndex:
-            raise(Exception("SingleFileParser_ParseDocument - invalid startIndex for byteArray - expected: "+str(self.startIndex)+", actual: "+str(startIndex)))
-        self.endIndex = len(contentBytes)
-        if endIndex != self.endIndex:
-            raise(Exception("SingleFileParser_ParseDocument - invalid endIndex for byteArray - expected: "+str(self.endIndex)+", actual: "+str(endIndex)))
+        self.startIndex = startIndex
+        self.endIndex = endIndex
 
     def execute(self) -> object:
-        parser = SingleFileParser()
+        parser = self.getHandler(SingleFileParser)
         return  parser.parseDocument(self.s3FileType, self.s3FileName, self.offsetBytes, self.byteArr, self.startIndex, self.endIndex)
 
 
+SingleFileParserInterfaceNames = frozenset(["getS3FileType", "getResolvedS3FileName", "getRecordStartPattern", "getRecordEndPattern", "getRecordParseHints", "parseDocument"])
+
+validateGetResolvedS3FileNameData = compileRequestSchema("SingleFileParser.getResolvedS3FileName", [
+    SchemaField("s3FileType", str),
+    SchemaField("fileName", str)
+])
+
+validateGetRecordStartPatternData = compileRequestSchema("SingleFileParser.getRecordStartPattern", [
+    SchemaField("s3FileType", str)
+])
+
+validateGetRecordEndPatternData = compileRequestSchema("SingleFileParser.getRecordEndPattern", [
+    SchemaField("s3FileType", str)
+])
+
+validateGetRecordParseHintsData = compileRequestSchema("SingleFileParser.getRecordParseHints", [
+    SchemaField("s3FileTypes", list, required=False)
+])
+
+validateParseDocumentData = compileRequestSchema("SingleFileParser.parseDocument", [
+    SchemaField("s3FileType", str),
+    SchemaField("fileName", str),
+    SchemaField("offsetBytes", int),
+    SchemaField("content", (str, bytes, bytearray, memoryview)),
+    SchemaField("startIndex", int),
+    SchemaField("endIndex", int),
+    SchemaField("contentEncoding", str, required=False)
+])
+
 def getSingleFileParserRequest(requestId : str, letsDataAuth: LetsDataAuthParams, interfaceName : InterfaceNames, functionName : str, data : dict, batchedData : []):
-    letsdata_assert(interfaceName == InterfaceNames.SingleFileParser, "invalid interfaceName - expected SingleFileParser, got "+str(interfaceName))
+    letsdata_assert(interfaceName == InterfaceNames.SingleFileParser, "invalid interfaceName - expected SingleFileParser, got %s", interfaceName)
     letsdata_assert(letsDataAuth is not None, "invalid letsDataAuth - None")
-    SingleFileParserInterfaceNames = set(["getS3FileType", "getResolvedS3FileName", "getRecordStartPattern", "getRecordEndPattern", "parseDocument"])    
 
     if functionName not in SingleFileParserInterfaceNames:
-            raise(Exception("lambda event - invalid functionName "+functionName+" for interface SingleFileParser"))
+            raise(Exception("lambda event - invalid functionName "+str(functionName)+" for interface SingleFileParser"))
     
     if functionName == "getS3FileType":
         letsdata_assert(data is None or len(data) == 0, "invalid data - SingleFileParser.getS3FileType requires empty data dictionary")
@@ -75,56 +151,36 @@ def getSingleFileParserRequest(requestId : str, letsDataAuth: LetsDataAuthParams
     
     elif functionName == "getResolvedS3FileName":
         letsdata_assert(batchedData is None or len(batchedData) == 0, "invalid data - SingleFileParser.getResolvedS3FileName requires empty batchedData dictionary")
-        letsdata_assert(isinstance(data, dict) and len(data) == 2, "invalid data - SingleFileParser.getResolvedS3FileName requires data keys [s3FileType, fileName]")
-        
-        letsdata_assert(not data['s3FileType'] is None, "invalid s3FileType - None - SingleFileParser.getResolvedS3FileName requires data keys [s3FileType, fileName]")
-        letsdata_assert(isinstance(data['s3FileType'], str), "invalid s3FileType - SingleFileParser.getResolvedS3FileName requires s3FileType value to be string")
-
-        letsdata_assert(not data['fileName'] is None, "invalid fileName - None - SingleFileParser.getResolvedS3FileName requires data keys [s3FileType, fileName]")
-        letsdata_assert(isinstance(data['fileName'], str), "invalid fileName - SingleFileParser.getResolvedS3FileName requires fileName value to be string")
+        validateGetResolvedS3FileNameData(data)
         return SingleFileParser_GetResolvedS3FileName(requestId, letsDataAuth, interfaceName, functionName, data['s3FileType'], data['fileName'])
     
     elif functionName == "getRecordStartPattern":
         letsdata_assert(batchedData is None or len(batchedData) == 0, "invalid data - SingleFileParser.getRecordStartPattern requires empty batchedData dictionary")
-        letsdata_assert(isinstance(data, dict) and len(data) == 1, "invalid data - SingleFileParser.getRecordStartPattern requires data keys [s3FileType]")
-        
-        letsdata_assert(not data['s3FileType'] is None, "invalid s3FileType - None - SingleFileParser.getRecordStartPattern requires data keys [s3FileType]")
-        letsdata_assert(isinstance(data['s3FileType'], str), "invalid s3FileType - SingleFileParser.getRecordStartPattern requires s3FileType value to be string")
+        validateGetRecordStartPatternData(data)
         return SingleFileParser_GetRecordStartPattern(requestId, letsDataAuth, interfaceName, functionName, data['s3FileType'])
             
     elif functionName == "getRecordEndPattern":
         letsdata_assert(batchedData is None or len(batchedData) == 0, "invalid data - SingleFileParser.getRecordEndPattern requires empty batchedData dictionary")
-        letsdata_assert(isinstance(data, dict) and len(data) == 1, "invalid data - SingleFileParser.getRecordEndPattern requires data keys [s3FileType]")
-        
-        letsdata_assert(not data['s3FileType'] is None, "invalid s3FileType - None - SingleFileParser.getRecordStartPattern requires data keys [s3FileType]")
-        letsdata_assert(isinstance(data['s3FileType'], str), "invalid s3FileType - SingleFileParser.getRecordStartPattern requires s3FileType value to be string")
+        validateGetRecordEndPatternData(data)
         return SingleFileParser_GetRecordEndPattern(requestId, letsDataAuth, interfaceName, functionName, data['s3FileType'])
     
-    elif functionName == "parseDocument":
-        letsdata_assert(batchedData is None or len(batchedData) == 0, "invalid data - SingleFileParser.parseDocument requires empty batchedData dictionary")
-        letsdata_assert(isinstance(data, dict) and len(data) == 6, "invalid data - SingleFileParser.parseDocument requires data keys [s3FileType, fileName, offsetBytes, content, startIndex, endIndex]")
-        
-        letsdata_assert(not data['s3FileType'] is None, "invalid s3FileType - None - SingleFileParser.parseDocument requires data keys [s3FileType, fileName, offsetBytes, content, startIndex, endIndex]")
-        letsdata_assert(isinstance(data['s3FileType'], str), "invalid s3FileType - SingleFileParser.parseDocument requires s3FileType value to be string")
+    elif functionName == "getRecordParseHints":
+        letsdata_assert(batchedData is None or len(batchedData) == 0, "invalid data - SingleFileParser.getRecordParseHints requires empty batchedData dictionary")
+        if data is None:
+            data = {}
+        validateGetRecordParseHintsData(data)
+        return SingleFileParser_GetRecordParseHints(requestId, letsDataAuth, interfaceName, functionName, data.get('s3FileTypes'))
 
-        letsdata_assert(not data['fileName'] is None, "invalid fileName - None - SingleFileParser.parseDocument requires data keys [s3FileType, fileName, offsetBytes, content, startIndex, endIndex]")
-        letsdata_assert(isinstance(data['fileName'], str), "invalid fileName - SingleFileParser.parseDocument requires fileName value to be string")
-        
-        letsdata_assert(not data['offsetBytes'] is None, "invalid offsetBytes - None - SingleFileParser.parseDocument requires data keys [s3FileType, fileName, offsetBytes, content, startIndex, endIndex]")
-        letsdata_assert(isinstance(data['offsetBytes'], int), "invalid offsetBytes - SingleFileParser.parseDocument requires offsetBytes value to be int")
-        
-        letsdata_assert(not data['content'] is None, "invalid content - None - SingleFileParser.parseDocument requires data keys [s3FileType, fileName, offsetBytes, content, startIndex, endIndex]")
-        letsdata_assert(isinstance(data['content'], str), "invalid content - SingleFileParser.parseDocument requires content value to be str")
-
-        letsdata_assert(not data['startIndex'] is None, "invalid startIndex - None - SingleFileParser.parseDocument requires data keys [s3FileType, fileName, offsetBytes, content, startIndex, endIndex]")
-        letsdata_assert(isinstance(data['startIndex'], int), "invalid startIndex - SingleFileParser.parseDocument requires startIndex value to be int")
-
-        letsdata_assert(not data['endIndex'] is None, "invalid startIndex - None - SingleFileParser.parseDocument requires data keys [s3FileType, fileName, offsetBytes, content, startIndex, endIndex]")
-        letsdata_assert(isinstance(data['endIndex'], int), "invalid startIndex - SingleFileParser.parseDocument requires endIndex value to be int")        
+    elif functionName == "parseDocument":
+        if batchedData is not None and len(batchedData) > 0:
+            letsdata_assert(isinstance(batchedData, list), "invalid batchedData - SingleFileParser.parseDocument requires batchedData to be a list")
+            letsdata_assert(data is None or len(data) == 0, "invalid data - SingleFileParser.parseDocument requires empty data dictionary when batchedData is specified")
+            return BatchedServiceRequest(requestId, letsDataAuth, interfaceName, functionName, batchedData, lambda batchItem: getSingleFileParserRequest(requestId, letsDataAuth, interfaceName, functionName, batchItem, None))
         
-        return SingleFileParser_ParseDocument(requestId, letsDataAuth, interfaceName, functionName, data['s3FileType'], data['fileName'], data['offsetBytes'], data['content'], data['startIndex'], data['endIndex'])
+        validateParseDocumentData(data)
+        return SingleFileParser_ParseDocument(requestId, letsDataAuth, interfaceName, functionName, data['s3FileType'], data['fileName'], data['offsetBytes'], data['content'], data['startIndex'], data['endIndex'], data.get('contentEncoding'))
 
     else:
         raise(Exception())
 
-    
\ No newline at end of file
+    
@@ -0,0 +1,85 @@
+from letsdata_utils.logging_utils import logger
+from letsdata_utils.validations import letsdata_assert
+from letsdata_utils.envelope_utils import encodeGzipBase64, decodeGzipBase64
+
+'''
+    The tumbling window for the stream readers' windowed aggregation (the KinesisRecordReader.aggregateMessages and DynamoDBStreamsRecordReader.aggregateRecords service functions).
+
+    The records are assigned to fixed, non overlapping windows by their timestamp - the window for a timestamp is [timestamp - timestamp % windowLength, + windowLength).
+    The timestamps are in the reader's record timestamp units (epoch millis for the Kinesis approximateArrivalTimestamp, epoch seconds for the DynamoDB Streams approximateCreationDateTime).
+    The open window's per key state (a json compatible dict that the reader's aggregate function updates) is carried across the invocations as a compact
+    gzip+base64 json string:
+
+        {
+            "windowStartTimestamp": 1700000000,
+            "windowEndTimestamp": 1700000060,
+            "state": {"key": <json compatible aggregate>, ...}
+        }
+
+    A window is closed when a record for a later window arrives (or the currentTimestamp is past the window's end) - the closed windows are then emitted as aggregate documents.
+    Late records (records whose window has already been closed) are aggregated into the open window.
+'''
+class TumblingWindow:
+    def __init__(self, windowSeconds : int, timestampsPerSecond : int, serializedWindowState : str = None) -> None:
+        letsdata_assert(windowSeconds is not None and windowSeconds > 0, "invalid aggregation window - the reader's getAggregationWindowSeconds should return the window size (> 0 seconds), got %s", windowSeconds)
+        self.windowLength = windowSeconds * timestampsPerSecond
+        self.windowStartTimestamp = None
+        self.windowEndTimestamp = None
+        self.windowState = None
+        self.closedWindows = []
+        if serializedWindowState is not None:
+            windowState = decodeGzipBase64(serializedWindowState)
+            self.windowStartTimestamp = windowState['windowStartTimestamp']
+            self.windowEndTimestamp = windowState['windowEndTimestamp']
+            self.windowState = windowState['state']
+
+    '''
+        Returns the per key state dict of the window for the record's timestamp - closes the open window if the timestamp is past its end.
+    '''
+    def getWindowState(self, timestamp : int) -> dict:
+        if self.windowState is not None and timestamp < self.windowEndTimestamp:
+            return self.windowState
+        if self.windowState is not None:
+            self.closeWindow()
+        self.windowStartTimestamp = timestamp - timestamp % self.windowLength
+        self.windowEndTimestamp = self.windowStartTimestamp + self.windowLength
+        self.windowState = {}
+        return self.windowState
+
+    '''
+        Closes the open window if the currentTimestamp is past its end (for example, to emit the last window when the stream has no new records).
+    '''
+    def closeIfExpired(self, currentTimestamp : int) -> None:
+        if self.windowState is not None and currentTimestamp >= self.windowEndTimestamp:
+            self.closeWindow()
+
+    def closeWindow(self) -> None:
+        logger.debug("closing aggregation window - windowStartTimestamp: "+str(self.windowStartTimestamp)+", windowEndTimestamp: "+str(self.windowEndTimestamp)+", keyCount: "+str(len(self.windowState)))
+        self.closedWindows.append((self.windowStartTimestamp, self.windowEndTimestamp, self.windowState))
+        self.windowStartTimestamp = None
+        self.windowEndTimestamp = None
+        self.windowState = None
+
+    '''
+        Emits the closed windows' aggregate documents using the reader's emitAggregateDocuments(windowStartTimestamp, windowEndTimestamp, windowState) and returns the
+        aggregation response (the documents, the closed windows and the open window's serialized state to send with the next invocation).
+    '''
+    def getResponse(self, emitAggregateDocuments, checkpointSequenceNumber : str) -> dict:
+        documents = []
+        closedWindows = []
+        for windowStartTimestamp, windowEndTimestamp, windowState in self.closedWindows:
+            windowDocuments = emitAggregateDocuments(windowStartTimestamp, windowEndTimestamp, windowState)
+            if windowDocuments is not None:
+                documents.extend(windowDocuments)
+            closedWindows.append({"windowStartTimestamp": windowStartTimestamp, "windowEndTimestamp": windowEndTimestamp, "keyCount": len(windowState)})
+        return {
+            "documents": documents,
+            "closedWindows": closedWindows,
+            "windowState": self.serialize(),
+            "checkpointSequenceNumber": checkpointSequenceNumber
+        }
+
+    def serialize(self) -> str:
+        if self.windowState is None:
+            return None
+        return encodeGzipBase64({"windowStartTimestamp": self.windowStartTimestamp, "windowEndTimestamp": self.windowEndTimestamp, "state": self.windowState})
@@ -0,0 +1,154 @@
+import time, random
+from letsdata_utils.logging_utils import logger
+
+'''
+    Benchmarks for the optional fast paths in the package - these are meant to be run locally (or in the devcontainer) to decide when a fast path should be enabled. 
+    For example:
+
+        from letsdata_utils.benchmark_utils import benchmarkEnvelope
+        for row in benchmarkEnvelope():
+            print(row)
+'''
+
+BENCHMARK_WORDS = ["the", "data", "record", "lambda", "stream", "document", "parser", "crawl", "response", "content", "html", "text", "news", "latest", "world", 
+                   "weather", "video", "page", "index", "search", "result", "market", "report", "update", "today", "2023", "12", "https", "www", "com"]
+
+def timeIt(function, iterations : int) -> float:
+    startTime = time.perf_counter()
+    for index in range(0, iterations):
+        function()
+    return (time.perf_counter() - startTime) / iterations
+
+def getBenchmarkText(sizeBytes : int, seed : int = 7) -> str:
+    randomGenerator = random.Random(seed)
+    words = []
+    length = 0
+    while length < sizeBytes:
+        word = randomGenerator.choice(BENCHMARK_WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:sizeBytes]
+
+'''
+    Compares the plain json payload with the gzip+base64 envelope for different payload sizes. For each size, reports the payload bytes, the encode + decode seconds 
+    and the net seconds saved when the payload is transferred at transferBytesPerSecond. The break-even size is the smallest size with a positive netSecondsSaved. 
+    Lambda's payload limit (6 MB) is a hard limit regardless of time - the compressed envelope fits more data under it at any size.
+'''
+def benchmarkEnvelope(payloadSizes : tuple = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304), iterations : int = 20, transferBytesPerSecond : int = 50 * 1024 * 1024) -> list:
+    from letsdata_utils.json_utils import toJsonString, fromJsonString
+    from letsdata_utils.envelope_utils import encodeGzipBase64, decodeGzipBase64
+    results = []
+    for payloadSize in payloadSizes:
+        data = {"s3FileType": "WARC", "fileName": "benchmark.warc", "offsetBytes": 0, "content": getBenchmarkText(payloadSize), "startIndex": 0, "endIndex": payloadSize}
+        plainJson = toJsonString(data)
+        encoded = encodeGzipBase64(data)
+        plainSeconds = timeIt(lambda: fromJsonString(toJsonString(data)), iterations)
+        envelopeSeconds = timeIt(lambda: decodeGzipBase64(encodeGzipBase64(data)), iterations)
+        transferSecondsSaved = (len(plainJson) - len(encoded)) / transferBytesPerSecond
+        results.append({
+            "payloadSize": payloadSize,
+            "plainBytes": len(plainJson),
+            "envelopeBytes": len(encoded),
+            "compressionRatio": round(len(plainJson) / len(encoded), 2),
+            "plainSeconds": plainSeconds,
+            "envelopeSeconds": envelopeSeconds,
+            "netSecondsSaved": transferSecondsSaved - (envelopeSeconds - plainSeconds)
+        })
+        logger.debug("benchmarkEnvelope - "+str(results[-1]))
+    return results
+
+'''
+    Measures the memory (tracemalloc bytes) per parsed record for documentCount ParseDocumentResult(Document) objects - the compact __slots__ document classes are 
+    compared with the equivalent __dict__ based classes (the previous document layout). The bytes include the per record documentId / partitionKey strings.
+'''
+def benchmarkDocumentMemory(documentCount : int = 100000) -> dict:
+    import tracemalloc
+    from letsdata_interfaces.documents.Document import Document
+    from letsdata_interfaces.documents.DocumentType import DocumentType
+    from letsdata_interfaces.readers.model.ParseDocumentResult import ParseDocumentResult
+    from letsdata_interfaces.readers.model.ParseDocumentResultStatus import ParseDocumentResultStatus
+
+    class DictDocument:
+        def __init__(self, documentType, documentId, recordType, partitionKey, documentMetadata, documentKeyValuesMap):
+            self.documentType = documentType
+            self.documentId = documentId
+            self.recordType = recordType
+            self.partitionKey = partitionKey
+            self.documentMetadata = documentMetadata
+            self.documentKeyValuesMap = documentKeyValuesMap
+
+    class DictParseDocumentResult:
+        def __init__(self, nextRecordType, document, status):
+            self.nextRecordType = nextRecordType
+            self.document = document
+            self.status = status
+
+    def measure(documentClass, resultClass) -> float:
+        tracemalloc.start()
+        startBytes = tracemalloc.get_traced_memory()[0]
+        results = [resultClass(None, documentClass(DocumentType.Document, "doc-"+str(index), "WARC", "partition-"+str(index % 100), None, None), ParseDocumentResultStatus.SUCCESS) for index in range(0, documentCount)]
+        usedBytes = tracemalloc.get_traced_memory()[0] - startBytes
+        tracemalloc.stop()
+        del results
+        return usedBytes / documentCount
+
+    result = {
+        "documentCount": documentCount,
+        "dictBytesPerDocument": round(measure(DictDocument, DictParseDocumentResult), 1),
+        "slotsBytesPerDocument": round(measure(Document, ParseDocumentResult), 1)
+    }
+    logger.debug("benchmarkDocumentMemory - "+str(result))
+    return result
+
+'''
+    Compares the AttributeValueDecoder with the boto3 TypeDeserializer for itemCount DynamoDB items with attributeCount attributes (a mix of the S, N, BOOL, M, L and SS 
+    attributes, such as a stream record's newImage). Reports the seconds per item for the full decode, for the decode with a projection of projectedAttributeCount 
+    attributes and for the TypeDeserializer (if boto3 is installed).
+'''
+def benchmarkAttributeValueDecoder(itemCount : int = 1000, attributeCount : int = 100, projectedAttributeCount : int = 5) -> dict:
+    from letsdata_interfaces.readers.dynamodb.AttributeValueDecoder import AttributeValueDecoder
+    randomGenerator = random.Random(7)
+
+    def getAttributeValue(index : int) -> dict:
+        attributeKind = index % 6
+        if attributeKind == 0:
+            return {"S": getBenchmarkText(32, seed=index)}
+        elif attributeKind == 1:
+            return {"N": str(randomGenerator.randint(0, 1000000))}
+        elif attributeKind == 2:
+            return {"N": str(randomGenerator.random() * 1000)}
+        elif attributeKind == 3:
+            return {"BOOL": index % 2 == 0}
+        elif attributeKind == 4:
+            return {"M": {"name": {"S": "name-"+str(index)}, "count": {"N": str(index)}, "tags": {"L": [{"S": "a"}, {"N": "1"}]}}}
+        return {"SS": ["red", "green", "blue-"+str(index)]}
+
+    items = [{"attribute"+str(index): getAttributeValue(index) for index in range(0, attributeCount)} for itemIndex in range(0, itemCount)]
+
+    def decodeAll(decoder) -> None:
+        for item in items:
+            decoder.decodeItem(item)
+
+    decoder = AttributeValueDecoder()
+    projectedDecoder = AttributeValueDecoder(["attribute"+str(index) for index in range(0, projectedAttributeCount)])
+    result = {
+        "itemCount": itemCount,
+        "attributeCount": attributeCount,
+        "decoderSecondsPerItem": timeIt(lambda: decodeAll(decoder), 1) / itemCount,
+        "projectedDecoderSecondsPerItem": timeIt(lambda: decodeAll(projectedDecoder), 1) / itemCount,
+        "typeDeserializerSecondsPerItem": None
+    }
+    try:
+        from boto3.dynamodb.types import TypeDeserializer
+    except ImportError:
+        logger.debug("benchmarkAttributeValueDecoder - boto3 is not installed, skipping the TypeDeserializer benchmark")
+    else:
+        typeDeserializer = TypeDeserializer()
+
+        def deserializeAll() -> None:
+            for item in items:
+                {name: typeDeserializer.deserialize(value) for name, value in item.items()}
+
+        result["typeDeserializerSecondsPerItem"] = timeIt(deserializeAll, 1) / itemCount
+    logger.debug("benchmarkAttributeValueDecoder - "+str(result))
+    return result
@@ -0,0 +1,178 @@
+import time, threading, hashlib
+from collections import OrderedDict
+from letsdata_utils.logging_utils import logger
+from letsdata_utils.validations import letsdata_assert
+from letsdata_interfaces.documents.SkipDoc import SkipDoc
+from letsdata_interfaces.readers.model.ParseDocumentResult import ParseDocumentResult
+from letsdata_interfaces.readers.model.ParseDocumentResultStatus import ParseDocumentResultStatus
+
+'''
+    Per container deduplication of the at least once deliveries (SQS, Kinesis) - the readers return a DedupCache from their getDeduplicationCache() and #Lets Data
+    skips the records that have already been processed by the container (the duplicates are returned as SkipDocs). The keys are:
+
+        messageDeduplicationId: the SQS message's messageDeduplicationId (the messageId for the messages without a messageDeduplicationId) - checked before the parse
+        sequenceNumber:         the Kinesis record's streamArn, shardId and sequenceNumber - checked before the parse
+        documentId:             the parsed document's documentId - checked after the parse (saves the duplicate writes, not the parse)
+
+    A key is checked and reserved in a single step (containsOrAdd) before the record is processed, so that the duplicates that are processed concurrently (the SQS
+    message groups) are not both processed, and the reservation is removed if the processing throws, so the failed records are processed again on redelivery. A duplicate
+    that arrives while the first record is in flight is skipped. The cache is bounded by maxEntries
+    (the least recently used keys are evicted) and the keys expire after ttlSeconds. Optionally, the keys that are evicted for the capacity are remembered in a Bloom filter
+    (bloomFilterBits > 0) for another one to two ttlSeconds - this extends the deduplication to bursts larger than the cache at a fixed memory cost, but a Bloom filter
+    false positive skips a record that is not a duplicate (use bloomFilterBits >= ~10 bits per evicted key for a ~1% false positive rate).
+
+    The cache is per container - the duplicates that are delivered to a different container are not detected.
+'''
+
+DEDUP_KEY_MESSAGE_DEDUPLICATION_ID = "messageDeduplicationId"
+DEDUP_KEY_SEQUENCE_NUMBER = "sequenceNumber"
+DEDUP_KEY_DOCUMENT_ID = "documentId"
+DEDUP_KEYS = frozenset([DEDUP_KEY_MESSAGE_DEDUPLICATION_ID, DEDUP_KEY_SEQUENCE_NUMBER, DEDUP_KEY_DOCUMENT_ID])
+
+class BloomFilter:
+    def __init__(self, bits : int, hashes : int = 7) -> None:
+        self.bits = bits
+        self.hashes = hashes
+        self.bitArray = bytearray((bits + 7) // 8)
+
+    def getPositions(self, key : str) -> list:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[0:8], "little")
+        second = int.from_bytes(digest[8:16], "little") | 1
+        return [(first + index * second) % self.bits for index in range(0, self.hashes)]
+
+    def add(self, key : str) -> None:
+        for position in self.getPositions(key):
+            self.bitArray[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key : str) -> bool:
+        for position in self.getPositions(key):
+            if not self.bitArray[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+class DedupCache:
+    def __init__(self, keyType : str, maxEntries : int = 100000, ttlSeconds : int = 900, bloomFilterBits : int = 0) -> None:
+        letsdata_assert(keyType in DEDUP_KEYS, "invalid DedupCache keyType - expected one of %s, got %s", sorted(DEDUP_KEYS), keyType)
+        letsdata_assert(maxEntries > 0 and ttlSeconds > 0, "invalid DedupCache - maxEntries and ttlSeconds should be > 0, got maxEntries: %s, ttlSeconds: %s", maxEntries, ttlSeconds)
+        self.keyType = keyType
+        self.maxEntries = maxEntries
+        self.ttlSeconds = ttlSeconds
+        self.bloomFilterBits = bloomFilterBits
+        # key -> expiry time, in the least recently used first order
+        self.entries = OrderedDict()
+        self.bloomFilters = []
+        self.bloomFilterRotationTime = None
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def getKeyType(self) -> str:
+        return self.keyType
+
+    '''
+        Returns True if the key has been processed (and has not expired) - counts the hit / miss.
+    '''
+    def contains(self, key : str) -> bool:
+        with self.lock:
+            return self.containsKey(key, time.monotonic())
+
+    '''
+        Atomically checks and reserves the key - returns True if the key has been processed (or is being processed), otherwise adds the key and returns False.
+        The caller removes the key if the processing fails.
+    '''
+    def containsOrAdd(self, key : str) -> bool:
+        now = time.monotonic()
+        with self.lock:
+            if self.containsKey(key, now):
+                return True
+            self.addKey(key, now)
+            return False
+
+    '''
+        Adds the processed key - evicts the expired keys and the least recently used keys over maxEntries.
+    '''
+    def add(self, key : str) -> None:
+        with self.lock:
+            self.addKey(key, time.monotonic())
+
+    '''
+        Removes the key (a reservation whose processing failed) so that the record is processed on redelivery.
+    '''
+    def remove(self, key : str) -> None:
+        with self.lock:
+            self.entries.pop(key, None)
+
+    # containsKey and addKey are called with the lock held
+    def containsKey(self, key : str, now : float) -> bool:
+        expiryTime = self.entries.get(key)
+        if expiryTime is not None and expiryTime > now:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return True
+        if expiryTime is not None:
+            del self.entries[key]
+        elif self.bloomFilterBits > 0:
+            self.rotateBloomFilters(now)
+            for bloomFilter in self.bloomFilters:
+                if key in bloomFilter:
+                    self.hits += 1
+                    return True
+        self.misses += 1
+        return False
+
+    def addKey(self, key : str, now : float) -> None:
+        self.entries[key] = now + self.ttlSeconds
+        self.entries.move_to_end(key)
+        while len(self.entries) > 0:
+            oldestKey, expiryTime = next(iter(self.entries.items()))
+            if expiryTime > now and len(self.entries) <= self.maxEntries:
+                break
+            del self.entries[oldestKey]
+            if expiryTime > now:
+                self.evictions += 1
+                if self.bloomFilterBits > 0:
+                    self.rotateBloomFilters(now)
+                    self.bloomFilters[0].add(oldestKey)
+
+    '''
+        The Bloom filter generations - a new generation is started every ttlSeconds and the generations older than the previous one are dropped. The previous
+        generation is dropped as well when the cache has been idle for more than a generation.
+    '''
+    def rotateBloomFilters(self, now : float) -> None:
+        if self.bloomFilterRotationTime is None or now >= self.bloomFilterRotationTime:
+            previousBloomFilters = self.bloomFilters[0:1] if self.bloomFilterRotationTime is not None and now < self.bloomFilterRotationTime + self.ttlSeconds else []
+            self.bloomFilters = [BloomFilter(self.bloomFilterBits)] + previousBloomFilters
+            self.bloomFilterRotationTime = now + self.ttlSeconds
+
+    def getStats(self) -> dict:
+        with self.lock:
+            return {
+                "keyType": self.keyType,
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hitRate": self.hits / (self.hits + self.misses) if self.hits + self.misses > 0 else 0.0
+            }
+
+    '''
+        The SkipDoc result that is returned for a duplicate record.
+    '''
+    def getDuplicateResult(self, key : str, partitionKey : str = None) -> ParseDocumentResult:
+        logger.debug("duplicate record skipped - keyType: "+self.keyType+", key: "+str(key))
+        skipDoc = SkipDoc(key if self.keyType == DEDUP_KEY_DOCUMENT_ID else None, None, partitionKey, None, None, None, None, "duplicate record - "+self.keyType+": "+str(key)+" has already been processed")
+        return ParseDocumentResult(None, skipDoc, ParseDocumentResultStatus.SKIP)
+
+    '''
+        Deduplicates a parse result by the documentId (for the documentId keyType) - returns the SkipDoc result for a duplicate document and adds the documentId
+        of a successfully parsed document. The results for the other keyTypes are returned as is.
+    '''
+    def deduplicateResult(self, result : ParseDocumentResult) -> ParseDocumentResult:
+        if self.keyType != DEDUP_KEY_DOCUMENT_ID or result is None or result.getStatus() != ParseDocumentResultStatus.SUCCESS or result.getDocument() is None or result.getDocument().getDocumentId() is None:
+            return result
+        documentId = result.getDocument().getDocumentId()
+        if self.containsOrAdd(documentId):
+            return self.getDuplicateResult(documentId, result.getDocument().getPartitionKey())
+        return result
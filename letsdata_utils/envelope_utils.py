@@ -0,0 +1,67 @@
+import gzip, base64
+from letsdata_utils.logging_utils import logger
+from letsdata_utils.validations import letsdata_assert
+from letsdata_utils.json_utils import toJsonString, fromJsonString
+
+'''
+    Optional compressed request / response envelopes for large payloads. The envelope is negotiated by fields in the lambda event:
+
+    {
+        "requestId": "requestId",
+        "interface": "SingleFileParser",
+        "function": "parseDocument",
+        "letsdataAuth": {...},
+        "requestEncoding": "gzip+base64",                   # optional - the data / batchedData values are base64(gzip(json)) strings
+        "acceptEncoding": "gzip+base64",                    # optional - the response data can be returned as a base64(gzip(json)) string
+        "compressionThresholdBytes": 4096,                  # optional - response data smaller than this (as json) is returned uncompressed 
+        "data": "H4sIAAAAAAAC/6tWSs7PS8tMTs1LS...",
+        "batchedData": "H4sIAAAAAAAC/4uOBQApu0wNAgAAAA=="
+    }
+
+    When the response data is compressed, the response body has "contentEncoding": "gzip+base64" and the data is the encoded string. 
+    Use benchmark_utils.benchmarkEnvelope to find the size where compression pays for itself.
+'''
+GZIP_BASE64_ENCODING = "gzip+base64"
+DEFAULT_COMPRESSION_THRESHOLD_BYTES = 4096
+COMPRESSION_LEVEL = 1
+
+def encodeGzipBase64(jsonObject : object) -> str:
+    jsonBytes = toJsonString(jsonObject).encode("utf-8")
+    return base64.b64encode(gzip.compress(jsonBytes, compresslevel=COMPRESSION_LEVEL, mtime=0)).decode("ascii")
+
+def decodeGzipBase64(encoded : str) -> object:
+    return fromJsonString(gzip.decompress(base64.b64decode(encoded)))
+
+'''
+    Returns the event with the data / batchedData decoded if the event's requestEncoding is gzip+base64, otherwise returns the event as is.
+'''
+def decodeRequestEnvelope(event : dict) -> dict:
+    requestEncoding = event.get('requestEncoding')
+    if requestEncoding is None:
+        return event
+    
+    letsdata_assert(requestEncoding == GZIP_BASE64_ENCODING, "invalid requestEncoding - expected %s, got %s", GZIP_BASE64_ENCODING, requestEncoding)
+    decodedEvent = dict(event)
+    for keyName in ['data', 'batchedData']:
+        if decodedEvent.get(keyName) is not None:
+            letsdata_assert(isinstance(decodedEvent[keyName], str), "invalid %s - requestEncoding %s requires %s value to be string", keyName, GZIP_BASE64_ENCODING, keyName)
+            decodedEvent[keyName] = decodeGzipBase64(decodedEvent[keyName])
+    return decodedEvent
+
+'''
+    Encodes the response data (json object) if the event accepts the gzip+base64 encoding and the data is larger than the compression threshold. 
+    Returns the tuple (data, contentEncoding) where contentEncoding is None for uncompressed data.
+'''
+def encodeResponseData(jsonObject : object, event : dict):
+    if event.get('acceptEncoding') != GZIP_BASE64_ENCODING:
+        return (jsonObject, None)
+    
+    thresholdBytes = event.get('compressionThresholdBytes', DEFAULT_COMPRESSION_THRESHOLD_BYTES)
+    letsdata_assert(isinstance(thresholdBytes, int) and not isinstance(thresholdBytes, bool) and thresholdBytes >= 0, "invalid compressionThresholdBytes - expected a non negative int, got %s", thresholdBytes)
+    jsonBytes = toJsonString(jsonObject).encode("utf-8")
+    if len(jsonBytes) < thresholdBytes:
+        return (jsonObject, None)
+    
+    encoded = base64.b64encode(gzip.compress(jsonBytes, compresslevel=COMPRESSION_LEVEL, mtime=0)).decode("ascii")
+    logger.debug("response data compressed - jsonBytes: "+str(len(jsonBytes))+", encodedBytes: "+str(len(encoded)))
+    return (encoded, GZIP_BASE64_ENCODING)
@@ -0,0 +1,148 @@
+import os, gzip, zlib, json, bisect
+from letsdata_utils.logging_utils import logger
+from letsdata_utils.validations import letsdata_assert
+
+'''
+    Random access index for multi member gzip files (for example, the CommonCrawl *.warc.gz / *.warc.wet.gz files where each record is a separate gzip member).
+
+    A gzip member can be decompressed independently, so the index maps each member's compressed offset to its uncompressed offset. A reader can then seek
+    to the member that contains an uncompressed offset and decompress from there instead of from the start of the file. The index is saved as a json
+    sidecar next to the file (<file>.idx.json):
+
+        {
+            "version": 1,
+            "compressedSize": 12345,
+            "uncompressedSize": 67890,
+            "members": [[uncompressedOffset, compressedOffset], ...]
+        }
+
+    A single member gzip file has a single entry and can only be read from its start.
+'''
+
+GZIP_INDEX_VERSION = 1
+GZIP_INDEX_SUFFIX = ".idx.json"
+READ_CHUNK_BYTES = 1024 * 1024
+
+def getGzipIndexPath(path : str) -> str:
+    return path + GZIP_INDEX_SUFFIX
+
+'''
+    Builds the member index by decompressing the file once - each member's decompressor reports the end of the member and the bytes after it are the next member.
+'''
+def buildGzipIndex(path : str) -> dict:
+    members = []
+    compressedOffset = 0
+    uncompressedOffset = 0
+    with open(path, "rb") as file:
+        decompressor = None
+        pending = b""
+        while True:
+            if len(pending) == 0:
+                pending = file.read(READ_CHUNK_BYTES)
+                if len(pending) == 0:
+                    break
+            if decompressor is None:
+                members.append([uncompressedOffset, compressedOffset])
+                decompressor = zlib.decompressobj(wbits=31)
+            uncompressedOffset += len(decompressor.decompress(pending))
+            if decompressor.eof:
+                unusedData = decompressor.unused_data
+                compressedOffset += len(pending) - len(unusedData)
+                pending = unusedData
+                decompressor = None
+            else:
+                compressedOffset += len(pending)
+                pending = b""
+        letsdata_assert(decompressor is None, "invalid gzip file - the last member is truncated - file: %s", path)
+    return {"version": GZIP_INDEX_VERSION, "compressedSize": compressedOffset, "uncompressedSize": uncompressedOffset, "members": members}
+
+def saveGzipIndex(path : str, index : dict) -> None:
+    indexPath = getGzipIndexPath(path)
+    with open(indexPath + ".tmp", "w") as file:
+        json.dump(index, file, separators=(',', ':'))
+    os.replace(indexPath + ".tmp", indexPath)
+
+'''
+    Loads the saved index for the file - returns None if there is no saved index or the saved index is stale (the file size has changed).
+'''
+def loadGzipIndex(path : str) -> dict:
+    indexPath = getGzipIndexPath(path)
+    if not os.path.exists(indexPath):
+        return None
+    with open(indexPath, "r") as file:
+        index = json.load(file)
+    if index.get("version") != GZIP_INDEX_VERSION or index.get("compressedSize") != os.path.getsize(path):
+        logger.debug("gzip index is stale - rebuilding - file: "+path)
+        return None
+    return index
+
+'''
+    Returns the file's saved index, or builds and saves the index if it does not exist. The index is still returned if it could not be saved (read only directory).
+'''
+def getGzipIndex(path : str) -> dict:
+    index = loadGzipIndex(path)
+    if index is None:
+        index = buildGzipIndex(path)
+        try:
+            saveGzipIndex(path, index)
+        except OSError as err:
+            logger.debug("could not save the gzip index - file: "+path+", error: "+str(err))
+    return index
+
+'''
+    Returns the (uncompressedOffset, compressedOffset) of the member that contains the uncompressed offset.
+'''
+def findGzipMember(index : dict, uncompressedOffset : int) -> list:
+    members = index["members"]
+    letsdata_assert(0 <= uncompressedOffset <= index["uncompressedSize"], "invalid uncompressedOffset - %s is not in the file's [0, %s] range", uncompressedOffset, index["uncompressedSize"])
+    # the members are sorted by the uncompressed offset - find the last member that starts at or before the offset
+    memberIndex = bisect.bisect_right(members, [uncompressedOffset, float("inf")]) - 1
+    return members[max(memberIndex, 0)]
+
+'''
+    Opens the file as a decompressed stream positioned at the uncompressed offset. The stream is decompressed from the containing member's start and the bytes
+    before the offset in that member are skipped.
+'''
+def openGzipAt(path : str, index : dict, uncompressedOffset : int):
+    memberUncompressedOffset, compressedOffset = findGzipMember(index, uncompressedOffset)
+    file = open(path, "rb")
+    try:
+        file.seek(compressedOffset)
+        stream = gzip.GzipFile(fileobj=file, mode="rb")
+        skipBytes = uncompressedOffset - memberUncompressedOffset
+        while skipBytes > 0:
+            skipped = len(stream.read(min(skipBytes, READ_CHUNK_BYTES)))
+            letsdata_assert(skipped > 0, "invalid uncompressedOffset - unexpected end of file - file: %s", path)
+            skipBytes -= skipped
+    except Exception:
+        file.close()
+        raise
+    return GzipIndexStream(stream, file)
+
+'''
+    The decompressed stream returned by openGzipAt - closes the underlying file with the stream.
+'''
+class GzipIndexStream:
+    def __init__(self, stream : gzip.GzipFile, file) -> None:
+        self.stream = stream
+        self.file = file
+
+    def read(self, size : int = -1) -> bytes:
+        return self.stream.read(size)
+
+    def close(self) -> None:
+        self.stream.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback) -> None:
+        self.close()
+
+'''
+    Reads the uncompressed bytes in the [uncompressedStart, uncompressedEnd) range.
+'''
+def readGzipRange(path : str, index : dict, uncompressedStart : int, uncompressedEnd : int) -> bytes:
+    with openGzipAt(path, index, uncompressedStart) as stream:
+        return stream.read(uncompressedEnd - uncompressedStart)
@@ -0,0 +1,180 @@
+import json, base64
+from enum import Enum
+from letsdata_utils.logging_utils import logger
+
+# orjson is an optional faster json backend - used when installed, otherwise the standard library json is used
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+'''
+    Single pass serializer that converts the response objects (documents, results, enums, lists, bytes etc) to json compatible python objects (dict, list, str, int, float, bool, None).
+    The encoder is looked up by the object's type - the letsdata types have type specific encoders, other objects are encoded from their __dict__ / __slots__ attributes.
+'''
+def getJsonObject(input : object):
+    encoder = jsonEncoders.get(type(input))
+    if encoder is None:
+        encoder = getJsonEncoder(type(input))
+    return encoder(input)
+
+'''
+    Serializes the object to a json string using the faster backend (orjson) if installed. Both backends produce compact json (no whitespace).
+'''
+def toJsonString(input : object) -> str:
+    jsonObject = getJsonObject(input)
+    if orjson is not None:
+        return orjson.dumps(jsonObject, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(jsonObject, separators=(',', ':'))
+
+'''
+    Parses the json string (or utf-8 json bytes) using the faster backend (orjson) if installed.
+'''
+def fromJsonString(input):
+    if orjson is not None:
+        return orjson.loads(input)
+    return json.loads(input)
+
+def encodePrimitive(input):
+    return input
+
+def encodeList(input):
+    return [getJsonObject(item) for item in input]
+
+def encodeDict(input : dict):
+    return {keyName: getJsonObject(value) for keyName, value in input.items()}
+
+def encodeBytes(input):
+    return base64.b64encode(input).decode("ascii")
+
+def encodeNumpy(input):
+    return input.tolist()
+
+def encodeEnum(input : Enum):
+    return input.value
+
+def encodeAttributes(input : object):
+    if hasattr(input, "__dict__"):
+        customDict = {keyName: getJsonObject(value) for keyName, value in input.__dict__.items()}
+    else:
+        customDict = {}
+    for slotsClass in type(input).__mro__:
+        for keyName in getattr(slotsClass, "__slots__", ()):
+            if keyName != "__dict__" and keyName != "__weakref__" and hasattr(input, keyName):
+                customDict[keyName] = getJsonObject(getattr(input, keyName))
+    if len(customDict) == 0 and not hasattr(input, "__dict__"):
+        logger.error("input has no __dict__ or __slots__ - type: "+str(type(input)))
+        raise(Exception("object of type "+type(input).__name__+" is not json serializable"))
+    return customDict
+
+def encodeDocument(input):
+    return {
+        "documentType": getJsonObject(input.documentType),
+        "documentId": input.documentId,
+        "recordType": input.recordType,
+        "partitionKey": getJsonObject(input.partitionKey),
+        "documentMetadata": getJsonObject(input.documentMetadata),
+        "documentKeyValuesMap": getJsonObject(input.documentKeyValuesMap)
+    }
+
+def encodeErrorDoc(input):
+    jsonObject = encodeDocument(input)
+    jsonObject["errorStartoffsetMap"] = getJsonObject(input.errorStartoffsetMap)
+    jsonObject["errorEndoffsetMap"] = getJsonObject(input.errorEndoffsetMap)
+    jsonObject["errorMessage"] = input.errorMessage
+    return jsonObject
+
+def encodeSkipDoc(input):
+    jsonObject = encodeDocument(input)
+    jsonObject["errorStartoffsetMap"] = getJsonObject(input.errorStartoffsetMap)
+    jsonObject["errorEndoffsetMap"] = getJsonObject(input.errorEndoffsetMap)
+    jsonObject["skipMessage"] = input.skipMessage
+    return jsonObject
+
+def encodeParseDocumentResult(input):
+    return {
+        "nextRecordType": input.nextRecordType,
+        "document": getJsonObject(input.document),
+        "status": getJsonObject(input.status)
+    }
+
+def encodeDocumentBatch(input):
+    documentType = getJsonObject(input.documentType)
+    return [{
+        "documentType": documentType,
+        "documentId": documentId,
+        "recordType": recordType,
+        "partitionKey": getJsonObject(partitionKey),
+        "documentMetadata": getJsonObject(documentMetadata),
+        "documentKeyValuesMap": getJsonObject(documentKeyValuesMap)
+    } for documentId, recordType, partitionKey, documentMetadata, documentKeyValuesMap in zip(input.documentIds, input.recordTypes, input.partitionKeys, input.documentMetadatas, input.documentKeyValuesMaps)]
+
+def encodeRecordParseHint(input):
+    return {
+        "recordHintType": getJsonObject(input.recordHintType),
+        "pattern": input.pattern,
+        "offset": input.offset
+    }
+
+# the encoders by exact type - the encoders for the letsdata types are registered on first use (see getJsonEncoder) since the letsdata types import this module
+jsonEncoders = {
+    str: encodePrimitive,
+    int: encodePrimitive,
+    float: encodePrimitive,
+    bool: encodePrimitive,
+    type(None): encodePrimitive,
+    list: encodeList,
+    tuple: encodeList,
+    set: encodeList,
+    frozenset: encodeList,
+    dict: encodeDict,
+    bytes: encodeBytes,
+    bytearray: encodeBytes,
+    memoryview: encodeBytes,
+}
+letsdataEncodersRegistered = False
+
+def registerLetsdataEncoders():
+    global letsdataEncodersRegistered
+    from letsdata_interfaces.documents.Document import Document
+    from letsdata_interfaces.documents.ErrorDoc import ErrorDoc
+    from letsdata_interfaces.documents.SkipDoc import SkipDoc
+    from letsdata_interfaces.documents.DocumentBatch import DocumentBatch, DocumentBatchRow
+    from letsdata_interfaces.readers.model.ParseDocumentResult import ParseDocumentResult
+    from letsdata_interfaces.readers.model.RecordParseHint import RecordParseHint
+    jsonEncoders[Document] = encodeDocument
+    jsonEncoders[ErrorDoc] = encodeErrorDoc
+    jsonEncoders[SkipDoc] = encodeSkipDoc
+    jsonEncoders[DocumentBatch] = encodeDocumentBatch
+    jsonEncoders[DocumentBatchRow] = encodeDocument
+    jsonEncoders[ParseDocumentResult] = encodeParseDocumentResult
+    jsonEncoders[RecordParseHint] = encodeRecordParseHint
+    letsdataEncodersRegistered = True
+
+'''
+    Finds the encoder for a type that is not in the encoders map (subclasses, enums, user defined classes) and caches it by type.
+'''
+def getJsonEncoder(inputType : type):
+    if not letsdataEncodersRegistered:
+        registerLetsdataEncoders()
+        if inputType in jsonEncoders:
+            return jsonEncoders[inputType]
+
+    if inputType.__module__ == "numpy" and hasattr(inputType, "tolist"):
+        # numpy arrays and scalars (for example, the decoded vectors) are encoded as lists / python numbers
+        encoder = encodeNumpy
+    elif issubclass(inputType, Enum):
+        encoder = encodeEnum
+    elif issubclass(inputType, (str, int, float)):
+        encoder = encodePrimitive
+    elif issubclass(inputType, (list, tuple, set, frozenset)):
+        encoder = encodeList
+    elif issubclass(inputType, dict):
+        encoder = encodeDict
+    elif issubclass(inputType, (bytes, bytearray, memoryview)):
+        encoder = encodeBytes
+    else:
+        # user defined classes (for example, user's Document subclasses with additional attributes) are encoded from their attributes
+        encoder = encodeAttributes
+    jsonEncoders[inputType] = encoder
+    return encoder
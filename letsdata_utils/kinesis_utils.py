@@ -0,0 +1,120 @@
+import hashlib
+from letsdata_utils.validations import letsdata_assert
+from letsdata_interfaces.readers.kinesis.KinesisUserRecord import KinesisUserRecord
+
+'''
+    De-aggregation of the Kinesis Producer Library (KPL) aggregated records. The KPL packs many user records into a single Kinesis record in the format:
+
+        +------------------------+-----------------------------------------+----------------------------+
+        | magic (F3 89 9A C2)    | AggregatedRecord protobuf message       | md5 of the protobuf (16)   |
+        +------------------------+-----------------------------------------+----------------------------+
+
+        message AggregatedRecord {
+            repeated string partition_key_table     = 1;
+            repeated string explicit_hash_key_table = 2;
+            repeated Record records                 = 3;
+        }
+        message Record {
+            required uint64 partition_key_index     = 1;
+            optional uint64 explicit_hash_key_index = 2;
+            required bytes  data                    = 3;
+            repeated Tag    tags                    = 4;
+        }
+
+    The protobuf wire format is decoded here directly (no protobuf dependency). As in the KCL, a record that does not have the magic bytes or whose md5 does not
+    match is not an aggregated record and is processed as a single user record.
+'''
+
+KPL_AGGREGATION_MAGIC = b"\xf3\x89\x9a\xc2"
+KPL_MD5_DIGEST_BYTES = 16
+
+WIRE_TYPE_VARINT = 0
+WIRE_TYPE_FIXED64 = 1
+WIRE_TYPE_LENGTH_DELIMITED = 2
+WIRE_TYPE_FIXED32 = 5
+
+def isAggregatedRecord(data) -> bool:
+    if len(data) < len(KPL_AGGREGATION_MAGIC) + KPL_MD5_DIGEST_BYTES or bytes(data[0:len(KPL_AGGREGATION_MAGIC)]) != KPL_AGGREGATION_MAGIC:
+        return False
+    dataView = memoryview(data)
+    return hashlib.md5(dataView[len(KPL_AGGREGATION_MAGIC):len(dataView) - KPL_MD5_DIGEST_BYTES]).digest() == bytes(dataView[len(dataView) - KPL_MD5_DIGEST_BYTES:])
+
+'''
+    Returns the user records in the Kinesis record's data - the aggregated record's user records (with their subSequenceNumber, partition key and explicit hash key),
+    or None for a record that is not aggregated. The record is md5 verified once here, so the callers should not check isAggregatedRecord first.
+'''
+def deaggregateRecord(data, partitionKey : str) -> list:
+    if not isAggregatedRecord(data):
+        return None
+
+    dataView = memoryview(data)
+    message = dataView[len(KPL_AGGREGATION_MAGIC):len(dataView) - KPL_MD5_DIGEST_BYTES]
+    partitionKeyTable = []
+    explicitHashKeyTable = []
+    recordMessages = []
+    for fieldNumber, value in readProtobufFields(message):
+        if fieldNumber == 1:
+            partitionKeyTable.append(str(value, "utf-8"))
+        elif fieldNumber == 2:
+            explicitHashKeyTable.append(str(value, "utf-8"))
+        elif fieldNumber == 3:
+            recordMessages.append(value)
+
+    userRecords = []
+    for subSequenceNumber in range(0, len(recordMessages)):
+        partitionKeyIndex = None
+        explicitHashKeyIndex = None
+        recordData = None
+        for fieldNumber, value in readProtobufFields(recordMessages[subSequenceNumber]):
+            if fieldNumber == 1:
+                partitionKeyIndex = value
+            elif fieldNumber == 2:
+                explicitHashKeyIndex = value
+            elif fieldNumber == 3:
+                recordData = value
+        letsdata_assert(partitionKeyIndex is not None and partitionKeyIndex < len(partitionKeyTable), "invalid aggregated record - subSequenceNumber: %s, invalid partition_key_index: %s", subSequenceNumber, partitionKeyIndex)
+        letsdata_assert(explicitHashKeyIndex is None or explicitHashKeyIndex < len(explicitHashKeyTable), "invalid aggregated record - subSequenceNumber: %s, invalid explicit_hash_key_index: %s", subSequenceNumber, explicitHashKeyIndex)
+        letsdata_assert(recordData is not None, "invalid aggregated record - subSequenceNumber: %s, missing data", subSequenceNumber)
+        userRecords.append(KinesisUserRecord(subSequenceNumber, partitionKeyTable[partitionKeyIndex], None if explicitHashKeyIndex is None else explicitHashKeyTable[explicitHashKeyIndex], bytearray(recordData)))
+    return userRecords
+
+def readVarint(buffer, position : int) -> tuple:
+    result = 0
+    shift = 0
+    bufferLength = len(buffer)
+    while True:
+        letsdata_assert(position < bufferLength, "invalid protobuf message - truncated varint")
+        byte = buffer[position]
+        position += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return (result, position)
+        shift += 7
+        letsdata_assert(shift < 64, "invalid protobuf message - varint is too long")
+
+'''
+    Yields the (fieldNumber, value) of the message's fields - the value is an int for varint fields and a memoryview (no copy) for length delimited fields.
+    The fixed width fields are skipped (the aggregation format does not use them).
+'''
+def readProtobufFields(message : memoryview):
+    position = 0
+    messageLength = len(message)
+    while position < messageLength:
+        key, position = readVarint(message, position)
+        fieldNumber = key >> 3
+        wireType = key & 0x7
+        if wireType == WIRE_TYPE_VARINT:
+            value, position = readVarint(message, position)
+            yield (fieldNumber, value)
+        elif wireType == WIRE_TYPE_LENGTH_DELIMITED:
+            length, position = readVarint(message, position)
+            letsdata_assert(position + length <= messageLength, "invalid protobuf message - truncated field %s", fieldNumber)
+            yield (fieldNumber, message[position:position + length])
+            position += length
+        elif wireType == WIRE_TYPE_FIXED64:
+            position += 8
+        elif wireType == WIRE_TYPE_FIXED32:
+            position += 4
+        else:
+            raise(Exception("invalid protobuf message - unsupported wire type "+str(wireType)+" for field "+str(fieldNumber)))
+        letsdata_assert(position <= messageLength, "invalid protobuf message - truncated field %s", fieldNumber)
@@ -1,5 +1,100 @@
-def letsdata_assert(result : bool, message : str):
+def letsdata_assert(result : bool, message : str, *messageArgs):
     if not result:
+        # the message args are formatted into the message only on failure so that passing checks do not pay for the message construction
+        if len(messageArgs) > 0:
+            message = message % messageArgs
         raise(Exception("letsdata assert - "+message))
     else:
-        pass
\ No newline at end of file
+        pass
+
+'''
+    A field in a request data schema.
+
+    name : the data key
+    valueType : the expected type (or tuple of types) of the value
+    required : whether the data key is required - optional keys are validated only when present
+    nullable : whether the value can be None
+    schema : the compiled schema (see compileRequestSchema) for a nested dictionary value
+'''
+class SchemaField:
+    def __init__(self, name : str, valueType, required : bool = True, nullable : bool = False, schema = None) -> None:
+        self.name = name
+        self.valueType = valueType
+        self.required = required
+        self.nullable = nullable
+        self.schema = schema
+
+'''
+    Compiles the declarative request data schema for an (interface, function) into a validator function. The schema is compiled once (at module load) and the validator
+    is run per request (per record for batched requests). The validator checks all the fields and raises a single exception that lists every violation.
+    The violation messages are built only on failure. The validator is strict by default - the data keys that are not in the schema are violations (the same as the exact
+    key count checks that the factories had), allowUnknownKeys=True turns this off.
+
+    For example:
+        validateParseDocumentData = compileRequestSchema("SingleFileParser.parseDocument", [
+            SchemaField("s3FileType", str),
+            SchemaField("offsetBytes", int),
+            ...
+        ])
+        validateParseDocumentData(data)
+'''
+def compileRequestSchema(qualifiedName : str, fields : list, allowUnknownKeys : bool = False):
+    fieldChecks = tuple((field.name, field.valueType, field.required, field.nullable, field.schema) for field in fields)
+    fieldNames = frozenset(field.name for field in fields)
+    missing = object()
+
+    def getDataKeysDescription() -> str:
+        requiredKeys = [field.name for field in fields if field.required]
+        optionalKeys = [field.name for field in fields if not field.required]
+        description = "data keys ["+", ".join(requiredKeys)+"]"
+        if len(optionalKeys) > 0:
+            description += " and optionally ["+", ".join(optionalKeys)+"]"
+        return description
+
+    def getTypeName(valueType) -> str:
+        if isinstance(valueType, tuple):
+            return "|".join(typeItem.__name__ for typeItem in valueType)
+        return valueType.__name__
+
+    def getViolations(data, keyPrefix : str):
+        if not isinstance(data, dict):
+            return ["invalid "+(keyPrefix if keyPrefix else "data")+" - "+qualifiedName+" requires "+getDataKeysDescription()]
+
+        violations = None
+        knownKeyCount = 0
+        for name, valueType, required, nullable, schema in fieldChecks:
+            value = data.get(name, missing)
+            violation = None
+            if value is missing:
+                if required:
+                    violations = (violations or []) + ["invalid "+keyPrefix+name+" - missing - "+qualifiedName+" requires "+getDataKeysDescription()]
+                continue
+            
+            knownKeyCount += 1
+            if value is None:
+                if not nullable:
+                    violation = "invalid "+keyPrefix+name+" - None - "+qualifiedName+" requires "+getDataKeysDescription()
+            elif not isinstance(value, valueType):
+                violation = "invalid "+keyPrefix+name+" - "+qualifiedName+" requires "+name+" value to be "+getTypeName(valueType)+", got "+type(value).__name__
+            elif schema is not None:
+                nestedViolations = schema.getViolations(value, keyPrefix+name+".")
+                if nestedViolations is not None:
+                    violations = (violations or []) + nestedViolations
+
+            if violation is not None:
+                violations = (violations or []) + [violation]
+
+        # the data has unknown keys only if it has more keys than the known keys that were found
+        if not allowUnknownKeys and len(data) > knownKeyCount:
+            unknownKeys = [keyName for keyName in data.keys() if keyName not in fieldNames]
+            if len(unknownKeys) > 0:
+                violations = (violations or []) + ["invalid "+(keyPrefix if keyPrefix else "data")+" - unknown keys "+str(unknownKeys)+" - "+qualifiedName+" requires "+getDataKeysDescription()]
+        return violations
+
+    def validate(data) -> None:
+        violations = getViolations(data, "")
+        if violations is not None:
+            raise(Exception("letsdata assert - "+"; ".join(violations)))
+
+    validate.getViolations = getViolations
+    return validate
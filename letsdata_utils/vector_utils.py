@@ -0,0 +1,75 @@
+import base64
+from letsdata_utils.validations import letsdata_assert
+
+'''
+    The packed vector encoding for the Sagemaker vectors - instead of a json list of decimal floats (~10 bytes of text per dimension that is parsed into python float objects),
+    a vector is sent as the base64 of its little endian binary values:
+
+        {
+            "encoding": "float32",              # float32 (4 bytes per dimension), float16 (2 bytes) or int8 (1 byte, quantized)
+            "data": "AACAPwAAAEAAAEBA...",      # base64 of the little endian values
+            "scale": 0.0123                     # int8 only - the value is int8 * scale
+        }
+
+    The packed vectors are decoded directly into numpy float32 arrays (no per dimension python objects). Requires the numpy package.
+'''
+
+VECTOR_ENCODING_FLOAT32 = "float32"
+VECTOR_ENCODING_FLOAT16 = "float16"
+VECTOR_ENCODING_INT8 = "int8"
+VECTOR_ENCODING_DTYPES = {
+    VECTOR_ENCODING_FLOAT32: "<f4",
+    VECTOR_ENCODING_FLOAT16: "<f2",
+    VECTOR_ENCODING_INT8: "i1"
+}
+
+def isPackedVector(value) -> bool:
+    return isinstance(value, dict) and "encoding" in value and "data" in value
+
+'''
+    Decodes the packed vector to a numpy float32 array.
+'''
+def decodeVector(packedVector : dict):
+    import numpy
+    encoding = packedVector['encoding']
+    letsdata_assert(encoding in VECTOR_ENCODING_DTYPES, "invalid packed vector encoding - expected one of %s, got %s", list(VECTOR_ENCODING_DTYPES.keys()), encoding)
+    letsdata_assert(isinstance(packedVector['data'], str), "invalid packed vector data - expected a base64 string, got %s", type(packedVector['data']).__name__)
+    vector = numpy.frombuffer(base64.b64decode(packedVector['data']), dtype=VECTOR_ENCODING_DTYPES[encoding])
+    if encoding == VECTOR_ENCODING_FLOAT32:
+        return vector
+    vector = vector.astype(numpy.float32)
+    if encoding == VECTOR_ENCODING_INT8:
+        vector *= numpy.float32(packedVector.get('scale', 1.0))
+    return vector
+
+'''
+    Encodes the vector (a numpy array or a list of numbers) as a packed vector. The int8 encoding quantizes the values symmetrically (scale = max(abs(value)) / 127).
+'''
+def encodeVector(vector, encoding : str = VECTOR_ENCODING_FLOAT32) -> dict:
+    import numpy
+    letsdata_assert(encoding in VECTOR_ENCODING_DTYPES, "invalid packed vector encoding - expected one of %s, got %s", list(VECTOR_ENCODING_DTYPES.keys()), encoding)
+    vector = numpy.asarray(vector, dtype=numpy.float32)
+    if encoding == VECTOR_ENCODING_INT8:
+        maxValue = float(numpy.max(numpy.abs(vector))) if vector.size > 0 else 0.0
+        scale = maxValue / 127 if maxValue > 0 else 1.0
+        quantized = numpy.clip(numpy.rint(vector / scale), -127, 127).astype("i1")
+        return {"encoding": encoding, "data": base64.b64encode(quantized.tobytes()).decode("ascii"), "scale": scale}
+    return {"encoding": encoding, "data": base64.b64encode(vector.astype(VECTOR_ENCODING_DTYPES[encoding]).tobytes()).decode("ascii")}
+
+'''
+    Decodes the packed vectors in the vectors map to numpy arrays - the vectors that are json lists are returned as is.
+'''
+def decodeVectorsMap(vectorsMap : dict) -> dict:
+    return {friendlyName: decodeVector(vector) if isPackedVector(vector) else vector for friendlyName, vector in vectorsMap.items()}
+
+'''
+    Replaces the numpy vectors (1 dimensional arrays) in the value (the nested dicts and lists are traversed) with the packed vectors.
+'''
+def encodeVectors(value, encoding : str):
+    if isinstance(value, dict):
+        return {keyName: encodeVectors(item, encoding) for keyName, item in value.items()}
+    if isinstance(value, list):
+        return [encodeVectors(item, encoding) for item in value]
+    if type(value).__module__ == "numpy" and getattr(value, "ndim", None) == 1:
+        return encodeVector(value, encoding)
+    return value
@@ -0,0 +1,8 @@
+import pytest
+from letsdata_service.Service import clearHandlerCache
+
+@pytest.fixture(autouse=True)
+def clearHandlers():
+    clearHandlerCache()
+    yield
+    clearHandlerCache()
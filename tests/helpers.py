@@ -0,0 +1,44 @@
+import hashlib
+from letsdata_service.Service import LetsDataAuthParams, handlerCache
+from letsdata_utils.kinesis_utils import KPL_AGGREGATION_MAGIC
+
+'''
+    Shared test helpers - the request auth, the handler injection and a minimal KPL aggregated record encoder.
+'''
+
+DATASET_ID = "test-dataset"
+
+def getLetsDataAuth() -> LetsDataAuthParams:
+    return LetsDataAuthParams({"tenantId": "tenant", "userId": "user", "datasetName": "dataset", "datasetId": DATASET_ID})
+
+def setHandler(interfaceName, handler) -> None:
+    handlerCache[(interfaceName, DATASET_ID)] = handler
+
+def encodeVarint(value : int) -> bytes:
+    result = bytearray()
+    while True:
+        byte = value & 0x7f
+        value >>= 7
+        if value == 0:
+            result.append(byte)
+            return bytes(result)
+        result.append(byte | 0x80)
+
+def encodeLengthDelimited(fieldNumber : int, value : bytes) -> bytes:
+    return encodeVarint((fieldNumber << 3) | 2) + encodeVarint(len(value)) + value
+
+def encodeVarintField(fieldNumber : int, value : int) -> bytes:
+    return encodeVarint(fieldNumber << 3) + encodeVarint(value)
+
+'''
+    Encodes the (partitionKey, data bytes) user records as a KPL aggregated record - the partition keys are de-duplicated in the partition key table.
+'''
+def encodeAggregatedRecord(userRecords : list) -> bytes:
+    partitionKeys = []
+    recordMessages = b""
+    for partitionKey, data in userRecords:
+        if partitionKey not in partitionKeys:
+            partitionKeys.append(partitionKey)
+        recordMessages += encodeLengthDelimited(3, encodeVarintField(1, partitionKeys.index(partitionKey)) + encodeLengthDelimited(3, data))
+    message = b"".join(encodeLengthDelimited(1, partitionKey.encode("utf-8")) for partitionKey in partitionKeys) + recordMessages
+    return KPL_AGGREGATION_MAGIC + message + hashlib.md5(message).digest()
@@ -0,0 +1,74 @@
+import pytest
+from letsdata_utils import dedup_cache
+from letsdata_utils.dedup_cache import DedupCache, BloomFilter, DEDUP_KEY_MESSAGE_DEDUPLICATION_ID, DEDUP_KEY_DOCUMENT_ID
+from letsdata_interfaces.readers.model.ParseDocumentResult import ParseDocumentResult
+from letsdata_interfaces.readers.model.ParseDocumentResultStatus import ParseDocumentResultStatus
+from letsdata_interfaces.documents.Document import Document
+from letsdata_interfaces.documents.DocumentType import DocumentType
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    fakeClock = FakeClock()
+    monkeypatch.setattr(dedup_cache.time, "monotonic", fakeClock.monotonic)
+    return fakeClock
+
+def test_keys_expire_after_ttl(clock):
+    cache = DedupCache(DEDUP_KEY_MESSAGE_DEDUPLICATION_ID, maxEntries=10, ttlSeconds=60)
+    cache.add("m1")
+    clock.now += 59
+    assert cache.contains("m1")
+    clock.now += 2
+    assert not cache.contains("m1")
+    assert cache.getStats()["entries"] == 0
+
+def test_least_recently_used_key_is_evicted(clock):
+    cache = DedupCache(DEDUP_KEY_MESSAGE_DEDUPLICATION_ID, maxEntries=2, ttlSeconds=60)
+    cache.add("m1")
+    cache.add("m2")
+    assert cache.contains("m1")
+    cache.add("m3")
+    assert cache.contains("m1")
+    assert cache.contains("m3")
+    assert not cache.contains("m2")
+    assert cache.getStats()["evictions"] == 1
+
+def test_evicted_keys_are_remembered_by_the_bloom_filter(clock):
+    cache = DedupCache(DEDUP_KEY_MESSAGE_DEDUPLICATION_ID, maxEntries=1, ttlSeconds=60, bloomFilterBits=4096)
+    cache.add("m1")
+    cache.add("m2")
+    assert cache.contains("m1")
+    clock.now += 121
+    assert not cache.contains("m1")
+
+def test_contains_or_add_reserves_and_remove_releases(clock):
+    cache = DedupCache(DEDUP_KEY_MESSAGE_DEDUPLICATION_ID)
+    assert not cache.containsOrAdd("m1")
+    assert cache.containsOrAdd("m1")
+    cache.remove("m1")
+    assert not cache.containsOrAdd("m1")
+
+def test_deduplicate_result_by_document_id(clock):
+    cache = DedupCache(DEDUP_KEY_DOCUMENT_ID)
+    getResult = lambda: ParseDocumentResult(None, Document(DocumentType.Document, "doc-1", "Record", "partition", None, None), ParseDocumentResultStatus.SUCCESS)
+    assert cache.deduplicateResult(getResult()).getStatus() == ParseDocumentResultStatus.SUCCESS
+    duplicateResult = cache.deduplicateResult(getResult())
+    assert duplicateResult.getStatus() == ParseDocumentResultStatus.SKIP
+    assert duplicateResult.getDocument().getDocumentType() == DocumentType.SkipDoc
+
+def test_bloom_filter_membership():
+    bloomFilter = BloomFilter(8192)
+    for index in range(0, 100):
+        bloomFilter.add("key-"+str(index))
+    assert all("key-"+str(index) in bloomFilter for index in range(0, 100))
+    assert sum(1 for index in range(100, 1100) if "key-"+str(index) in bloomFilter) < 50
+
+def test_invalid_key_type():
+    with pytest.raises(Exception, match="invalid DedupCache keyType"):
+        DedupCache("sequence")
@@ -0,0 +1,85 @@
+from letsdata_service.Service import InterfaceNames
+from letsdata_service.DynamoDBRecordReaderService import getDynamoDBRecordReaderServiceRequest
+from letsdata_interfaces.readers.dynamodbstreams.DynamoDBStreamsRecordReader import DynamoDBStreamsRecordReader
+from letsdata_interfaces.readers.model.ParseDocumentResult import ParseDocumentResult
+from letsdata_interfaces.readers.model.ParseDocumentResultStatus import ParseDocumentResultStatus
+from letsdata_interfaces.documents.Document import Document
+from letsdata_interfaces.documents.DocumentType import DocumentType
+from tests.helpers import getLetsDataAuth, setHandler
+
+class RecordingStreamsReader(DynamoDBStreamsRecordReader):
+    def __init__(self, coalescingEnabled : bool = True) -> None:
+        super().__init__()
+        self.coalescingEnabled = coalescingEnabled
+        self.parsedRecords = []
+
+    def isCoalescingEnabled(self) -> bool:
+        return self.coalescingEnabled
+
+    def parseRecord(self, streamArn, shardId, eventId, eventName, identityPrincipalId, identityType, sequenceNumber, sizeBytes, streamViewType, approximateCreationDateTime, keys, oldImage, newImage) -> ParseDocumentResult:
+        self.parsedRecords.append((keys["id"]["S"], eventName, sequenceNumber, oldImage, newImage))
+        return ParseDocumentResult(None, Document(DocumentType.Document, keys["id"]["S"], eventName, keys["id"]["S"], None, None), ParseDocumentResultStatus.SUCCESS)
+
+def getRecord(itemId : str, eventName : str, sequenceNumber : str, oldImage : dict = None, newImage : dict = None) -> dict:
+    return {
+        "streamArn": "arn:aws:dynamodb:us-east-1:123456789012:table/test/stream/2024-01-01T00:00:00.000",
+        "shardId": "shardId-00000001",
+        "eventId": "event-"+sequenceNumber,
+        "eventName": eventName,
+        "identityPrincipalId": None,
+        "identityType": None,
+        "sequenceNumber": sequenceNumber,
+        "sizeBytes": 100,
+        "streamViewType": "NEW_AND_OLD_IMAGES",
+        "approximateCreationDateTime": 1700000000,
+        "data": {"keys": {"id": {"S": itemId}}, "oldImage": oldImage or {}, "newImage": newImage or {}}
+    }
+
+def parseRecords(records : list) -> list:
+    return getDynamoDBRecordReaderServiceRequest("requestId", getLetsDataAuth(), InterfaceNames.DynamoDBStreamsRecordReader, "parseRecord", None, records).execute()
+
+def test_insert_then_remove_drops_the_key():
+    reader = RecordingStreamsReader()
+    setHandler(InterfaceNames.DynamoDBStreamsRecordReader, reader)
+    results = parseRecords([
+        getRecord("a", "INSERT", "100", None, {"id": {"S": "a"}}),
+        getRecord("b", "MODIFY", "101", {"v": {"N": "1"}}, {"v": {"N": "2"}}),
+        getRecord("a", "MODIFY", "102", {"v": {"N": "1"}}, {"v": {"N": "2"}}),
+        getRecord("a", "REMOVE", "103", {"v": {"N": "2"}}, None)
+    ])
+    assert [result["statusCode"] for result in results] == ["COALESCED", "SUCCESS", "COALESCED", "COALESCED"]
+    assert all(result["coalescedIntoIndex"] is None for result in results if result["statusCode"] == "COALESCED")
+    assert [parsedRecord[0] for parsedRecord in reader.parsedRecords] == ["b"]
+
+def test_modifies_are_coalesced_into_the_net_change():
+    reader = RecordingStreamsReader()
+    setHandler(InterfaceNames.DynamoDBStreamsRecordReader, reader)
+    results = parseRecords([
+        getRecord("a", "MODIFY", "102", {"v": {"N": "2"}}, {"v": {"N": "3"}}),
+        getRecord("a", "MODIFY", "101", {"v": {"N": "1"}}, {"v": {"N": "2"}}),
+        getRecord("b", "INSERT", "103", None, {"v": {"N": "7"}}),
+        getRecord("b", "MODIFY", "104", {"v": {"N": "7"}}, {"v": {"N": "8"}})
+    ])
+    assert results[0]["statusCode"] == "SUCCESS"
+    assert results[0]["coalescedIndexes"] == [1, 0]
+    assert results[1] == {"index": 1, "statusCode": "COALESCED", "coalescedIntoIndex": 0}
+    assert results[3]["coalescedIndexes"] == [2, 3]
+    assert reader.parsedRecords == [
+        ("a", "MODIFY", "102", {"v": {"N": "1"}}, {"v": {"N": "3"}}),
+        ("b", "INSERT", "104", {}, {"v": {"N": "8"}})
+    ]
+
+def test_invalid_record_does_not_fail_the_batch():
+    setHandler(InterfaceNames.DynamoDBStreamsRecordReader, RecordingStreamsReader())
+    invalidRecord = getRecord("a", "MODIFY", "100")
+    del invalidRecord["sizeBytes"]
+    results = parseRecords([invalidRecord, getRecord("b", "MODIFY", "101")])
+    assert [result["statusCode"] for result in results] == ["EXCEPTION", "SUCCESS"]
+    assert "sizeBytes" in results[0]["errorMessage"]
+
+def test_batched_records_without_coalescing_are_parsed_individually():
+    reader = RecordingStreamsReader(coalescingEnabled=False)
+    setHandler(InterfaceNames.DynamoDBStreamsRecordReader, reader)
+    results = parseRecords([getRecord("a", "INSERT", "100"), getRecord("a", "REMOVE", "101")])
+    assert [result["statusCode"] for result in results] == ["SUCCESS", "SUCCESS"]
+    assert [parsedRecord[1] for parsedRecord in reader.parsedRecords] == ["INSERT", "REMOVE"]
@@ -0,0 +1,40 @@
+from letsdata_interfaces.readers.dynamodbstreams.ImageDiff import computeImageDiff
+
+OLD_IMAGE = {
+    "id": {"S": "a"},
+    "status": {"S": "NEW"},
+    "address": {"M": {"city": {"S": "Seattle"}, "zip": {"S": "98101"}}},
+    "tags": {"L": [{"S": "x"}, {"S": "y"}]},
+    "roles": {"SS": ["admin", "user"]},
+    "legacy": {"BOOL": True}
+}
+
+def test_equal_images_have_no_diff():
+    assert computeImageDiff(OLD_IMAGE, dict(OLD_IMAGE)) is None
+
+def test_nested_paths():
+    newImage = dict(OLD_IMAGE)
+    newImage["status"] = {"S": "DONE"}
+    newImage["address"] = {"M": {"city": {"S": "Portland"}, "zip": {"S": "98101"}, "state": {"S": "OR"}}}
+    newImage["tags"] = {"L": [{"S": "x"}]}
+    newImage["roles"] = {"SS": ["user", "admin"]}
+    del newImage["legacy"]
+    newImage["count"] = {"N": "1"}
+    diff = computeImageDiff(OLD_IMAGE, newImage)
+    assert sorted(diff.getAdded()) == ["address.state", "count"]
+    assert sorted(diff.getRemoved()) == ["legacy", "tags[1]"]
+    assert sorted(diff.getChanged()) == ["address.city", "status"]
+
+def test_type_change_is_a_change():
+    diff = computeImageDiff({"v": {"N": "1"}}, {"v": {"S": "1"}})
+    assert diff.getChanged() == ["v"]
+
+def test_insert_and_remove_images():
+    assert computeImageDiff(None, {"id": {"S": "a"}}).getAdded() == ["id"]
+    assert computeImageDiff({"id": {"S": "a"}}, None).getRemoved() == ["id"]
+
+def test_watched_attributes():
+    newImage = dict(OLD_IMAGE)
+    newImage["status"] = {"S": "DONE"}
+    assert computeImageDiff(OLD_IMAGE, newImage, ["address.city"]) is None
+    assert computeImageDiff(OLD_IMAGE, newImage, ["status", "address.city"]).getChanged() == ["status"]
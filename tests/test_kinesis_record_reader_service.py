@@ -0,0 +1,101 @@
+import base64
+from letsdata_service.Service import InterfaceNames
+from letsdata_service.KinesisRecordReaderService import getKinesisRecordReaderServiceRequest, DATA_ENCODING_BASE64
+from letsdata_interfaces.readers.kinesis.KinesisRecordReader import KinesisRecordReader
+from letsdata_interfaces.documents.Document import Document
+from letsdata_interfaces.documents.DocumentType import DocumentType
+from letsdata_interfaces.readers.model.ParseDocumentResult import ParseDocumentResult
+from letsdata_interfaces.readers.model.ParseDocumentResultStatus import ParseDocumentResultStatus
+from letsdata_utils.dedup_cache import DedupCache, DEDUP_KEY_SEQUENCE_NUMBER
+from tests.helpers import getLetsDataAuth, setHandler, encodeAggregatedRecord
+
+class CountingAggregateReader(KinesisRecordReader):
+    def getAggregationWindowSeconds(self) -> int:
+        return 60
+
+    def aggregateMessage(self, windowState, streamArn, shardId, partitionKey, sequenceNumber, approximateArrivalTimestamp, data) -> None:
+        windowState[partitionKey] = windowState.get(partitionKey, 0) + 1
+
+    def emitAggregateDocuments(self, windowStartTimestamp, windowEndTimestamp, windowState) -> list:
+        return [Document(DocumentType.Document, partitionKey+"-"+str(windowStartTimestamp), "Count", partitionKey, None, {"count": count}) for partitionKey, count in sorted(windowState.items())]
+
+def getRecord(sequenceNumber : str, partitionKey : str, data : bytes, timestamp : int = 1700000000000) -> dict:
+    return {"partitionKey": partitionKey, "sequenceNumber": sequenceNumber, "approximateArrivalTimestamp": timestamp, "data": base64.b64encode(data).decode("ascii"), "dataEncoding": DATA_ENCODING_BASE64}
+
+def aggregateMessages(records : list, windowState : str = None, currentTimestamp : int = None) -> dict:
+    data = {"streamArn": "arn:aws:kinesis:us-east-1:123456789012:stream/test", "shardId": "shardId-000000000000", "records": records}
+    if windowState is not None:
+        data["windowState"] = windowState
+    if currentTimestamp is not None:
+        data["currentTimestamp"] = currentTimestamp
+    return getKinesisRecordReaderServiceRequest("requestId", getLetsDataAuth(), InterfaceNames.KinesisRecordReader, "aggregateMessages", data, None).execute()
+
+def test_aggregate_messages_checkpoints_plain_records():
+    setHandler(InterfaceNames.KinesisRecordReader, CountingAggregateReader())
+    response = aggregateMessages([getRecord("100", "a", b"one"), getRecord("101", "b", b"two")])
+    assert response["checkpointSequenceNumber"] == "101"
+
+def test_aggregate_messages_mixed_plain_and_aggregated_records():
+    setHandler(InterfaceNames.KinesisRecordReader, CountingAggregateReader())
+    records = [
+        getRecord("102", "a", b"plain"),
+        getRecord("100", "ignored", encodeAggregatedRecord([("a", b"one"), ("b", b"two"), ("b", b"three")])),
+        getRecord("101", "b", b"plain")
+    ]
+    response = aggregateMessages(records)
+    assert response["checkpointSequenceNumber"] == "102"
+
+    response = aggregateMessages([], response["windowState"], 1700000000000 + 120000)
+    counts = {document.getPartitionKey(): document.getDocumentKeyValuesMap()["count"] for document in response["documents"]}
+    assert counts == {"a": 2, "b": 3}
+
+class FailingRecordReader(KinesisRecordReader):
+    def __init__(self, failingData : set = (), dedupCache : DedupCache = None) -> None:
+        super().__init__()
+        self.failingData = failingData
+        self.dedupCache = dedupCache
+        self.parsedSequenceNumbers = []
+
+    def getDeduplicationCache(self) -> DedupCache:
+        return self.dedupCache
+
+    def parseMessage(self, streamArn, shardId, partitionKey, sequenceNumber, approximateArrivalTimestamp, data) -> ParseDocumentResult:
+        self.parsedSequenceNumbers.append(sequenceNumber)
+        if bytes(data) in self.failingData:
+            raise(Exception("parse failed - "+sequenceNumber))
+        return ParseDocumentResult(None, Document(DocumentType.Document, sequenceNumber, "Record", partitionKey, None, {"data": bytes(data).decode("utf-8")}), ParseDocumentResultStatus.SUCCESS)
+
+    def parseAggregatedMessage(self, streamArn, shardId, sequenceNumber, approximateArrivalTimestamp, userRecords) -> list:
+        return [self.parseMessage(streamArn, shardId, userRecord.getPartitionKey(), sequenceNumber+"."+str(userRecord.getSubSequenceNumber()), approximateArrivalTimestamp, userRecord.getData()) for userRecord in userRecords]
+
+def parseMessages(records : list) -> dict:
+    data = {"streamArn": "arn:aws:kinesis:us-east-1:123456789012:stream/test", "shardId": "shardId-000000000000", "records": records}
+    return getKinesisRecordReaderServiceRequest("requestId", getLetsDataAuth(), InterfaceNames.KinesisRecordReader, "parseMessages", data, None).execute()
+
+def test_parse_messages_stops_at_the_first_exception():
+    reader = FailingRecordReader({b"bad"})
+    setHandler(InterfaceNames.KinesisRecordReader, reader)
+    response = parseMessages([getRecord("100", "a", b"one"), getRecord("101", "a", b"bad"), getRecord("102", "a", b"three"), getRecord("103", "a", b"bad")])
+    assert response["checkpointSequenceNumber"] == "100"
+    assert response["failedSequenceNumber"] == "101"
+    assert response["errorMessage"] == "parse failed - 101"
+    assert response["unprocessedSequenceNumbers"] == ["101", "102", "103"]
+    assert [result["sequenceNumber"] for result in response["results"]] == ["100"]
+    assert reader.parsedSequenceNumbers == ["100", "101"]
+
+def test_parse_messages_checkpoints_the_complete_batch():
+    setHandler(InterfaceNames.KinesisRecordReader, FailingRecordReader())
+    response = parseMessages([getRecord("100", "a", b"one"), getRecord("101", "b", encodeAggregatedRecord([("c", b"two"), ("d", b"three")]))])
+    assert response["checkpointSequenceNumber"] == "101"
+    assert response["failedSequenceNumber"] is None
+    assert response["unprocessedSequenceNumbers"] == []
+    aggregatedResult = response["results"][1]["result"]
+    assert aggregatedResult["aggregated"] is True
+    assert [record["subSequenceNumber"] for record in aggregatedResult["records"]] == [0, 1]
+
+def test_sequence_number_dedup_is_scoped_to_the_stream():
+    setHandler(InterfaceNames.KinesisRecordReader, FailingRecordReader(dedupCache=DedupCache(DEDUP_KEY_SEQUENCE_NUMBER)))
+    getStatus = lambda streamArn: getKinesisRecordReaderServiceRequest("requestId", getLetsDataAuth(), InterfaceNames.KinesisRecordReader, "parseMessage", dict(getRecord("100", "a", b"one"), streamArn=streamArn, shardId="shardId-000000000000"), None).execute().getStatus()
+    assert getStatus("stream-a") == ParseDocumentResultStatus.SUCCESS
+    assert getStatus("stream-b") == ParseDocumentResultStatus.SUCCESS
+    assert getStatus("stream-a") == ParseDocumentResultStatus.SKIP
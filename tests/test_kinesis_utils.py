@@ -0,0 +1,23 @@
+from letsdata_utils.kinesis_utils import isAggregatedRecord, deaggregateRecord
+from tests.helpers import encodeAggregatedRecord
+
+def test_deaggregate_round_trip():
+    data = encodeAggregatedRecord([("a", b"one"), ("b", b"two"), ("a", b"")])
+    assert isAggregatedRecord(data)
+    userRecords = deaggregateRecord(data, "record-partition-key")
+    assert [(userRecord.getSubSequenceNumber(), userRecord.getPartitionKey(), bytes(userRecord.getData())) for userRecord in userRecords] == [(0, "a", b"one"), (1, "b", b"two"), (2, "a", b"")]
+
+def test_plain_record_is_not_aggregated():
+    assert not isAggregatedRecord(b"plain record data")
+    assert deaggregateRecord(b"plain record data", "partition") is None
+
+def test_corrupt_md5_is_not_aggregated():
+    data = bytearray(encodeAggregatedRecord([("a", b"one")]))
+    data[-1] ^= 0xff
+    assert not isAggregatedRecord(data)
+    assert deaggregateRecord(data, "partition") is None
+
+def test_corrupt_message_is_not_aggregated():
+    data = bytearray(encodeAggregatedRecord([("a", b"one")]))
+    data[6] ^= 0xff
+    assert deaggregateRecord(data, "partition") is None
@@ -0,0 +1,90 @@
+import pytest
+from letsdata_lambda_function import lambda_handler
+from letsdata_service.Service import InterfaceNames
+from letsdata_utils.envelope_utils import GZIP_BASE64_ENCODING, encodeGzipBase64, decodeGzipBase64, encodeResponseData
+from letsdata_interfaces.readers.parsers.SingleFileParser import SingleFileParser
+from letsdata_interfaces.readers.model.RecordParseHint import RecordParseHint
+from letsdata_interfaces.readers.model.RecordHintType import RecordHintType
+from letsdata_interfaces.readers.model.ParseDocumentResult import ParseDocumentResult
+from letsdata_interfaces.readers.model.ParseDocumentResultStatus import ParseDocumentResultStatus
+from letsdata_interfaces.documents.Document import Document
+from letsdata_interfaces.documents.DocumentType import DocumentType
+from tests.helpers import DATASET_ID, setHandler
+
+class LineParser(SingleFileParser):
+    def __init__(self) -> None:
+        super().__init__()
+        self.hintCalls = 0
+
+    def getS3FileType(self) -> str:
+        return "LOGFILE"
+
+    def getRecordStartPattern(self, s3FileType : str) -> RecordParseHint:
+        self.hintCalls += 1
+        return RecordParseHint(RecordHintType.PATTERN, "{", -1)
+
+    def getRecordEndPattern(self, s3FileType : str) -> RecordParseHint:
+        self.hintCalls += 1
+        return RecordParseHint(RecordHintType.PATTERN, "}\n", -1)
+
+    def parseDocument(self, s3FileType, s3Filename, offsetBytes, byteArr, startIndex, endIndex) -> ParseDocumentResult:
+        text = bytes(byteArr[startIndex:endIndex]).decode("utf-8")
+        if text == "bad":
+            raise(Exception("unparseable record"))
+        return ParseDocumentResult(None, Document(DocumentType.Document, s3Filename+":"+str(offsetBytes), "Log", s3Filename, None, {"text": text}), ParseDocumentResultStatus.SUCCESS)
+
+@pytest.fixture(autouse=True)
+def lambdaStage(monkeypatch):
+    monkeypatch.setenv("LETS_DATA_STAGE", "Test")
+
+def getEvent(function : str, data = None, batchedData = None, **envelope) -> dict:
+    event = {"requestId": "requestId", "interface": "SingleFileParser", "function": function, "letsdataAuth": {"tenantId": "tenant", "userId": "user", "datasetName": "dataset", "datasetId": DATASET_ID}}
+    if data is not None:
+        event["data"] = data
+    if batchedData is not None:
+        event["batchedData"] = batchedData
+    event.update(envelope)
+    return event
+
+def getParseDocumentData(offsetBytes : int, content : str) -> dict:
+    return {"s3FileType": "LOGFILE", "fileName": "log.txt", "offsetBytes": offsetBytes, "content": content, "startIndex": 0, "endIndex": len(content.encode("utf-8"))}
+
+def test_parse_document():
+    setHandler(InterfaceNames.SingleFileParser, LineParser())
+    response = lambda_handler(getEvent("parseDocument", getParseDocumentData(10, '{"a":1}\n')), None)
+    assert response["StatusCode"] == 200
+    assert response["body"]["data"]["document"]["documentId"] == "log.txt:10"
+
+def test_batched_data_reports_per_item_errors():
+    setHandler(InterfaceNames.SingleFileParser, LineParser())
+    batchedData = [getParseDocumentData(0, "one"), getParseDocumentData(3, "bad"), {"s3FileType": "LOGFILE"}, getParseDocumentData(6, "two")]
+    results = lambda_handler(getEvent("parseDocument", batchedData=batchedData), None)["body"]["data"]
+    assert [result["statusCode"] for result in results] == ["SUCCESS", "EXCEPTION", "EXCEPTION", "SUCCESS"]
+    assert results[1]["errorMessage"] == "unparseable record"
+    assert "fileName - missing" in results[2]["errorMessage"]
+    assert results[3]["data"]["document"]["documentKeyValuesMap"] == {"text": "two"}
+
+def test_record_parse_hints_are_cached():
+    parser = LineParser()
+    setHandler(InterfaceNames.SingleFileParser, parser)
+    lambda_handler(getEvent("getRecordStartPattern", {"s3FileType": "LOGFILE"}), None)
+    lambda_handler(getEvent("getRecordEndPattern", {"s3FileType": "LOGFILE"}), None)
+    hints = lambda_handler(getEvent("getRecordParseHints", {}), None)["body"]["data"]
+    assert hints["LOGFILE"]["recordEndPattern"]["pattern"] == "}\n"
+    assert parser.hintCalls == 2
+
+def test_compressed_request_and_response_envelope():
+    setHandler(InterfaceNames.SingleFileParser, LineParser())
+    event = getEvent("parseDocument", requestEncoding=GZIP_BASE64_ENCODING, acceptEncoding=GZIP_BASE64_ENCODING, compressionThresholdBytes=0)
+    event["data"] = encodeGzipBase64(getParseDocumentData(0, "x" * 1000))
+    body = lambda_handler(event, None)["body"]
+    assert body["contentEncoding"] == GZIP_BASE64_ENCODING
+    assert decodeGzipBase64(body["data"])["document"]["documentKeyValuesMap"]["text"] == "x" * 1000
+
+def test_small_responses_are_not_compressed():
+    assert encodeResponseData({"a": 1}, {"acceptEncoding": GZIP_BASE64_ENCODING}) == ({"a": 1}, None)
+
+def test_invalid_compression_threshold():
+    for thresholdBytes in [-1, "10", True]:
+        with pytest.raises(Exception, match="invalid compressionThresholdBytes"):
+            encodeResponseData({"a": 1}, {"acceptEncoding": GZIP_BASE64_ENCODING, "compressionThresholdBytes": thresholdBytes})
@@ -0,0 +1,111 @@
+import gzip
+import pytest
+from letsdata_service.LocalSingleFileReader import LocalSingleFileReader
+from letsdata_interfaces.readers.parsers.SingleFileParser import SingleFileParser
+from letsdata_interfaces.readers.model.RecordParseHint import RecordParseHint
+from letsdata_interfaces.readers.model.RecordHintType import RecordHintType
+from letsdata_interfaces.readers.model.ParseDocumentResult import ParseDocumentResult
+from letsdata_interfaces.readers.model.ParseDocumentResultStatus import ParseDocumentResultStatus
+from letsdata_interfaces.documents.Document import Document
+from letsdata_interfaces.documents.DocumentType import DocumentType
+
+class RecordTextParser(SingleFileParser):
+    def getS3FileType(self) -> str:
+        return "RECORDS"
+
+    def getResolvedS3FileName(self, s3FileType : str, fileName : str) -> str:
+        return fileName
+
+    def parseDocument(self, s3FileType, s3Filename, offsetBytes, byteArr, startIndex, endIndex) -> ParseDocumentResult:
+        text = bytes(byteArr[startIndex:endIndex]).decode("utf-8")
+        return ParseDocumentResult(None, Document(DocumentType.Document, s3Filename+":"+str(offsetBytes), "Record", s3Filename, None, {"text": text}), ParseDocumentResultStatus.SUCCESS)
+
+class PatternParser(RecordTextParser):
+    def getRecordStartPattern(self, s3FileType : str) -> RecordParseHint:
+        return RecordParseHint(RecordHintType.PATTERN, "<r>", -1)
+
+    def getRecordEndPattern(self, s3FileType : str) -> RecordParseHint:
+        return RecordParseHint(RecordHintType.PATTERN, "</r>\n", -1)
+
+# fixed width records - a 2 byte gap followed by an 8 byte record
+class OffsetParser(RecordTextParser):
+    def getRecordStartPattern(self, s3FileType : str) -> RecordParseHint:
+        return RecordParseHint(RecordHintType.OFFSET, None, 2)
+
+    def getRecordEndPattern(self, s3FileType : str) -> RecordParseHint:
+        return RecordParseHint(RecordHintType.OFFSET, None, 8)
+
+class BatchOffsetParser(OffsetParser):
+    def isParseDocumentsEnabled(self) -> bool:
+        return True
+
+    def parseDocuments(self, s3FileType, s3Filename, offsetBytes, stride, records) -> list:
+        return [ParseDocumentResult(None, Document(DocumentType.Document, None, "Record", s3Filename, None, {"text": bytes(record).decode("utf-8")}), ParseDocumentResultStatus.SUCCESS) for record in records]
+
+def getPatternRecords(count : int) -> list:
+    return ["<r>record-"+str(index)+"-"+("x" * (index % 7))+"</r>\n" for index in range(0, count)]
+
+def getOffsetRecords(count : int) -> list:
+    return ["--"+str(index).zfill(8) for index in range(0, count)]
+
+def getExpectedResults(fileName : str, records : list) -> list:
+    results = []
+    offsetBytes = 0
+    for record in records:
+        recordStart = offsetBytes + (2 if record.startswith("--") else 0)
+        results.append((fileName, recordStart, record[recordStart - offsetBytes:]))
+        offsetBytes += len(record)
+    return results
+
+def readRecords(reader : LocalSingleFileReader, manifest : list, parallel : bool) -> list:
+    results = []
+    onResult = lambda fileName, offsetBytes, result: results.append((fileName, offsetBytes, result.getDocument().getDocumentKeyValuesMap()["text"]))
+    if parallel:
+        stats = reader.runParallel(manifest, onResult, processes=3, rangeBytes=64)
+    else:
+        stats = reader.run(manifest, onResult)
+    assert stats.records == len(results)
+    return results
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_pattern_records(tmp_path, parallel):
+    records = getPatternRecords(40)
+    (tmp_path / "a.txt").write_text("header junk\n"+"".join(records))
+    (tmp_path / "b.txt").write_text("".join(records[0:3]))
+    reader = LocalSingleFileReader(PatternParser(), rootDirectory=str(tmp_path))
+    expected = [(fileName, offsetBytes + (12 if fileName == "a.txt" else 0), text) for fileName, recordList in [("a.txt", records), ("b.txt", records[0:3])] for fileName, offsetBytes, text in getExpectedResults(fileName, recordList)]
+    assert readRecords(reader, ["a.txt", "b.txt"], parallel) == expected
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_offset_records(tmp_path, parallel):
+    records = getOffsetRecords(50)
+    (tmp_path / "f.dat").write_text("".join(records)+"--1234")
+    reader = LocalSingleFileReader(OffsetParser(), rootDirectory=str(tmp_path))
+    expected = getExpectedResults("f.dat", records) + [("f.dat", 502, "1234")]
+    assert readRecords(reader, ["f.dat"], parallel) == expected
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_offset_records_parse_documents_batches(tmp_path, parallel):
+    records = getOffsetRecords(50)
+    (tmp_path / "f.dat").write_text("".join(records)+"--1234")
+    reader = LocalSingleFileReader(BatchOffsetParser(), rootDirectory=str(tmp_path), fixedWidthBatchRecords=16)
+    expected = getExpectedResults("f.dat", records) + [("f.dat", 502, "1234")]
+    assert readRecords(reader, ["f.dat"], parallel) == expected
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_multi_member_gzip_records(tmp_path, parallel):
+    records = getPatternRecords(30)
+    with open(tmp_path / "m.txt.gz", "wb") as file:
+        for index in range(0, 30, 5):
+            file.write(gzip.compress("".join(records[index:index + 5]).encode("utf-8")))
+    reader = LocalSingleFileReader(PatternParser(), rootDirectory=str(tmp_path), readChunkBytes=50)
+    assert readRecords(reader, ["m.txt.gz"], parallel) == getExpectedResults("m.txt.gz", records)
+
+def test_reparse_records(tmp_path):
+    records = getPatternRecords(10)
+    (tmp_path / "a.txt").write_text("".join(records))
+    reader = LocalSingleFileReader(PatternParser(), rootDirectory=str(tmp_path))
+    expected = getExpectedResults("a.txt", records)
+    results = []
+    reader.reparseRecords("a.txt", [expected[7][1], expected[2][1]], lambda fileName, offsetBytes, result: results.append((fileName, offsetBytes, result.getDocument().getDocumentKeyValuesMap()["text"])))
+    assert results == [expected[2], expected[7]]
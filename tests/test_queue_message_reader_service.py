@@ -0,0 +1,97 @@
+import time, threading
+from letsdata_service.Service import InterfaceNames
+from letsdata_service.QueueMessageReaderService import getQueueMessageReaderServiceRequest
+from letsdata_interfaces.readers.sqs.QueueMessageReader import QueueMessageReader
+from letsdata_interfaces.readers.model.ParseDocumentResult import ParseDocumentResult
+from letsdata_interfaces.readers.model.ParseDocumentResultStatus import ParseDocumentResultStatus
+from letsdata_interfaces.documents.Document import Document
+from letsdata_interfaces.documents.DocumentType import DocumentType
+from letsdata_utils.dedup_cache import DedupCache, DEDUP_KEY_MESSAGE_DEDUPLICATION_ID
+from tests.helpers import getLetsDataAuth, setHandler
+
+class RecordingQueueReader(QueueMessageReader):
+    def __init__(self, concurrency : int = 1, dedupCache : DedupCache = None, failingBodies : set = (), parseSeconds : float = 0) -> None:
+        super().__init__()
+        self.concurrency = concurrency
+        self.dedupCache = dedupCache
+        self.failingBodies = failingBodies
+        self.parseSeconds = parseSeconds
+        self.parsedMessageIds = []
+        self.lock = threading.Lock()
+
+    def getMessageGroupConcurrency(self) -> int:
+        return self.concurrency
+
+    def getDeduplicationCache(self) -> DedupCache:
+        return self.dedupCache
+
+    def parseMessage(self, messageId, messageGroupId, messageDeduplicationId, messageAttributes, messageBody) -> ParseDocumentResult:
+        with self.lock:
+            self.parsedMessageIds.append(messageId)
+        time.sleep(self.parseSeconds)
+        if messageBody in self.failingBodies:
+            raise(Exception("parse failed - "+messageBody))
+        return ParseDocumentResult(None, Document(DocumentType.Document, messageId, "Message", messageGroupId, None, {"body": messageBody}), ParseDocumentResultStatus.SUCCESS)
+
+def getMessage(messageId : str, messageGroupId : str, messageBody : str, messageDeduplicationId : str = None) -> dict:
+    message = {"messageId": messageId, "messageAttributes": {}, "messageBody": messageBody}
+    if messageGroupId is not None:
+        message["messageGroupId"] = messageGroupId
+    if messageDeduplicationId is not None:
+        message["messageDeduplicationId"] = messageDeduplicationId
+    return message
+
+def parseMessages(messages : list) -> dict:
+    return getQueueMessageReaderServiceRequest("requestId", getLetsDataAuth(), InterfaceNames.QueueMessageReader, "parseMessages", {"messages": messages}, None).execute()
+
+def test_concurrent_duplicates_across_message_groups_are_parsed_once():
+    reader = RecordingQueueReader(concurrency=2, dedupCache=DedupCache(DEDUP_KEY_MESSAGE_DEDUPLICATION_ID), parseSeconds=0.05)
+    setHandler(InterfaceNames.QueueMessageReader, reader)
+    response = parseMessages([getMessage("m0", "g0", "body", "dedup-1"), getMessage("m1", "g1", "body", "dedup-1")])
+    assert len(reader.parsedMessageIds) == 1
+    statuses = sorted(result["result"].getStatus() for result in response["results"])
+    assert statuses == sorted([ParseDocumentResultStatus.SUCCESS, ParseDocumentResultStatus.SKIP])
+    assert response["batchItemFailures"] == []
+
+def test_failed_message_releases_the_dedup_reservation():
+    dedupCache = DedupCache(DEDUP_KEY_MESSAGE_DEDUPLICATION_ID)
+    reader = RecordingQueueReader(dedupCache=dedupCache, failingBodies={"bad"})
+    setHandler(InterfaceNames.QueueMessageReader, reader)
+    response = parseMessages([getMessage("m0", "g0", "bad", "dedup-1")])
+    assert response["batchItemFailures"] == [{"itemIdentifier": "m0"}]
+    assert not dedupCache.contains("dedup-1")
+
+    reader.failingBodies = set()
+    response = parseMessages([getMessage("m0", "g0", "bad", "dedup-1")])
+    assert response["results"][0]["result"].getStatus() == ParseDocumentResultStatus.SUCCESS
+    assert reader.parsedMessageIds == ["m0", "m0"]
+
+def test_fifo_messages_after_a_failure_are_not_processed():
+    reader = RecordingQueueReader(failingBodies={"bad"})
+    setHandler(InterfaceNames.QueueMessageReader, reader)
+    response = parseMessages([
+        getMessage("m0", "g0", "one"),
+        getMessage("m1", "g1", "one"),
+        getMessage("m2", "g0", "bad"),
+        getMessage("m3", "g1", "two"),
+        getMessage("m4", "g0", "three")
+    ])
+    assert [result["statusCode"] for result in response["results"]] == ["SUCCESS", "SUCCESS", "EXCEPTION", "SUCCESS", "NOT_PROCESSED"]
+    assert response["batchItemFailures"] == [{"itemIdentifier": "m2"}, {"itemIdentifier": "m4"}]
+    assert "m4" not in reader.parsedMessageIds
+
+def test_concurrent_message_groups_keep_the_group_order():
+    reader = RecordingQueueReader(concurrency=4, failingBodies={"bad"}, parseSeconds=0.001)
+    setHandler(InterfaceNames.QueueMessageReader, reader)
+    messages = [getMessage("m"+str(index), "g"+str(index % 4), "bad" if index == 5 else "body") for index in range(0, 20)]
+    response = parseMessages(messages)
+    for groupIndex in range(0, 4):
+        groupMessageIds = [messageId for messageId in reader.parsedMessageIds if int(messageId[1:]) % 4 == groupIndex]
+        assert groupMessageIds == sorted(groupMessageIds, key=lambda messageId: int(messageId[1:]))
+    assert [failure["itemIdentifier"] for failure in response["batchItemFailures"]] == ["m5", "m9", "m13", "m17"]
+
+def test_standard_queue_failures_do_not_block_other_messages():
+    setHandler(InterfaceNames.QueueMessageReader, RecordingQueueReader(failingBodies={"bad"}))
+    response = parseMessages([getMessage("m0", None, "bad"), getMessage("m1", None, "one")])
+    assert [result["statusCode"] for result in response["results"]] == ["EXCEPTION", "SUCCESS"]
+    assert response["batchItemFailures"] == [{"itemIdentifier": "m0"}]
@@ -0,0 +1,38 @@
+from letsdata_service.Service import InterfaceNames
+from letsdata_service.SagemakerVectorsInterfaceService import getSagemakerVectorsInterfaceServiceRequest
+from letsdata_interfaces.readers.sagemaker.SagemakerVectorsInterface import SagemakerVectorsInterface
+from tests.helpers import getLetsDataAuth, setHandler
+
+class RecordingVectorsInterface(SagemakerVectorsInterface):
+    def __init__(self) -> None:
+        super().__init__()
+        self.extractedDocuments = []
+
+    def extractDocumentElementsForVectorization(self, document) -> dict:
+        self.extractedDocuments.append(document["id"])
+        if document.get("bad"):
+            raise(Exception("bad document "+document["id"]))
+        return {"text": document["text"]}
+
+class ThrowingBatchVectorsInterface(RecordingVectorsInterface):
+    def extractDocumentElementsForVectorizationBatch(self, documents : list) -> list:
+        raise(Exception("batch endpoint call failed"))
+
+def extractBatch(documents : list) -> list:
+    return getSagemakerVectorsInterfaceServiceRequest("requestId", getLetsDataAuth(), InterfaceNames.SagemakerVectorsInterface, "extractDocumentElementsForVectorizationBatch", {"documents": documents}, None).execute()
+
+def test_default_batch_processes_each_item_once_with_per_item_errors():
+    handler = RecordingVectorsInterface()
+    setHandler(InterfaceNames.SagemakerVectorsInterface, handler)
+    results = extractBatch([{"id": "d0", "text": "a"}, {"id": "d1", "text": "b", "bad": True}, "not a document", {"id": "d3", "text": "c"}])
+    assert [result["statusCode"] for result in results] == ["SUCCESS", "EXCEPTION", "EXCEPTION", "SUCCESS"]
+    assert results[0]["data"] == {"text": "a"}
+    assert results[1]["errorMessage"] == "bad document d1"
+    assert handler.extractedDocuments == ["d0", "d1", "d3"]
+
+def test_throwing_batch_falls_back_to_single_items():
+    handler = ThrowingBatchVectorsInterface()
+    setHandler(InterfaceNames.SagemakerVectorsInterface, handler)
+    results = extractBatch([{"id": "d0", "text": "a"}, {"id": "d1", "text": "b", "bad": True}])
+    assert [result["statusCode"] for result in results] == ["SUCCESS", "EXCEPTION"]
+    assert handler.extractedDocuments == ["d0", "d1"]
@@ -0,0 +1,53 @@
+import pytest
+from letsdata_utils.validations import letsdata_assert, compileRequestSchema, SchemaField
+
+validateRecordData = compileRequestSchema("Test.record", [
+    SchemaField("keys", dict)
+])
+
+validateData = compileRequestSchema("Test.function", [
+    SchemaField("name", str),
+    SchemaField("offset", int),
+    SchemaField("content", (str, bytes)),
+    SchemaField("encoding", str, required=False),
+    SchemaField("owner", str, nullable=True),
+    SchemaField("record", dict, required=False, schema=validateRecordData)
+])
+
+def getData(**overrides) -> dict:
+    data = {"name": "a", "offset": 0, "content": b"x", "owner": None}
+    data.update(overrides)
+    return data
+
+def test_valid_data():
+    validateData(getData())
+    validateData(getData(encoding="utf-8", record={"keys": {}}))
+
+def test_unknown_keys_are_rejected():
+    with pytest.raises(Exception, match="extra"):
+        validateData(getData(extra=1))
+
+def test_unknown_keys_are_allowed_when_opted_in():
+    compileRequestSchema("Test.lenient", [SchemaField("name", str)], allowUnknownKeys=True)({"name": "a", "extra": 1})
+
+def test_all_violations_are_reported():
+    with pytest.raises(Exception) as exceptionInfo:
+        validateData({"offset": "0", "content": 1, "owner": None, "record": {"keys": []}})
+    message = str(exceptionInfo.value)
+    assert "invalid name - missing" in message
+    assert "offset value to be int, got str" in message
+    assert "content value to be str|bytes, got int" in message
+    assert "record.keys" in message
+
+def test_none_is_rejected_for_non_nullable_fields():
+    with pytest.raises(Exception, match="invalid name - None"):
+        validateData(getData(name=None))
+
+def test_non_dict_data_is_rejected():
+    with pytest.raises(Exception, match="requires data keys"):
+        validateData(None)
+
+def test_letsdata_assert_formats_the_message_lazily():
+    letsdata_assert(True, "%s %s", "no", "format")
+    with pytest.raises(Exception, match="letsdata assert - expected 1, got 2"):
+        letsdata_assert(False, "expected %s, got %s", 1, 2)
@@ -0,0 +1,32 @@
+import numpy
+import pytest
+from letsdata_utils.vector_utils import encodeVector, decodeVector, decodeVectorsMap, encodeVectors, VECTOR_ENCODING_FLOAT32, VECTOR_ENCODING_FLOAT16, VECTOR_ENCODING_INT8
+
+VECTOR = [0.5, -1.25, 3.0, 0.0]
+
+def test_float32_round_trip_is_exact():
+    decoded = decodeVector(encodeVector(VECTOR, VECTOR_ENCODING_FLOAT32))
+    assert decoded.dtype == numpy.float32
+    assert decoded.tolist() == VECTOR
+
+def test_float16_round_trip():
+    assert decodeVector(encodeVector(VECTOR, VECTOR_ENCODING_FLOAT16)).tolist() == VECTOR
+
+def test_int8_round_trip_is_within_the_quantization_step():
+    packedVector = encodeVector(VECTOR, VECTOR_ENCODING_INT8)
+    decoded = decodeVector(packedVector)
+    assert numpy.max(numpy.abs(decoded - numpy.asarray(VECTOR, dtype=numpy.float32))) <= packedVector["scale"] / 2 + 1e-6
+
+def test_vectors_map_keeps_the_json_lists():
+    vectorsMap = decodeVectorsMap({"packed": encodeVector(VECTOR), "list": VECTOR})
+    assert vectorsMap["packed"].tolist() == VECTOR
+    assert vectorsMap["list"] is VECTOR
+
+def test_encode_vectors_replaces_the_nested_numpy_vectors():
+    value = encodeVectors({"vectors": {"text": numpy.asarray(VECTOR, dtype=numpy.float32)}, "ids": [1, 2]}, VECTOR_ENCODING_FLOAT32)
+    assert value["ids"] == [1, 2]
+    assert decodeVector(value["vectors"]["text"]).tolist() == VECTOR
+
+def test_invalid_encoding():
+    with pytest.raises(Exception, match="invalid packed vector encoding"):
+        decodeVector({"encoding": "float64", "data": ""})